@@ -1,26 +1,32 @@
 import warnings
+from copy import copy
 from functools import update_wrapper
 from typing import Any, TypedDict
 
 from django import forms
+from django.contrib.admin import ListFilter, display, helpers
 from django.contrib.admin import ModelAdmin as BaseModelAdmin
 from django.contrib.admin import StackedInline as BaseStackedInline
 from django.contrib.admin import TabularInline as BaseTabularInline
-from django.contrib.admin import display, helpers
-from django.contrib.admin.options import InlineModelAdmin
+from django.contrib.admin.options import IncorrectLookupParameters, InlineModelAdmin
+from django.contrib.admin.sites import AdminSite
+from django.contrib.admin.utils import NotRelationField, get_fields_from_path
 from django.contrib.contenttypes.admin import (
     GenericStackedInline as BaseGenericStackedInline,
 )
 from django.contrib.contenttypes.admin import (
     GenericTabularInline as BaseGenericTabularInline,
 )
-from django.db.models import BLANK_CHOICE_DASH, Model
-from django.http import HttpRequest, HttpResponse
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import BLANK_CHOICE_DASH, Model, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseBadRequest
 from django.urls import URLPattern, path
 from django.utils.safestring import SafeString, mark_safe
 from django.utils.translation import gettext_lazy as _
 from django.views import View
 
+from unfold.cache import track_model_versions
 from unfold.checks import UnfoldModelAdminChecks
 from unfold.forms import (
     ActionForm,
@@ -34,7 +40,14 @@ from unfold.mixins import (
     NestedInlinesModelAdminMixin,
 )
 from unfold.overrides import FORMFIELD_OVERRIDES_INLINE
-from unfold.views import ChangeList
+from unfold.paginator import CURSOR_VAR, KeysetPaginator
+from unfold.utils import get_filter_field_path
+from unfold.views import (
+    LIST_FILTER_ATTR,
+    LIST_FILTER_SEARCH_PARAMS,
+    ChangeList,
+    ListFilterSearchView,
+)
 from unfold.widgets import UnfoldBooleanWidget
 
 checkbox = UnfoldBooleanWidget(
@@ -65,6 +78,7 @@ class ModelAdmin(
     hide_ordering_field = False
     list_filter_submit = False
     list_filter_sheet = True
+    list_filter_lazy = False
     list_filter_options: dict[str, ListFilterOptionsItem] = {}
     list_fullwidth = False
     list_disable_select_all = False
@@ -77,8 +91,51 @@ class ModelAdmin(
     show_add_link = True
     readonly_preprocess_fields = {}
     warn_unsaved_form = False
+    command_result_fields = ()
+    full_result_count_cache_timeout = None
+    facets_cache_timeout = None
+    facets_cache_stale_timeout = 60 * 60 * 24
     checks_class = UnfoldModelAdminChecks
 
+    def __init__(self, model: type[Model], admin_site: AdminSite) -> None:
+        super().__init__(model, admin_site)
+
+        # Connecting the signals on every request would take the lock of the
+        # signals, so the models are tracked once when the admin is registered
+        track_model_versions(*self._get_cached_models())
+
+    def _get_cached_models(self) -> list[type[Model]]:
+        """
+        Models whose saves and deletes discard the cached changelist values.
+        """
+        models = []
+
+        if (
+            self.full_result_count_cache_timeout is not None
+            or self.facets_cache_timeout is not None
+        ):
+            models.append(self.model)
+
+        # Slider bounds depend on the model of the filtered field as well
+        for list_filter in self.list_filter:
+            if not isinstance(list_filter, tuple | list):
+                continue
+
+            field_path, filter_class = list_filter
+
+            if getattr(filter_class, "bounds_cache_timeout", None) is None:
+                continue
+
+            try:
+                field = get_fields_from_path(self.model, field_path)[-1]
+            except (FieldDoesNotExist, NotRelationField):
+                # Reported by the system checks
+                continue
+
+            models.extend([self.model, field.model])
+
+        return list(dict.fromkeys(models))
+
     @property
     def media(self):
         media = super().media
@@ -89,15 +146,19 @@ class ModelAdmin(
         if not hasattr(self, "request"):
             return media
 
-        for filter in self.get_list_filter(self.request):
-            if (
-                isinstance(filter, tuple | list)
-                and hasattr(filter[1], "form_class")
-                and hasattr(filter[1].form_class, "Media")
-            ):
-                media += forms.Media(filter[1].form_class.Media)
-            elif hasattr(filter, "form_class") and hasattr(filter.form_class, "Media"):
-                media += forms.Media(filter.form_class.Media)
+        for list_filter in self.get_list_filter(self.request):
+            filter_class = (
+                list_filter[1] if isinstance(list_filter, tuple | list) else list_filter
+            )
+            form_classes = [getattr(filter_class, "form_class", None)]
+
+            # Capped filters render their search select with another form
+            if getattr(filter_class, "max_choices", None) is not None:
+                form_classes.append(filter_class.search_form_class)
+
+            for form_class in form_classes:
+                if hasattr(form_class, "Media"):
+                    media += forms.Media(form_class.Media)
 
         return media
 
@@ -192,6 +253,19 @@ class ModelAdmin(
             for action in self._get_base_actions_detail()
         ]
 
+        list_filter_urls = [
+            path(
+                "filters/<str:field_path>/<int:index>/",
+                wrap(self.list_filter_view),
+                name=f"{self.opts.app_label}_{self.opts.model_name}_filter",
+            ),
+            path(
+                "filters/<str:field_path>/<int:index>/search/",
+                wrap(self.list_filter_search_view),
+                name=f"{self.opts.app_label}_{self.opts.model_name}_filter_search",
+            ),
+        ]
+
         action_row_urls = [
             path(
                 f"<path:object_id>/{action.path.removesuffix('/')}/",
@@ -203,6 +277,7 @@ class ModelAdmin(
 
         return (
             custom_urls
+            + list_filter_urls
             + action_row_urls
             + actions_list_urls
             + action_detail_urls
@@ -232,6 +307,97 @@ class ModelAdmin(
     def get_changelist(self, request: HttpRequest, **kwargs: Any) -> type[ChangeList]:
         return ChangeList
 
+    def is_list_filter_lazy(self, request: HttpRequest, field_path: str | None) -> bool:
+        """
+        With list_filter_lazy, the vertical filters are rendered as placeholders
+        loaded by list_filter_view() and skip the queries for their choices.
+        """
+        if not self.list_filter_lazy:
+            return False
+
+        if getattr(request, LIST_FILTER_ATTR, None) == field_path:
+            return False
+
+        return not self.list_filter_options.get(field_path, {}).get("horizontal")
+
+    def list_filter_view(
+        self, request: HttpRequest, field_path: str, index: int
+    ) -> HttpResponse:
+        from unfold.templatetags.unfold_list import unfold_admin_list_filter
+
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+
+        try:
+            cl, spec = self._get_list_filter(request, field_path, index)
+        except IncorrectLookupParameters:
+            return HttpResponseBadRequest()
+
+        if spec is not None:
+            return HttpResponse(unfold_admin_list_filter(cl, spec))
+
+        # Filters without choices have no output and the placeholder is removed
+        return HttpResponse()
+
+    def list_filter_search_view(
+        self, request: HttpRequest, field_path: str, index: int
+    ) -> HttpResponse:
+        """
+        Values of a filter with max_choices which are not rendered as checkboxes,
+        searched and paginated by select2.
+        """
+        if not self.has_view_or_change_permission(request):
+            raise PermissionDenied
+
+        filter_request = copy(request)
+        filter_request.GET = request.GET.copy()
+
+        for param in LIST_FILTER_SEARCH_PARAMS:
+            filter_request.GET.pop(param, None)
+
+        try:
+            _cl, spec = self._get_list_filter(filter_request, field_path, index)
+        except IncorrectLookupParameters:
+            return HttpResponseBadRequest()
+
+        if getattr(spec, "max_choices", None) is None:
+            raise Http404
+
+        return ListFilterSearchView.as_view(model_admin=self, filter_spec=spec)(request)
+
+    def _get_list_filter(
+        self, request: HttpRequest, field_path: str, index: int
+    ) -> tuple[ChangeList, ListFilter | None]:
+        # The changelist is built without loading its results
+        setattr(request, LIST_FILTER_ATTR, field_path)
+        cl = self.get_changelist_instance(request)
+
+        # Several filters can use the same field, index tells them apart
+        specs = [s for s in cl.filter_specs if get_filter_field_path(s) == field_path]
+
+        return cl, specs[index] if index < len(specs) else None
+
+    def get_paginator(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet,
+        per_page: int,
+        orphans: int = 0,
+        allow_empty_first_page: bool = True,
+    ) -> Paginator:
+        if issubclass(self.paginator, KeysetPaginator):
+            return self.paginator(
+                queryset,
+                per_page,
+                orphans,
+                allow_empty_first_page,
+                cursor=request.GET.get(CURSOR_VAR),
+            )
+
+        return super().get_paginator(
+            request, queryset, per_page, orphans, allow_empty_first_page
+        )
+
     def get_formset_kwargs(
         self, request: HttpRequest, obj: Model, inline: InlineModelAdmin, prefix: str
     ) -> dict[str, Any]:
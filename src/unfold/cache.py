@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from django.core.cache import cache
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from django.utils.encoding import force_bytes
+
+CACHE_MISSING = object()
+
+# Connecting a receiver takes the lock of the signal and clears its receivers
+# cache, so the signals of every model are connected only once per process
+_tracked_models: set[str] = set()
+
+
+def _get_model_label(model: type[Model] | str) -> str:
+    if isinstance(model, str):
+        return model.lower()
+
+    return model._meta.label_lower
+
+
+def get_model_version(model: type[Model] | str) -> int:
+    return cache.get(f"unfold_model_version_{_get_model_label(model)}", 0)
+
+
+def get_model_versions(models: Iterable[type[Model] | str]) -> list[int]:
+    """
+    Versions of several models read from the cache in a single round trip.
+    """
+    keys = [f"unfold_model_version_{_get_model_label(model)}" for model in models]
+    versions = cache.get_many(keys)
+
+    return [versions.get(key, 0) for key in keys]
+
+
+async def aget_model_version(model: type[Model] | str) -> int:
+    return await cache.aget(f"unfold_model_version_{_get_model_label(model)}", 0)
+
+
+def bump_model_version(sender: type[Model], **kwargs: Any) -> None:
+    key = f"unfold_model_version_{_get_model_label(sender)}"
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def track_model_versions(*models: type[Model] | str) -> None:
+    """
+    Bump the version of the models on every save and delete so cache keys built
+    with get_cache_key() stop matching once the data changes.
+    """
+    for model in models:
+        label = _get_model_label(model)
+
+        if label in _tracked_models:
+            continue
+
+        _tracked_models.add(label)
+
+        for signal in [post_save, post_delete]:
+            signal.connect(
+                bump_model_version,
+                sender=model,
+                weak=False,
+                dispatch_uid=f"unfold_model_version_{label}",
+            )
+
+
+def get_cache_key(
+    prefix: str, *parts: Any, models: tuple[type[Model] | str, ...] = ()
+) -> str:
+    versions = [f"{_get_model_label(m)}:{get_model_version(m)}" for m in models]
+    key_base = "_".join(str(part) for part in [*parts, *versions])
+
+    return f"{prefix}_{hashlib.sha256(force_bytes(key_base)).hexdigest()}"
+
+
+def get_or_set_once(
+    key: str,
+    default: Callable[[], Any],
+    timeout: int | None,
+    lock_timeout: int = 10,
+    poll_interval: float = 0.05,
+    wait_timeout: float = 1,
+    should_cache: Callable[[Any], bool] | None = None,
+) -> Any:
+    """
+    Like cache.get_or_set() but when several requests miss the same key at once,
+    only the one holding the lock computes the value while the others wait for
+    it to appear in the cache. Waiting blocks a worker, so after wait_timeout
+    seconds the waiting requests compute the value themselves. Values rejected
+    by should_cache are returned without being cached.
+    """
+    value = cache.get(key, CACHE_MISSING)
+
+    if value is not CACHE_MISSING:
+        return value
+
+    lock_key = f"{key}_lock"
+
+    locked = cache.add(lock_key, 1, timeout=lock_timeout)
+
+    if not locked:
+        deadline = time.monotonic() + min(wait_timeout, lock_timeout)
+
+        while time.monotonic() < deadline and cache.get(lock_key) is not None:
+            time.sleep(poll_interval)
+
+            if (value := cache.get(key, CACHE_MISSING)) is not CACHE_MISSING:
+                return value
+
+    try:
+        value = default()
+
+        if should_cache is None or should_cache(value):
+            cache.set(key, value, timeout=timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+    return value
+
+
+async def aget_or_set_once(
+    key: str,
+    default: Callable[[], Awaitable[Any]],
+    timeout: int | None,
+    lock_timeout: int = 10,
+    poll_interval: float = 0.05,
+    should_cache: Callable[[Any], bool] | None = None,
+) -> Any:
+    """
+    Async version of get_or_set_once() awaiting the default coroutine function.
+    """
+    value = await cache.aget(key, CACHE_MISSING)
+
+    if value is not CACHE_MISSING:
+        return value
+
+    lock_key = f"{key}_lock"
+    locked = await cache.aadd(lock_key, 1, timeout=lock_timeout)
+
+    if not locked:
+        deadline = time.monotonic() + lock_timeout
+
+        while time.monotonic() < deadline and await cache.aget(lock_key) is not None:
+            await asyncio.sleep(poll_interval)
+
+            if (value := await cache.aget(key, CACHE_MISSING)) is not CACHE_MISSING:
+                return value
+
+    try:
+        value = await default()
+
+        if should_cache is None or should_cache(value):
+            await cache.aset(key, value, timeout=timeout)
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+
+    return value
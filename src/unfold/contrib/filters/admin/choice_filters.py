@@ -1,18 +1,28 @@
 from collections.abc import Iterator
+from typing import Any
 
 from django.contrib import admin
+from django.contrib.admin.options import ModelAdmin
+from django.contrib.admin.utils import get_model_from_relation, reverse_field_path
 from django.contrib.admin.views.main import ChangeList
+from django.db.models import Field, Model, QuerySet
+from django.db.models.fields.related import RelatedField
+from django.http import HttpRequest
 from django.utils.translation import gettext_lazy as _
 
 from unfold.contrib.filters.admin.mixins import (
+    CappedChoicesMixin,
+    ChangeListFacetsMixin,
     ChoicesMixin,
+    LazyChoicesMixin,
+    LazyRelatedChoicesMixin,
     MultiValueMixin,
     ValueMixin,
 )
 from unfold.contrib.filters.forms import CheckboxForm, HorizontalRadioForm, RadioForm
 
 
-class RadioFilter(admin.SimpleListFilter):
+class RadioFilter(ChangeListFacetsMixin, admin.SimpleListFilter):
     template = "unfold/filters/filters_field.html"
     form_class = RadioForm
     all_option = ["", _("All")]
@@ -64,7 +74,9 @@ class ChoicesCheckboxFilter(
     all_option = None
 
 
-class BooleanRadioFilter(ValueMixin, admin.BooleanFieldListFilter):
+class BooleanRadioFilter(
+    ChangeListFacetsMixin, ValueMixin, admin.BooleanFieldListFilter
+):
     template = "unfold/filters/filters_field.html"
     form_class = HorizontalRadioForm
     all_option = ["", _("All")]
@@ -100,10 +112,70 @@ class BooleanRadioFilter(ValueMixin, admin.BooleanFieldListFilter):
         }
 
 
-class RelatedCheckboxFilter(MultiValueMixin, admin.RelatedFieldListFilter):
+class RelatedCheckboxFilter(
+    CappedChoicesMixin,
+    LazyRelatedChoicesMixin,
+    ChangeListFacetsMixin,
+    MultiValueMixin,
+    admin.RelatedFieldListFilter,
+):
     template = "unfold/filters/filters_field.html"
     form_class = CheckboxForm
 
+    def field_choices(
+        self, field: RelatedField, request: HttpRequest, model_admin: ModelAdmin
+    ) -> list[tuple]:
+        if self.max_choices is None or self.init_lazy(request, model_admin):
+            return super().field_choices(field, request, model_admin)
+
+        # Values are counted over the rows of the model admin, not the related model
+        lookup = self.lookup_kwarg.removesuffix("__exact")
+        queryset = model_admin.get_queryset(request).filter(
+            **{f"{lookup}__isnull": False}
+        )
+        rows = self.get_frequency_queryset(queryset, lookup)[: self.max_choices + 1]
+        values = self.cap_choices([row[lookup] for row in rows])
+        objects = get_model_from_relation(field)._default_manager.in_bulk(
+            values, field_name=field.target_field.name
+        )
+
+        return [(value, str(objects[value])) for value in values if value in objects]
+
+    def get_selected_choices(self, choices: list) -> list:
+        rendered = {str(value) for value, _label in choices}
+        values = [value for value in self.value() or [] if value not in rendered]
+        objects = get_model_from_relation(self.field)._default_manager.in_bulk(
+            values, field_name=self.field.target_field.name
+        )
+
+        return [(value, str(obj)) for value, obj in objects.items()]
+
+    def get_search_queryset(
+        self, request: HttpRequest, model_admin: ModelAdmin, term: str
+    ) -> QuerySet:
+        related_model = get_model_from_relation(self.field)
+        related_admin = model_admin.admin_site._registry.get(related_model)
+        queryset = related_model._default_manager.all()
+
+        # Without a registered model admin, the related objects are not searched
+        if related_admin is not None and term:
+            queryset, may_have_duplicates = related_admin.get_search_results(
+                request, queryset, term
+            )
+
+            if may_have_duplicates:
+                queryset = queryset.distinct()
+
+        ordering = self.field_admin_ordering(self.field, request, model_admin)
+
+        return queryset.order_by(*ordering, "pk")
+
+    def get_search_result(self, obj: Model) -> dict[str, str]:
+        return {
+            "id": str(getattr(obj, self.field.target_field.attname)),
+            "text": str(obj),
+        }
+
     def choices(self, changelist: ChangeList) -> Iterator:
         add_facets = getattr(changelist, "add_facets", False)
         facet_counts = self.get_facet_queryset(changelist) if add_facets else None
@@ -119,19 +191,62 @@ class RelatedCheckboxFilter(MultiValueMixin, admin.RelatedFieldListFilter):
             choices = self.lookup_choices
 
         yield {
-            "form": self.form_class(
-                label=_(" By %(filter_title)s ") % {"filter_title": self.title},
-                name=self.lookup_kwarg,
-                choices=choices,
-                data={self.lookup_kwarg: self.value()},
-            ),
+            "form": self.get_form(changelist, choices),
         }
 
 
-class AllValuesCheckboxFilter(MultiValueMixin, admin.AllValuesFieldListFilter):
+class AllValuesCheckboxFilter(
+    CappedChoicesMixin,
+    LazyChoicesMixin,
+    ChangeListFacetsMixin,
+    MultiValueMixin,
+    admin.AllValuesFieldListFilter,
+):
     template = "unfold/filters/filters_field.html"
     form_class = CheckboxForm
 
+    def __init__(
+        self,
+        field: Field,
+        request: HttpRequest,
+        params: dict[str, str],
+        model: type[Model],
+        model_admin: ModelAdmin,
+        field_path: str,
+    ) -> None:
+        # The distinct values are queried lazily, by has_output() or choices()
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.init_lazy(request, model_admin)
+
+        # Same queryset as the distinct values of AllValuesFieldListFilter
+        parent_model, _reverse_path = reverse_field_path(model, field_path)
+
+        if model == parent_model:
+            self.values_queryset = model_admin.get_queryset(request)
+        else:
+            self.values_queryset = parent_model._default_manager.all()
+
+        if self.max_choices is not None and not self.lazy:
+            rows = self.get_frequency_queryset(self.values_queryset, field.name)
+            self.lookup_choices = self.cap_choices(
+                [row[field.name] for row in rows[: self.max_choices + 1]]
+            )
+
+    def get_search_queryset(
+        self, request: HttpRequest, model_admin: ModelAdmin, term: str
+    ) -> QuerySet:
+        queryset = self.values_queryset.filter(**{f"{self.field.name}__isnull": False})
+
+        if term:
+            queryset = queryset.filter(**{f"{self.field.name}__icontains": term})
+
+        return self.get_frequency_queryset(queryset, self.field.name)
+
+    def get_search_result(self, obj: dict[str, Any]) -> dict[str, str]:
+        value = str(obj[self.field.name])
+
+        return {"id": value, "text": value}
+
     def choices(self, changelist: ChangeList) -> Iterator:
         add_facets = getattr(changelist, "add_facets", False)
         facet_counts = self.get_facet_queryset(changelist) if add_facets else None
@@ -147,10 +262,5 @@ class AllValuesCheckboxFilter(MultiValueMixin, admin.AllValuesFieldListFilter):
             choices = [[val, val] for _i, val in enumerate(self.lookup_choices)]
 
         yield {
-            "form": self.form_class(
-                label=_(" By %(filter_title)s ") % {"filter_title": self.title},
-                name=self.lookup_kwarg,
-                choices=choices,
-                data={self.lookup_kwarg: self.value()},
-            ),
+            "form": self.get_form(changelist, choices),
         }
@@ -10,14 +10,16 @@ from django.http import HttpRequest
 from django.utils.translation import gettext_lazy as _
 
 from unfold.contrib.filters.admin.mixins import (
+    ChangeListFacetsMixin,
     DropdownMixin,
+    LazyRelatedChoicesMixin,
     MultiValueMixin,
     ValueMixin,
 )
 from unfold.contrib.filters.forms import DropdownForm
 
 
-class DropdownFilter(admin.SimpleListFilter):
+class DropdownFilter(ChangeListFacetsMixin, admin.SimpleListFilter):
     template = "unfold/filters/filters_field.html"
     form_class = DropdownForm
     all_option = ["", _("All")]
@@ -69,7 +71,9 @@ class MultipleDropdownFilter(DropdownFilter):
             )
 
 
-class ChoicesDropdownFilter(ValueMixin, DropdownMixin, admin.ChoicesFieldListFilter):
+class ChoicesDropdownFilter(
+    ChangeListFacetsMixin, ValueMixin, DropdownMixin, admin.ChoicesFieldListFilter
+):
     def queryset(self, request: HttpRequest, queryset: QuerySet) -> QuerySet | None:
         if self.value() not in EMPTY_VALUES:
             return super().queryset(request, queryset)
@@ -103,7 +107,13 @@ class MultipleChoicesDropdownFilter(MultiValueMixin, ChoicesDropdownFilter):
     multiple = True
 
 
-class RelatedDropdownFilter(ValueMixin, DropdownMixin, admin.RelatedFieldListFilter):
+class RelatedDropdownFilter(
+    LazyRelatedChoicesMixin,
+    ChangeListFacetsMixin,
+    ValueMixin,
+    DropdownMixin,
+    admin.RelatedFieldListFilter,
+):
     def __init__(
         self,
         field: Field,
@@ -8,11 +8,12 @@ from django.contrib.admin import (
 )
 from django.contrib.admin.options import ModelAdmin
 from django.contrib.admin.views.main import ChangeList
-from django.db.models import QuerySet
+from django.db.models import Count, QuerySet
 from django.db.models.fields import BLANK_CHOICE_DASH
 from django.db.models.fields.related import RelatedField
 from django.forms import ValidationError
 from django.http import HttpRequest
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from unfold.contrib.filters.forms import (
@@ -21,7 +22,152 @@ from unfold.contrib.filters.forms import (
     DropdownForm,
     RadioForm,
     RangeNumericForm,
+    SearchableCheckboxForm,
 )
+from unfold.utils import get_filter_field_path, get_filter_index
+
+
+class ChangeListFacetsMixin:
+    """
+    Reads the facet counts from the changelist, which computes them for all
+    filters together instead of one aggregate query per filter.
+    """
+
+    facets_from_changelist = True
+
+    def get_facet_queryset(self, changelist: ChangeList) -> dict[str, int]:
+        if hasattr(changelist, "get_facet_counts"):
+            return changelist.get_facet_counts(self)
+
+        return super().get_facet_queryset(changelist)  # ty:ignore[unresolved-attribute]
+
+
+class LazyChoicesMixin:
+    """
+    With list_filter_lazy on the model admin, the choices are loaded only when
+    the lazy filter view renders this filter, not with every changelist.
+    """
+
+    lazy = False
+    field_path: str
+
+    def init_lazy(self, request: HttpRequest, model_admin: ModelAdmin) -> bool:
+        is_list_filter_lazy = getattr(model_admin, "is_list_filter_lazy", None)
+        self.lazy = bool(
+            is_list_filter_lazy and is_list_filter_lazy(request, self.field_path)
+        )
+
+        return self.lazy
+
+    def has_output(self) -> bool:
+        # Without the choices it is not known whether the filter has any
+        if self.lazy:
+            return True
+
+        return super().has_output()  # ty:ignore[unresolved-attribute]
+
+
+class LazyRelatedChoicesMixin(LazyChoicesMixin):
+    def field_choices(
+        self, field: RelatedField, request: HttpRequest, model_admin: ModelAdmin
+    ) -> list[tuple]:
+        if self.init_lazy(request, model_admin):
+            return []
+
+        return super().field_choices(field, request, model_admin)  # ty:ignore[unresolved-attribute]
+
+
+class CappedChoicesMixin:
+    """
+    With max_choices, only the most frequent values are rendered as checkboxes
+    and the other values are searched in a select loaded by the filter search
+    view of the model admin.
+    """
+
+    max_choices: int | None = None
+    search_form_class = SearchableCheckboxForm
+    capped = False
+    form_class: type[CheckboxForm]
+    lookup_kwarg: str
+    title: str
+    value: Callable
+
+    def get_frequency_queryset(self, queryset: QuerySet, field_name: str) -> QuerySet:
+        # Ordered by the number of rows using the value, ties by the value itself
+        return (
+            queryset.order_by()
+            .values(field_name)
+            .annotate(unfold_count=Count("*"))
+            .order_by("-unfold_count", field_name)
+        )
+
+    def cap_choices(self, choices: list) -> list:
+        # Choices are queried with one more row to know whether any were left out
+        self.capped = self.max_choices is not None and len(choices) > self.max_choices
+
+        return choices[: self.max_choices] if self.capped else choices
+
+    def get_selected_choices(self, choices: list) -> list:
+        """
+        Selected values which are not rendered as checkboxes, labelled by the
+        values themselves.
+        """
+        rendered = {str(value) for value, _label in choices}
+
+        return [(value, value) for value in self.value() or [] if value not in rendered]
+
+    def get_search_queryset(
+        self, request: HttpRequest, model_admin: ModelAdmin, term: str
+    ) -> QuerySet:
+        """
+        Values of the filtered field in the rows of the model admin containing
+        the search term, the most frequent first.
+        """
+        field_path = get_filter_field_path(self)
+        queryset = model_admin.get_queryset(request).filter(
+            **{f"{field_path}__isnull": False}
+        )
+
+        if term:
+            queryset = queryset.filter(**{f"{field_path}__icontains": term})
+
+        return self.get_frequency_queryset(queryset, field_path)
+
+    def get_search_result(self, obj: Any) -> dict[str, str]:
+        value = str(obj[get_filter_field_path(self)])
+
+        return {"id": value, "text": value}
+
+    def get_search_url(self, changelist: ChangeList) -> str:
+        site_name = changelist.model_admin.admin_site.name
+        opts = changelist.opts
+
+        return reverse(
+            f"{site_name}:{opts.app_label}_{opts.model_name}_filter_search",
+            args=[
+                get_filter_field_path(self),
+                get_filter_index(changelist.filter_specs, self),
+            ],
+            current_app=site_name,
+        )
+
+    def get_form(self, changelist: ChangeList, choices: list) -> CheckboxForm:
+        kwargs = {
+            "label": _(" By %(filter_title)s ") % {"filter_title": self.title},
+            "name": self.lookup_kwarg,
+            "choices": choices,
+            "data": {self.lookup_kwarg: self.value()},
+        }
+
+        if not self.capped:
+            return self.form_class(**kwargs)
+
+        # Selected values outside of the checkboxes are preselected in the select
+        return self.search_form_class(
+            search_url=self.get_search_url(changelist),
+            search_choices=self.get_selected_choices(choices),
+            **kwargs,
+        )
 
 
 class ValueMixin:
@@ -47,7 +193,7 @@ class DropdownMixin:
     all_option = ["", _("All")]
 
 
-class ChoicesMixin(ChoicesFieldListFilter):
+class ChoicesMixin(ChangeListFacetsMixin, ChoicesFieldListFilter):
     template = "unfold/filters/filters_field.html"
     all_option: tuple[str, str] | None = None
     form_class: type[CheckboxForm | RadioForm]
@@ -150,6 +296,8 @@ class RangeNumericMixin(ListFilter):
 
 
 class AutocompleteMixin(RelatedFieldListFilter):
+    # Choices are loaded by the autocomplete view without counts
+    facets_from_changelist = False
     model_admin: ModelAdmin
     form_class: type[AutocompleteDropdownForm]
     value: Callable
@@ -4,8 +4,10 @@ from typing import Any
 from django.contrib import admin
 from django.contrib.admin.options import ModelAdmin
 from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import EmptyResultSet
 from django.core.validators import EMPTY_VALUES
-from django.db.models import Max, Min, Model, QuerySet
+from django.db.models import Count, Max, Min, Model, QuerySet
+from django.db.models.constants import LOOKUP_SEP
 from django.db.models.fields import (
     AutoField,
     DecimalField,
@@ -16,6 +18,7 @@ from django.db.models.fields import (
 from django.forms import ValidationError
 from django.http import HttpRequest
 
+from unfold.cache import get_cache_key, get_or_set_once
 from unfold.contrib.filters.admin.mixins import RangeNumericMixin
 from unfold.contrib.filters.forms import SingleNumericForm, SliderNumericForm
 
@@ -129,6 +132,8 @@ class SliderNumericFilter(RangeNumericFilter):
     template = "unfold/filters/filters_numeric_slider.html"
     field = None
     form_class = SliderNumericForm
+    bounds_cache_timeout: int | None = None
+    bounds_from_changelist = False
 
     def __init__(
         self,
@@ -144,16 +149,56 @@ class SliderNumericFilter(RangeNumericFilter):
         self.field = field
         self.q = model_admin.get_queryset(request)
 
-    def choices(self, changelist: ChangeList) -> Iterator:
-        total = self.q.all().count()
-        min_value = self.q.all().aggregate(min=Min(self.parameter_name)).get("min", 0)
-        max_value = None
-
-        if total > 1:
-            max_value = (
-                self.q.all().aggregate(max=Max(self.parameter_name)).get("max", 0)
+    def get_bounds_queryset(self, changelist: ChangeList) -> QuerySet:
+        if self.bounds_from_changelist:
+            # Without the own parameters, otherwise the slider could only shrink
+            return changelist.get_queryset(
+                self.request, exclude_parameters=self.expected_parameters()
             )
 
+        return self.q
+
+    def get_bounds(self, changelist: ChangeList) -> tuple[Any, Any]:
+        """
+        Minimum and maximum of the field, cached for bounds_cache_timeout seconds
+        or until an object of the model is saved or deleted.
+        """
+        queryset = self.get_bounds_queryset(changelist)
+
+        if self.bounds_cache_timeout is None:
+            return self._aggregate_bounds(queryset)
+
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return None, None
+
+        # Both models are tracked by ModelAdmin when the admin is registered
+        models = tuple(dict.fromkeys([queryset.model, self.field.model]))
+        key = get_cache_key(
+            "unfold_slider_bounds",
+            queryset.model._meta.label_lower,
+            self.parameter_name,
+            sql,
+            models=models,
+        )
+
+        return get_or_set_once(
+            key, lambda: self._aggregate_bounds(queryset), self.bounds_cache_timeout
+        )
+
+    def _aggregate_bounds(self, queryset: QuerySet) -> tuple[Any, Any]:
+        result = queryset.aggregate(
+            total=Count("pk", distinct=LOOKUP_SEP in self.parameter_name),
+            min=Min(self.parameter_name),
+            max=Max(self.parameter_name),
+        )
+
+        return result["min"], result["max"] if result["total"] > 1 else None
+
+    def choices(self, changelist: ChangeList) -> Iterator:
+        min_value, max_value = self.get_bounds(changelist)
+
         decimals = 0
         step = self.STEP if self.STEP else 1
 
@@ -7,6 +7,7 @@ from django.forms import (
     ChoiceField,
     ModelMultipleChoiceField,
     MultipleChoiceField,
+    SelectMultiple,
 )
 from django.http import HttpRequest
 from django.utils.translation import gettext_lazy as _
@@ -104,6 +105,59 @@ class CheckboxForm(forms.Form):
         )
 
 
+class SearchableCheckboxForm(CheckboxForm):
+    """
+    Checkboxes of the most frequent values followed by a select searching the
+    other values. Both fields submit the same parameter.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        choices: tuple | list,
+        search_url: str,
+        search_choices: tuple | list,
+        *args,
+        **kwargs,
+    ) -> None:
+        super().__init__(name, label, choices, *args, **kwargs)
+
+        self.name = name
+        self.search_name = f"{name}_search"
+        self.fields[self.search_name] = MultipleChoiceField(
+            label=_("Other values"),
+            required=False,
+            choices=search_choices,
+            widget=SelectMultiple(
+                attrs={
+                    "id": f"id_{self.search_name}",
+                    "class": "unfold-filter-autocomplete admin-autocomplete",
+                    "data-ajax--url": search_url,
+                    "data-theme": "admin-autocomplete",
+                    "data-placeholder": _("Search"),
+                    "data-allow-clear": "false",
+                }
+            ),
+        )
+
+        # Both fields receive all selected values, each renders only its own
+        for field_name, widget_choices in [
+            (name, choices),
+            (self.search_name, search_choices),
+        ]:
+            self.fields[field_name].choices = [*choices, *search_choices]
+            self.fields[field_name].widget.choices = widget_choices
+
+    def add_prefix(self, field_name: str) -> str:
+        if field_name == self.search_name:
+            field_name = self.name
+
+        return super().add_prefix(field_name)
+
+    Media = AutocompleteDropdownForm.Media
+
+
 class RadioForm(CheckboxForm):
     field = ChoiceField
     widget = UnfoldAdminRadioSelectWidget
@@ -65,3 +65,33 @@ class DropdownItem:
     link: str | Callable
     icon: str | None = None
     attrs: dict | None = None
+
+
+@dataclass(frozen=True, eq=False)
+class NavigationItem:
+    id: str
+    options: dict[str, Any]
+    link: Any = None
+    link_path: str | None = None
+    link_query: dict[str, list[str]] = field(default_factory=dict)
+    permission: Callable | str | None = None
+    badge_callback: Callable | None = None
+    items: tuple["NavigationItem", ...] | None = None
+
+
+@dataclass(frozen=True, eq=False)
+class ListColumn:
+    index: int
+    name: str
+    get_value: Callable[[Any], Any]
+    classes: str
+    empty_value_display: str
+    field: Any = None
+    attr: Any = None
+    is_link: bool = False
+    table_tag: str = "td"
+    boolean: bool = False
+    label: Any = False
+    header: bool = False
+    dropdown: bool = False
+    nowrap: bool = False
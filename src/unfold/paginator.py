@@ -1,21 +1,378 @@
-from django.core.paginator import Page, Paginator
+import json
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.db import connections
+from django.db.models import Field, Model, Q, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.encoding import force_bytes
 from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.translation import gettext_lazy as _
+
+CURSOR_VAR = "_cursor"
 
 
 class InfinitePage(Page):
-    def has_next(self):
-        if len(self.object_list) == 0:
-            return False
+    def __init__(self, object_list, number, paginator, has_next=False):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
 
-        return self.number < self.paginator.num_pages
+    def has_next(self):
+        return self._has_next
 
 
 class InfinitePaginator(Paginator):
+    """
+    Pages are loaded with one row more than fits the page to know whether a next
+    page exists without counting all rows.
+    """
+
     template_name = "unfold/helpers/pagination_infinite.html"
+    is_infinite = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pages = {}
 
     @cached_property
     def count(self):
         return 9_999_999_999
 
+    def page(self, number):
+        number = self.validate_number(number)
+
+        if number not in self._pages:
+            self._pages[number] = self._load_page(number)
+
+        return self._pages[number]
+
+    def _load_page(self, number):
+        offset = (number - 1) * self.per_page
+        rows, has_next = self._fetch_rows(self.object_list, offset)
+
+        return self._get_page(
+            self._get_object_list(self.object_list, offset, rows),
+            number,
+            self,
+            has_next=has_next,
+        )
+
+    def _fetch_rows(self, object_list, offset):
+        rows = list(object_list[offset : offset + self.per_page + 1])
+
+        return rows[: self.per_page], len(rows) > self.per_page
+
+    def _get_object_list(self, object_list, offset, rows):
+        if not isinstance(object_list, QuerySet):
+            return rows
+
+        # The changelist expects a queryset, e.g. for list_editable formsets. The
+        # rows are already fetched, so the sliced queryset must not query again
+        object_list = object_list[offset : offset + self.per_page]
+        object_list._result_cache = rows
+        object_list._prefetch_done = True
+
+        return object_list
+
     def _get_page(self, *args, **kwargs):
         return InfinitePage(*args, **kwargs)
+
+
+class KeysetPage(InfinitePage):
+    def __init__(
+        self,
+        object_list: QuerySet | list[Model],
+        number: int,
+        paginator: "KeysetPaginator",
+        next_cursor: str | None = None,
+        previous_cursor: str | None = None,
+    ) -> None:
+        super().__init__(
+            object_list, number, paginator, has_next=next_cursor is not None
+        )
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+class KeysetPaginator(InfinitePaginator):
+    """
+    Filters rows after the ordering values of the last row on the previous page
+    instead of skipping them with OFFSET. The values are passed between pages in
+    the opaque CURSOR_VAR query parameter. Falls back to OFFSET when the ordering
+    is not a unique tuple of plain, non-nullable fields led by an indexed one.
+    """
+
+    def __init__(self, *args: Any, cursor: str | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.cursor = cursor
+
+    @cached_property
+    def ordering(self) -> list[tuple[Field, bool]] | None:
+        if not isinstance(self.object_list, QuerySet):
+            return None
+
+        ordering = []
+
+        for term in self.object_list.query.order_by:
+            if (field := self._get_ordering_field(term)) is None:
+                return None
+
+            ordering.append((field, term.startswith("-")))
+
+        if not ordering or not self._is_unique(ordering):
+            return None
+
+        if not self._is_indexed(ordering[0][0]):
+            return None
+
+        return ordering
+
+    def _get_ordering_field(self, term: Any) -> Field | None:
+        if not isinstance(term, str) or LOOKUP_SEP in term or term == "?":
+            return None
+
+        opts = self.object_list.model._meta
+        name = term.removeprefix("-")
+
+        try:
+            field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        # Ordering by a relation follows the ordering of the related model
+        if field.is_relation and name != field.attname:
+            return None
+
+        if not field.concrete or field.null:
+            return None
+
+        return field
+
+    def _is_unique(self, ordering: list[tuple[Field, bool]]) -> bool:
+        names = {field.name for field, _descending in ordering}
+
+        if any(field.primary_key or field.unique for field, _descending in ordering):
+            return True
+
+        opts = self.object_list.model._meta
+
+        return any(
+            set(constraint.fields) <= names
+            for constraint in opts.total_unique_constraints
+        ) or any(set(fields) <= names for fields in opts.unique_together)
+
+    def _is_indexed(self, field: Field) -> bool:
+        if field.primary_key or field.unique or field.db_index:
+            return True
+
+        opts = self.object_list.model._meta
+        first_fields = [index.fields[0] for index in opts.indexes if index.fields]
+        first_fields += [fields[0] for fields in opts.unique_together]
+        first_fields += [
+            constraint.fields[0] for constraint in opts.total_unique_constraints
+        ]
+
+        return field.name in [name.removeprefix("-") for name in first_fields]
+
+    def _load_page(self, number: int) -> InfinitePage:
+        if self.ordering is None:
+            return super()._load_page(number)
+
+        queryset = self.object_list
+        reverse = False
+        offset = 0
+
+        if self.cursor:
+            values, reverse = self.decode_cursor(self.cursor)
+            queryset = queryset.filter(self._get_cursor_filter(values, reverse))
+
+            if reverse:
+                queryset = queryset.reverse()
+        else:
+            # Pages opened without a cursor, e.g. by typing the page number into
+            # the URL, are loaded with OFFSET and continue with cursors
+            offset = (number - 1) * self.per_page
+
+        items, has_more = self._fetch_rows(queryset, offset)
+
+        if reverse:
+            items.reverse()
+            has_next, has_previous = bool(items), has_more
+        else:
+            has_next, has_previous = has_more, bool(self.cursor) or number > 1
+
+        return KeysetPage(
+            self._get_object_list(queryset, offset, items),
+            number,
+            self,
+            next_cursor=self.encode_cursor(items[-1]) if has_next else None,
+            previous_cursor=(
+                self.encode_cursor(items[0], reverse=True)
+                if has_previous and items
+                else None
+            ),
+        )
+
+    def _get_cursor_filter(self, values: list[Any], reverse: bool) -> Q:
+        cursor_filter = Q()
+        equal = {}
+
+        for (field, descending), value in zip(self.ordering, values, strict=True):
+            lookup = "lt" if descending != reverse else "gt"
+            cursor_filter |= Q(**equal, **{f"{field.attname}__{lookup}": value})
+            equal[field.attname] = value
+
+        return cursor_filter
+
+    def encode_cursor(self, obj: Model, reverse: bool = False) -> str:
+        values = [field.value_to_string(obj) for field, _descending in self.ordering]
+
+        return urlsafe_base64_encode(
+            force_bytes(json.dumps({"values": values, "reverse": reverse}))
+        )
+
+    def decode_cursor(self, cursor: str) -> tuple[list[Any], bool]:
+        try:
+            data = json.loads(urlsafe_base64_decode(cursor))
+            values = [
+                field.to_python(value)
+                for (field, _descending), value in zip(
+                    self.ordering, data["values"], strict=True
+                )
+            ]
+        except (ValueError, TypeError, KeyError, ValidationError) as e:
+            raise InvalidPage(_("Invalid cursor")) from e
+
+        return values, bool(data.get("reverse"))
+
+
+class CappedCountPaginator(Paginator):
+    """
+    Counts at most count_limit rows with COUNT over a subquery with LIMIT, so
+    large results are never counted completely and are displayed as "10,000+".
+    Pages after the limit can still be opened.
+    """
+
+    count_limit = 10_000
+
+    @cached_property
+    def _counted(self) -> tuple[int, bool, bool]:
+        return (*self.get_capped_count(self.object_list), False)
+
+    @property
+    def count(self) -> int:
+        return self._counted[0]
+
+    @property
+    def is_capped(self) -> bool:
+        return self._counted[1]
+
+    @property
+    def is_estimated(self) -> bool:
+        return self._counted[2]
+
+    def get_capped_count(self, object_list: QuerySet | list) -> tuple[int, bool]:
+        if isinstance(object_list, QuerySet):
+            count = object_list.order_by()[: self.count_limit + 1].count()
+        else:
+            count = len(object_list)
+
+        return min(count, self.count_limit), count > self.count_limit
+
+    def validate_number(self, number: int | str) -> int:
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # The real count may be higher than the capped or estimated one
+            if (self.is_capped or self.is_estimated) and int(number) > 1:
+                return int(number)
+
+            raise
+
+    def page(self, number: int | str) -> Page:
+        number = self.validate_number(number)
+
+        if not self.is_capped and not self.is_estimated:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+
+        return self._get_page(
+            self.object_list[bottom : bottom + self.per_page], number, self
+        )
+
+
+class EstimatedCountPaginator(CappedCountPaginator):
+    """
+    Counts at most count_limit rows exactly. Larger results are estimated from
+    the planner statistics on PostgreSQL: pg_class.reltuples for unfiltered
+    querysets and the row estimate of EXPLAIN for filtered ones. Without
+    statistics the count stops at count_limit.
+    """
+
+    @cached_property
+    def _counted(self) -> tuple[int, bool, bool]:
+        if not isinstance(self.object_list, QuerySet):
+            return (*self.get_capped_count(self.object_list), False)
+
+        queryset = self.object_list.order_by()
+
+        if self._is_unfiltered(queryset):
+            estimate = self.get_table_estimate(queryset)
+
+            if estimate is not None and estimate > self.count_limit:
+                return estimate, False, True
+
+        count, is_capped = self.get_capped_count(queryset)
+
+        if is_capped and (estimate := self.get_query_estimate(queryset)) is not None:
+            return max(estimate, self.count_limit), False, True
+
+        return count, is_capped, False
+
+    def _is_unfiltered(self, queryset: QuerySet) -> bool:
+        query = queryset.query
+
+        return (
+            not query.where
+            and not query.distinct
+            and not query.combinator
+            and not query.is_sliced
+        )
+
+    def _is_postgresql(self, queryset: QuerySet) -> bool:
+        return connections[queryset.db].vendor == "postgresql"
+
+    def get_table_estimate(self, queryset: QuerySet) -> int | None:
+        if not self._is_postgresql(queryset):
+            return None
+
+        connection = connections[queryset.db]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+
+        # Tables which were never analyzed report -1
+        return row[0] if row and row[0] >= 0 else None
+
+    def get_query_estimate(self, queryset: QuerySet) -> int | None:
+        if not self._is_postgresql(queryset):
+            return None
+
+        plan = json.loads(queryset.explain(format="json"))
+
+        # Django serializes each plan of the JSON array returned by PostgreSQL,
+        # so the output is a single object unless the driver left it as a string
+        if isinstance(plan, list):
+            plan = plan[0]
+
+        return plan["Plan"]["Plan Rows"]
@@ -0,0 +1,993 @@
+import asyncio
+import heapq
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+
+from asgiref.sync import sync_to_async
+from django.contrib.admin import ModelAdmin
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DatabaseError, connections, router
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import (
+    Case,
+    CharField,
+    Expression,
+    FloatField,
+    Model,
+    Q,
+    QuerySet,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+from django.http import HttpRequest
+from django.urls import reverse
+
+from unfold.dataclasses import SearchResult
+
+if TYPE_CHECKING:
+    from unfold.sites import UnfoldAdminSite
+
+# Rows are stored as (title, description, link, icon, values) tuples where
+# values are lowercased search field values used to narrow the results in
+# memory, or None when the results can't be narrowed. Sources return rows in
+# (score, row) pairs ordered from the most relevant row.
+SearchRow = tuple[str, str, str, str | None, tuple[str, ...] | None]
+
+# Number of SQLite virtual machine instructions between statement timeout checks
+SQLITE_PROGRESS_STEPS = 1000
+
+_search_executors: dict[int, ThreadPoolExecutor] = {}
+_search_executors_lock = threading.Lock()
+
+
+def get_search_words(search_term: str) -> list[str] | None:
+    """
+    Words of the search term as matched by ModelAdmin.get_search_results(), or
+    None when the term contains quoted phrases.
+    """
+    if '"' in search_term or "'" in search_term:
+        return None
+
+    return search_term.split()
+
+
+def get_match_score(value: str, search_term: str) -> float:
+    """
+    Relevance of a matching value, the same as computed by get_admin_score()
+    for model rows: exact matches first, then values starting with the term.
+    """
+    value = value.lower()
+
+    if value == search_term:
+        return 1.0
+
+    if value.startswith(search_term):
+        return 0.75
+
+    return 0.5
+
+
+def get_plain_search_fields(
+    request: HttpRequest, model_admin: ModelAdmin
+) -> list[str] | None:
+    """
+    Search fields of the model admin when they are searched with the default
+    icontains lookups on text fields of the model itself. Otherwise None, as
+    values of other fields don't match the lookups once converted to strings.
+    """
+    if type(model_admin).get_search_results is not ModelAdmin.get_search_results:
+        return None
+
+    opts = model_admin.model._meta
+    fields = []
+
+    for name in model_admin.get_search_fields(request):
+        if name[:1] in "^=@" or LOOKUP_SEP in name:
+            return None
+
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+
+        if not field.concrete or not isinstance(field, CharField | TextField):
+            return None
+
+        fields.append(field.attname)
+
+    return fields
+
+
+def get_admin_score(
+    request: HttpRequest, model_admin: ModelAdmin, search_term: str
+) -> Expression | None:
+    """
+    Expression ranking the rows found by the search of the model admin, or None
+    when the search fields can't be ranked.
+    """
+    fields = get_plain_search_fields(request, model_admin)
+
+    if not fields:
+        return None
+
+    exact, prefix = Q(), Q()
+
+    for field in fields:
+        exact |= Q(**{f"{field}__iexact": search_term})
+        prefix |= Q(**{f"{field}__istartswith": search_term})
+
+    return Case(
+        When(exact, then=Value(1.0)),
+        When(prefix, then=Value(0.75)),
+        default=Value(0.5),
+        output_field=FloatField(),
+    )
+
+
+class SearchBackend(ABC):
+    """
+    Searches the rows of a model for the command with a full-text index of a
+    database vendor. Models configured in `options` are searched by search(),
+    other models and databases fall back to the search of the model admin.
+    """
+
+    vendor: str
+
+    def __init__(self, options: dict[str, dict[str, Any]] | None = None) -> None:
+        self.options = {
+            label.lower(): value for label, value in (options or {}).items()
+        }
+
+    def get_model_options(self, model_admin: ModelAdmin) -> dict[str, Any] | None:
+        model = model_admin.model
+
+        if connections[router.db_for_read(model)].vendor != self.vendor:
+            return None
+
+        return self.options.get(model._meta.label_lower)
+
+    def handles(self, model_admin: ModelAdmin) -> bool:
+        return bool(self.get_model_options(model_admin))
+
+    def get_search_results(
+        self,
+        request: HttpRequest,
+        model_admin: ModelAdmin,
+        queryset: QuerySet,
+        search_term: str,
+    ) -> tuple[QuerySet, bool]:
+        if options := self.get_model_options(model_admin):
+            return self.search(queryset, search_term, options), False
+
+        return model_admin.get_search_results(request, queryset, search_term)
+
+    @abstractmethod
+    def search(
+        self, queryset: QuerySet, search_term: str, options: dict[str, Any]
+    ) -> QuerySet:
+        """
+        Rows of the queryset matching the search term in the index configured
+        by the options of the model.
+        """
+
+    def get_score(
+        self, request: HttpRequest, model_admin: ModelAdmin, search_term: str
+    ) -> Expression | None:
+        """
+        Expression annotated as `command_score` to order the rows by relevance,
+        or None when the rows can't be ranked.
+        """
+        if options := self.get_model_options(model_admin):
+            if (score := self.get_index_score(search_term, options)) is not None:
+                return score
+
+        return get_admin_score(request, model_admin, search_term)
+
+    def get_index_score(
+        self, search_term: str, options: dict[str, Any]
+    ) -> Expression | None:
+        return None
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Searches a SearchVectorField (`vector_field`) or uses trigram word similarity
+    on `trigram_fields`, which requires django.contrib.postgres and pg_trgm.
+    """
+
+    vendor = "postgresql"
+
+    def search(
+        self, queryset: QuerySet, search_term: str, options: dict[str, Any]
+    ) -> QuerySet:
+        from django.contrib.postgres.search import SearchQuery
+
+        if vector_field := options.get("vector_field"):
+            query = SearchQuery(
+                search_term,
+                config=options.get("config"),
+                search_type=options.get("search_type", "websearch"),
+            )
+
+            return queryset.filter(**{vector_field: query})
+
+        conditions = Q()
+
+        for field in options.get("trigram_fields", []):
+            conditions |= Q(**{f"{field}__trigram_word_similar": search_term})
+
+        return queryset.filter(conditions)
+
+    def get_index_score(
+        self, search_term: str, options: dict[str, Any]
+    ) -> Expression | None:
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            TrigramWordSimilarity,
+        )
+
+        if vector_field := options.get("vector_field"):
+            query = SearchQuery(
+                search_term,
+                config=options.get("config"),
+                search_type=options.get("search_type", "websearch"),
+            )
+
+            return SearchRank(vector_field, query)
+
+        scores = [
+            TrigramWordSimilarity(search_term, field)
+            for field in options.get("trigram_fields", [])
+        ]
+
+        if len(scores) > 1:
+            return Greatest(*scores)
+
+        return scores[0] if scores else None
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Searches an FTS5 table (`fts_table`) whose rowid is the primary key of the
+    model. Each word of the search term is matched as a prefix, a term
+    without words matches no rows.
+    """
+
+    vendor = "sqlite"
+
+    def search(
+        self, queryset: QuerySet, search_term: str, options: dict[str, Any]
+    ) -> QuerySet:
+        table = connections[queryset.db].ops.quote_name(options["fts_table"])
+        words = search_term.replace('"', " ").split()
+
+        # An empty MATCH expression is a syntax error in FTS5
+        if not words:
+            return queryset.none()
+
+        query = " ".join(f'"{word}"*' for word in words)
+
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", (query,))
+        )
+
+
+class ListSearchSource:
+    """
+    Search results which are already known or computed by a single callback,
+    e.g. matching app and model names or results of the search callback.
+    """
+
+    key = None
+    concurrent = False
+
+    def __init__(
+        self,
+        callback: Callable[[], list[SearchResult | tuple[float, SearchResult]]],
+        search_term: str = "",
+        ranked: bool = False,
+    ) -> None:
+        self.callback = callback
+        self.search_term = search_term
+        self.ranked = ranked
+        self._rows: list[tuple[float, SearchRow]] | None = None
+
+    def get_rows(self) -> list[tuple[float, SearchRow]]:
+        rows = []
+
+        # Results can be returned together with their score
+        for item in self.callback() or []:
+            score, result = (
+                item
+                if isinstance(item, tuple)
+                else (get_match_score(item.title, self.search_term), item)
+            )
+            rows.append(
+                (
+                    score,
+                    (
+                        result.title,
+                        result.description,
+                        str(result.link),
+                        result.icon,
+                        None,
+                    ),
+                )
+            )
+
+        return sorted(rows, key=lambda row: -row[0]) if self.ranked else rows
+
+    def is_truncated(self, offset: int) -> bool:
+        return False
+
+    def fetch(
+        self, offset: int, count: int
+    ) -> tuple[list[tuple[float, SearchRow]], int, bool]:
+        if self._rows is None:
+            self._rows = self.get_rows()
+
+        rows = self._rows[offset : offset + count]
+
+        return rows, len(rows), offset + count >= len(self._rows)
+
+    async def afetch(
+        self, offset: int, count: int
+    ) -> tuple[list[tuple[float, SearchRow]], int, bool]:
+        # The callback may query the database
+        if self._rows is None:
+            self._rows = await sync_to_async(self.get_rows)()
+
+        return self.fetch(offset, count)
+
+
+class NarrowedSearchSource(ListSearchSource):
+    """
+    Rows of a model found for a prefix of the search term, filtered in memory
+    instead of querying the database again.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        rows: list[SearchRow],
+        search_term: str,
+        words: list[str],
+        ranked: bool = False,
+    ) -> None:
+        self.key = key
+        self.rows = rows
+        self.search_term = search_term
+        self.words = words
+        self.ranked = ranked
+        self._rows = None
+
+    def get_rows(self) -> list[tuple[float, SearchRow]]:
+        rows = [
+            (max(get_match_score(value, self.search_term) for value in row[4]), row)
+            for row in self.rows
+            if all(any(word in value for value in row[4]) for word in self.words)
+        ]
+
+        return sorted(rows, key=lambda row: -row[0]) if self.ranked else rows
+
+
+class ModelSearchSource:
+    """
+    Rows of one model matching the search term. Rows are fetched in slices with
+    LIMIT/OFFSET and never more than `limit` rows are read from the model.
+    """
+
+    concurrent = True
+
+    def __init__(
+        self,
+        admin_site: "UnfoldAdminSite",
+        request: HttpRequest,
+        model_admin: ModelAdmin,
+        search_term: str,
+        limit: int | None,
+        backend: SearchBackend | None = None,
+        ranked: bool = False,
+    ) -> None:
+        self.admin_site = admin_site
+        self.request = request
+        self.model_admin = model_admin
+        self.search_term = search_term
+        self.limit = limit
+        self.backend = backend
+        self.ranked = ranked
+        self.key = model_admin.model._meta.label_lower
+
+    def __str__(self) -> str:
+        return str(self.model_admin.model._meta.verbose_name_plural).capitalize()
+
+    @cached_property
+    def search_value_fields(self) -> list[str] | None:
+        """
+        Attribute names of the search fields when the model is searched with the
+        default icontains lookups on its own fields, which can be evaluated in
+        memory. Otherwise None.
+        """
+        if self.backend and self.backend.handles(self.model_admin):
+            return None
+
+        return get_plain_search_fields(self.request, self.model_admin)
+
+    def is_truncated(self, offset: int) -> bool:
+        return self.limit is not None and offset >= self.limit
+
+    def get_queryset(self) -> QuerySet:
+        qs = self.model_admin.get_queryset(self.request)
+
+        if self.backend:
+            qs, may_have_duplicates = self.backend.get_search_results(
+                self.request, self.model_admin, qs, self.search_term
+            )
+        else:
+            qs, may_have_duplicates = self.model_admin.get_search_results(
+                self.request, qs, self.search_term
+            )
+
+        if may_have_duplicates:
+            qs = qs.distinct()
+
+        if not qs.ordered:
+            qs = qs.order_by("-pk")
+
+        # Most relevant rows first, the original ordering only breaks ties
+        score = None
+
+        if self.ranked and self.backend:
+            score = self.backend.get_score(
+                self.request, self.model_admin, self.search_term
+            )
+        elif self.ranked:
+            score = get_admin_score(self.request, self.model_admin, self.search_term)
+
+        if score is not None:
+            qs = qs.annotate(command_score=score).order_by(
+                "-command_score", *(qs.query.order_by or qs.model._meta.ordering)
+            )
+
+        # Load only the fields needed to render the result title
+        if only_fields := getattr(self.model_admin, "command_result_fields", None):
+            fields = [*only_fields, *(self.search_value_fields or [])]
+            qs = qs.only(*dict.fromkeys(fields))
+
+        return qs
+
+    def get_end(self, offset: int, count: int) -> int:
+        return offset + count if self.limit is None else min(offset + count, self.limit)
+
+    def fetch(
+        self, offset: int, count: int
+    ) -> tuple[list[tuple[float, SearchRow]], int, bool]:
+        end = self.get_end(offset, count)
+
+        if offset >= end:
+            return [], 0, True
+
+        return self.get_item_rows(list(self.get_queryset()[offset:end]), offset, end)
+
+    async def afetch(
+        self, offset: int, count: int
+    ) -> tuple[list[tuple[float, SearchRow]], int, bool]:
+        end = self.get_end(offset, count)
+
+        if offset >= end:
+            return [], 0, True
+
+        # get_queryset() of the admin may query the database, only the returned
+        # queryset is evaluated in the event loop
+        queryset = await sync_to_async(self.get_queryset)()
+        items = [item async for item in queryset[offset:end].aiterator()]
+
+        # str() of an item may query related objects
+        return await sync_to_async(self.get_item_rows)(items, offset, end)
+
+    def get_item_rows(
+        self, items: list[Model], offset: int, end: int
+    ) -> tuple[list[tuple[float, SearchRow]], int, bool]:
+        opts = self.model_admin.model._meta
+        description = (
+            f"{opts.app_label.capitalize()} - {opts.verbose_name.capitalize()}"
+        )
+        url_name = f"{self.admin_site.name}:{opts.app_label}_{opts.model_name}_change"
+        value_fields = self.search_value_fields
+
+        pks = set()
+        results = []
+        rows = 0
+
+        for item in items:
+            rows += 1
+
+            if item.pk in pks:
+                continue
+
+            values = None
+
+            if value_fields is not None:
+                values = tuple(
+                    str(value).lower()
+                    for field in value_fields
+                    if (value := getattr(item, field)) is not None
+                )
+
+            pks.add(item.pk)
+            results.append(
+                (
+                    getattr(item, "command_score", 0.5),
+                    (
+                        str(item),
+                        description,
+                        reverse(url_name, args=(item.pk,)),
+                        "data_object",
+                        values,
+                    ),
+                )
+            )
+
+        return results, rows, rows < end - offset or end == self.limit
+
+
+def narrow_sources(
+    sources: list[ListSearchSource | ModelSearchSource],
+    search_term: str,
+    rows: list[tuple],
+    state: dict[str, Any],
+) -> list[ListSearchSource | ModelSearchSource] | None:
+    """
+    Replaces model sources with the rows found by a complete search for a prefix
+    of the search term, filtered in memory. Models whose rows were truncated or
+    can't be filtered in memory are still searched in the database. Returns None
+    when nothing can be reused.
+    """
+    words = get_search_words(search_term)
+
+    if words is None:
+        return None
+
+    narrowed = []
+
+    for source in sources:
+        index = None
+
+        if source.key is not None and source.key in state["sources"]:
+            index = state["sources"].index(source.key)
+
+        if (
+            not isinstance(source, ModelSearchSource)
+            or index is None
+            or source.search_value_fields is None
+            or index in state["truncated"]
+            or index in state["timed_out"]
+        ):
+            narrowed.append(source)
+            continue
+
+        source_rows = [row[:5] for row in rows if row[5] == index]
+
+        if any(row[4] is None for row in source_rows):
+            narrowed.append(source)
+            continue
+
+        narrowed.append(
+            NarrowedSearchSource(
+                source.key, source_rows, search_term, words, source.ranked
+            )
+        )
+
+    if all(source in sources for source in narrowed):
+        return None
+
+    return narrowed
+
+
+@dataclass
+class SearchPage:
+    object_list: list[SearchResult]
+    number: int
+    has_next: bool
+
+    def __iter__(self) -> Iterator[SearchResult]:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    @property
+    def next_page_number(self) -> int | None:
+        return self.number + 1 if self.has_next else None
+
+
+def get_search_executor(workers: int) -> ThreadPoolExecutor:
+    """
+    Thread pool shared by all searches, so the number of threads querying the
+    database at the same time is bounded per process instead of per request.
+    """
+    with _search_executors_lock:
+        if workers not in _search_executors:
+            _search_executors[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="unfold-search"
+            )
+
+        return _search_executors[workers]
+
+
+@contextmanager
+def statement_timeout(
+    connection: BaseDatabaseWrapper, timeout: float
+) -> Iterator[None]:
+    """
+    Aborts the queries of the connection running longer than timeout seconds,
+    so searches which timed out do not keep querying the database. Connections
+    of PostgreSQL and MySQL keep the setting until they are closed, which the
+    search workers do after every search.
+    """
+    milliseconds = max(int(timeout * 1000), 1)
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, false)", [str(milliseconds)]
+            )
+    elif connection.vendor == "mysql" and connection.mysql_is_mariadb:
+        with connection.cursor() as cursor:
+            cursor.execute("SET SESSION max_statement_time = %s", [milliseconds / 1000])
+    elif connection.vendor == "mysql":
+        with connection.cursor() as cursor:
+            cursor.execute("SET SESSION max_execution_time = %s", [milliseconds])
+    elif connection.vendor == "sqlite":
+        deadline = time.monotonic() + timeout
+        connection.ensure_connection()
+        connection.connection.set_progress_handler(
+            lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS
+        )
+
+    try:
+        yield
+    finally:
+        # In-memory SQLite connections are not closed and are reused by the thread
+        if connection.vendor == "sqlite" and connection.connection is not None:
+            connection.connection.set_progress_handler(None, 0)
+
+
+class SearchEngine:
+    """
+    Produces command results page by page from a list of sources. Sources are
+    read in order and only until the requested page (plus one result to know
+    whether there is a next page) is filled. Results fetched ahead are kept as
+    plain tuples in the state, which can be stored after get_page() and passed
+    back for the next page so it continues where the previous page stopped.
+    Each row is extended with the index of its source and its score.
+
+    When `ranked`, the rows of all sources are merged by their score instead,
+    taking the best head of the sources from a heap. Every source is read
+    only as far as its rows made it to the page.
+
+    With `workers`, the pending concurrent sources are queried at the same time
+    on a thread pool and their results are merged in the order of the sources.
+    Sources not finished within `timeout` seconds are skipped and reported in
+    `timed_out`.
+    """
+
+    def __init__(
+        self,
+        sources: list[ListSearchSource | ModelSearchSource],
+        per_page: int,
+        state: dict[str, Any] | None = None,
+        workers: int | None = None,
+        timeout: float | None = None,
+        ranked: bool = False,
+    ) -> None:
+        self.sources = sources
+        self.per_page = per_page
+        self.workers = workers
+        self.timeout = timeout
+        self.ranked = ranked
+        self.state = state or self.get_initial_state()
+
+    def get_initial_state(self) -> dict[str, Any]:
+        return {
+            "page": 0,
+            "buffer": [],
+            "source": 0,
+            "offset": 0,
+            "sources": [source.key for source in self.sources],
+            "timed_out": [],
+            "truncated": [],
+            # Rows fetched ahead, read offsets and finished sources when ranked
+            "pending": [[] for _source in self.sources],
+            "offsets": [0 for _source in self.sources],
+            "exhausted": [],
+        }
+
+    @property
+    def is_complete(self) -> bool:
+        if self.ranked:
+            return not any(self.state["pending"]) and len(
+                self.state["exhausted"]
+            ) == len(self.sources)
+
+        return self.state["source"] >= len(self.sources)
+
+    @property
+    def timed_out(self) -> list[ListSearchSource | ModelSearchSource]:
+        return [self.sources[index] for index in self.state["timed_out"]]
+
+    def _fetch(
+        self, requests: dict[int, tuple[int, int]], concurrent: bool
+    ) -> dict[int, tuple[list[tuple[float, SearchRow]], int, bool] | None]:
+        if not concurrent:
+            return {
+                index: self.sources[index].fetch(offset, count)
+                for index, (offset, count) in requests.items()
+            }
+
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        def fetch(index: int) -> tuple[list[tuple[float, SearchRow]], int, bool] | None:
+            try:
+                with self._statement_timeout(self.sources[index], deadline):
+                    return self.sources[index].fetch(*requests[index])
+            except DatabaseError:
+                # Queries aborted by the statement timeout are reported as timed out
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+
+                raise
+            finally:
+                # Worker threads open their own database connections
+                connections.close_all()
+
+        executor = get_search_executor(self.workers)
+        futures = {index: executor.submit(fetch, index) for index in requests}
+        wait(futures.values(), timeout=self.timeout)
+
+        for future in futures.values():
+            future.cancel()
+
+        return {
+            index: future.result() if future.done() and not future.cancelled() else None
+            for index, future in futures.items()
+        }
+
+    @contextmanager
+    def _statement_timeout(
+        self, source: "ListSearchSource | ModelSearchSource", deadline: float | None
+    ) -> Iterator[None]:
+        if deadline is None or not isinstance(source, ModelSearchSource):
+            yield
+            return
+
+        connection = connections[router.db_for_read(source.model_admin.model)]
+
+        with statement_timeout(connection, deadline - time.monotonic()):
+            yield
+
+    async def _afetch(
+        self, requests: dict[int, tuple[int, int]], concurrent: bool
+    ) -> dict[int, tuple[list[tuple[float, SearchRow]], int, bool] | None]:
+        if not concurrent:
+            return {
+                index: await self.sources[index].afetch(offset, count)
+                for index, (offset, count) in requests.items()
+            }
+
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def fetch(index: int) -> tuple[list[tuple[float, SearchRow]], int, bool]:
+            async with semaphore:
+                return await self.sources[index].afetch(*requests[index])
+
+        tasks = {index: asyncio.ensure_future(fetch(index)) for index in requests}
+        _done, pending = await asyncio.wait(tasks.values(), timeout=self.timeout)
+
+        for task in pending:
+            task.cancel()
+
+        return {
+            index: task.result() if task not in pending else None
+            for index, task in tasks.items()
+        }
+
+    def _run(self, steps: Generator) -> Any:
+        try:
+            step = next(steps)
+
+            while True:
+                step = steps.send(self._fetch(*step))
+        except StopIteration as stop:
+            return stop.value
+
+    async def _arun(self, steps: Generator) -> Any:
+        try:
+            step = next(steps)
+
+            while True:
+                step = steps.send(await self._afetch(*step))
+        except StopIteration as stop:
+            return stop.value
+
+    def _prefetch(self, offsets: dict[int, int], count: int) -> Generator:
+        indexes = [index for index in offsets if self.sources[index].concurrent]
+
+        if not self.workers or len(indexes) <= 1:
+            return {}
+
+        return (
+            yield (
+                {index: (offsets[index], count) for index in indexes},
+                True,
+            )
+        )
+
+    def _fetch_source(self, index: int, offset: int, count: int) -> Generator:
+        fetched = yield {index: (offset, count)}, False
+
+        return fetched[index]
+
+    def _next_page(self) -> Generator:
+        """
+        Computes the next page. Fetching rows from the sources is delegated to
+        the caller by yielding ({index: (offset, count)}, concurrent) requests,
+        so the same steps run with the sync and the async ORM.
+        """
+        if self.ranked:
+            return (yield from self._next_ranked_page())
+
+        buffer = self.state["buffer"]
+        required = self.per_page + 1
+        prefetched = {}
+
+        if len(buffer) < required and not self.is_complete:
+            offsets = dict.fromkeys(range(self.state["source"], len(self.sources)), 0)
+            offsets[self.state["source"]] = self.state["offset"]
+            prefetched = yield from self._prefetch(offsets, required - len(buffer))
+
+        while len(buffer) < required and not self.is_complete:
+            index = self.state["source"]
+
+            if index in prefetched:
+                fetched = prefetched.pop(index)
+
+                if fetched is None:
+                    self.state["timed_out"].append(index)
+                    self.state["source"] += 1
+                    self.state["offset"] = 0
+                    continue
+            else:
+                fetched = yield from self._fetch_source(
+                    index, self.state["offset"], required - len(buffer)
+                )
+
+            chunk, rows, exhausted = fetched
+            buffer.extend((*row, index, score) for score, row in chunk)
+
+            if exhausted:
+                if self.sources[index].is_truncated(self.state["offset"] + rows):
+                    self.state["truncated"].append(index)
+
+                self.state["source"] += 1
+                self.state["offset"] = 0
+            else:
+                self.state["offset"] += rows
+
+        self.state["page"] += 1
+        self.state["buffer"] = buffer[self.per_page :]
+
+        return buffer[: self.per_page], len(buffer) > self.per_page
+
+    def _next_ranked_page(self) -> Generator:
+        state = self.state
+        pending = state["pending"]
+        required = self.per_page + 1
+
+        def is_open(index: int) -> bool:
+            return not pending[index] and index not in state["exhausted"]
+
+        prefetched = yield from self._prefetch(
+            {
+                index: state["offsets"][index]
+                for index in range(len(self.sources))
+                if is_open(index)
+            },
+            required,
+        )
+
+        def fill(index: int, count: int) -> Generator:
+            if index in prefetched:
+                fetched = prefetched.pop(index)
+
+                if fetched is None:
+                    state["timed_out"].append(index)
+                    state["exhausted"].append(index)
+                    return
+            else:
+                fetched = yield from self._fetch_source(
+                    index, state["offsets"][index], count
+                )
+
+            chunk, rows, exhausted = fetched
+            pending[index].extend((*row, index, score) for score, row in chunk)
+            state["offsets"][index] += rows
+
+            if exhausted:
+                if self.sources[index].is_truncated(state["offsets"][index]):
+                    state["truncated"].append(index)
+
+                state["exhausted"].append(index)
+
+        # Heap of the best rows not taken yet, one per source. Ties keep the
+        # order of the sources.
+        heap = []
+
+        for index in range(len(self.sources)):
+            while is_open(index):
+                yield from fill(index, required)
+
+            if pending[index]:
+                heapq.heappush(heap, (-pending[index][0][6], index))
+
+        rows = []
+
+        while heap and len(rows) < required:
+            _score, index = heapq.heappop(heap)
+            rows.append(pending[index].pop(0))
+
+            while len(rows) < required and is_open(index):
+                yield from fill(index, required - len(rows))
+
+            if pending[index]:
+                heapq.heappush(heap, (-pending[index][0][6], index))
+
+        has_next = len(rows) > self.per_page
+
+        # The row fetched to know about the next page goes back to its source
+        if has_next:
+            row = rows.pop()
+            pending[row[5]].insert(0, row)
+
+        state["page"] += 1
+
+        return rows, has_next
+
+    def _get_rows(self, number: int) -> Generator:
+        if self.state["page"] >= number:
+            self.state = self.get_initial_state()
+
+        rows: list[tuple] = []
+        has_next = False
+
+        while self.state["page"] < number:
+            rows, has_next = yield from self._next_page()
+
+        return rows, has_next
+
+    def get_rows(self, number: int) -> tuple[list[tuple], bool]:
+        return self._run(self._get_rows(number))
+
+    async def aget_rows(self, number: int) -> tuple[list[tuple], bool]:
+        return await self._arun(self._get_rows(number))
+
+    def get_page(self, number: int) -> SearchPage:
+        rows, has_next = self.get_rows(number)
+
+        return SearchPage(
+            object_list=[SearchResult(*row[:4]) for row in rows],
+            number=number,
+            has_next=has_next,
+        )
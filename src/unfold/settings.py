@@ -1,6 +1,9 @@
+import copy
 from typing import Any
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 from unfold.widgets import (
     BUTTON_CLASSES,
@@ -29,6 +32,7 @@ CONFIG_DEFAULTS = {
     "SHOW_LANGUAGES": False,
     "SHOW_BACK_BUTTON": False,
     "SHOW_UI_WARNINGS": False,
+    "ASYNC_VIEWS": False,
     "LANGUAGE_FLAGS": {},
     "FORMS": {
         "classes": {
@@ -92,6 +96,12 @@ CONFIG_DEFAULTS = {
     },
     "COMMAND": {
         "search_models": False,  # Enable search in the models
+        "search_models_limit": 100,  # Maximum number of results per model
+        "search_models_workers": None,  # Number of threads searching models
+        "search_models_timeout": None,  # Seconds to wait for model results
+        "search_ranking": False,  # Order the results by relevance
+        "search_backend": None,  # Full-text search backend for the models
+        "search_backend_options": {},  # Full-text search options per model
         "show_history": False,  # Enable history in the command search
         "search_callback": None,  # Inject a custom callback to the search form
     },
@@ -109,23 +119,88 @@ CONFIG_DEFAULTS = {
 }
 
 
+class FrozenDict(dict):
+    """
+    Read-only dictionary returned by get_config(). Copies are regular dicts.
+    """
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Unfold configuration is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """
+    Read-only list returned by get_config(). Copies are regular lists.
+    """
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Unfold configuration is read-only")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __copy__(self) -> list[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> list[Any]:
+        return [copy.deepcopy(value, memo) for value in self]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (list, (list(self),))
+
+
+_config_cache: dict[str, FrozenDict] = {}
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+
+    if isinstance(value, list):
+        return FrozenList(_freeze(item) for item in value)
+
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+
+    return value
+
+
+def _merge_dicts(dict1: dict[str, Any], dict2: dict[str, Any]) -> dict[str, Any]:
+    result = dict1.copy()
+
+    for key, value in dict2.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = _merge_dicts(result[key], value)
+        else:
+            result[key] = value
+
+    return result
+
+
 def get_config(settings_name: str | None = None) -> dict[str, Any]:
     if settings_name is None:
         settings_name = "UNFOLD"
 
-    def merge_dicts(dict1: dict[str, Any], dict2: dict[str, Any]) -> dict[str, Any]:
-        result = dict1.copy()
+    if settings_name not in _config_cache:
+        _config_cache[settings_name] = _freeze(
+            _merge_dicts(CONFIG_DEFAULTS, getattr(settings, settings_name, {}))
+        )
 
-        for key, value in dict2.items():
-            if (
-                key in result
-                and isinstance(result[key], dict)
-                and isinstance(value, dict)
-            ):
-                result[key] = merge_dicts(result[key], value)
-            else:
-                result[key] = value
+    return _config_cache[settings_name]
 
-        return result
 
-    return merge_dicts(CONFIG_DEFAULTS, getattr(settings, settings_name, {}))
+@receiver(setting_changed)
+def reset_config_cache(setting: str, **kwargs: Any) -> None:
+    _config_cache.pop(setting, None)
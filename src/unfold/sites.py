@@ -1,24 +1,59 @@
-import copy
-import hashlib
+import asyncio
 import time
 from collections.abc import Callable
+from functools import update_wrapper
 from typing import Any
 from urllib.parse import parse_qs, urlparse
 
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
 from django.contrib.admin import AdminSite
 from django.core.cache import cache
-from django.core.paginator import Paginator
 from django.core.validators import EMPTY_VALUES
 from django.http import HttpRequest, HttpResponse
 from django.template.response import TemplateResponse
-from django.urls import URLPattern, URLResolver, path, reverse, reverse_lazy
-from django.utils.encoding import force_bytes
+from django.urls import URLPattern, URLResolver, get_script_prefix, path, reverse
 from django.utils.functional import lazy
+from django.utils.hashable import make_hashable
 from django.utils.module_loading import import_string
-
-from unfold.dataclasses import DropdownItem, Favicon, SearchResult
+from django.utils.translation import get_language
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_protect
+
+from unfold.cache import (
+    CACHE_MISSING,
+    aget_or_set_once,
+    get_cache_key,
+    get_model_versions,
+    get_or_set_once,
+    track_model_versions,
+)
+from unfold.dataclasses import DropdownItem, Favicon, NavigationItem, SearchResult
+from unfold.search import (
+    ListSearchSource,
+    ModelSearchSource,
+    SearchBackend,
+    SearchEngine,
+    SearchPage,
+    narrow_sources,
+)
 from unfold.settings import get_config
-from unfold.utils import convert_color
+from unfold.utils import (
+    PathTrie,
+    convert_color,
+    get_path_segments,
+    is_async_views_enabled,
+)
+
+BADGE_CACHE_TIMEOUT = 60
+SEARCH_CACHE_TIMEOUT = 5 * 60
+SEARCH_PER_PAGE = 100
+
+
+def is_search_page_complete(page_data: tuple) -> bool:
+    """
+    Pages missing results of timed out sources are not cached.
+    """
+    return not page_data[2]["timed_out"]
 
 
 class UnfoldAdminSite(AdminSite):
@@ -30,6 +65,20 @@ class UnfoldAdminSite(AdminSite):
 
         super().__init__(name)
 
+        self._static_context: tuple[dict[str, Any] | None, dict[str, Any], set[str]] = (
+            None,
+            {},
+            set(),
+        )
+        self._compiled_navigation: tuple[
+            dict[str, Any] | None,
+            dict[tuple[str, str], tuple[tuple[NavigationItem, ...], PathTrie]],
+        ] = (None, {})
+        self._compiled_tabs: tuple[
+            dict[str, Any] | None,
+            dict[tuple[str, str], tuple[tuple[NavigationItem, ...], PathTrie]],
+        ] = (None, {})
+
         custom_login_form = get_config(self.settings_name)["LOGIN"]["form"]
 
         if custom_login_form is not None:
@@ -37,71 +86,102 @@ class UnfoldAdminSite(AdminSite):
         elif self.login_form is None:
             self.login_form = AuthenticationForm
 
+        self._track_badge_models()
+
     def get_urls(self) -> list[URLResolver | URLPattern]:
+        self._track_search_models()
+
+        if is_async_views_enabled(self.settings_name):
+            search_view = self.async_admin_view(self.asearch)
+            badges_view = self.async_admin_view(self.abadges)
+        else:
+            search_view = self.admin_view(self.search)
+            badges_view = self.admin_view(self.badges)
+
         return (
             [
-                path("search/", self.admin_view(self.search), name="search"),
+                path("search/", search_view, name="search"),
+                path("badges/", badges_view, name="badges"),
             ]
             + self._get_extra_urls()
             + super().get_urls()
         )
 
+    def async_admin_view(self, view: Callable, cacheable: bool = False) -> Callable:
+        """
+        admin_view() for async views. The permission check loads the user from
+        the database, so it runs in a thread.
+        """
+
+        async def inner(
+            request: HttpRequest, *args: Any, **kwargs: Any
+        ) -> HttpResponse:
+            if not await sync_to_async(self.has_permission)(request):
+                from django.contrib.auth.views import redirect_to_login
+
+                return redirect_to_login(
+                    request.get_full_path(),
+                    reverse("admin:login", current_app=self.name),
+                )
+
+            return await view(request, *args, **kwargs)
+
+        if not cacheable:
+            inner = never_cache(inner)
+
+        if not getattr(view, "csrf_exempt", False):
+            inner = csrf_protect(inner)
+
+        return update_wrapper(inner, view)
+
     def each_context(self, request: HttpRequest) -> dict[str, Any]:
+        if not self.has_context_cache(request):
+            return self._get_each_context(request)
+
+        if not hasattr(request, "_unfold_each_context"):
+            request._unfold_each_context = {}
+
+        if self.name not in request._unfold_each_context:
+            request._unfold_each_context[self.name] = self._get_each_context(request)
+
+        return request._unfold_each_context[self.name].copy()
+
+    def has_context_cache(self, request: HttpRequest) -> bool:
+        """
+        Memoize each_context() on the request. Override to opt out.
+        """
+        return True
+
+    def _get_each_context(self, request: HttpRequest) -> dict[str, Any]:
         context = super().each_context(request)
 
         sidebar_config = self._get_config("SIDEBAR", request)
-        data = {
-            "form_classes": self._get_config("FORMS", request).get("classes"),
-            "site_title": self._get_config("SITE_TITLE", request),
-            "site_header": self._get_config("SITE_HEADER", request),
-            "site_subheader": self._get_config("SITE_SUBHEADER", request),
-            "site_version": self._get_config("SITE_VERSION", request),
-            "site_url": self._get_config("SITE_URL", request),
-            "site_dropdown": self._get_site_dropdown_items("SITE_DROPDOWN", request),
-            "site_logo": self._get_theme_images("SITE_LOGO", request),
-            "site_icon": self._get_theme_images("SITE_ICON", request),
-            "site_symbol": self._get_config("SITE_SYMBOL", request),
-            "site_favicons": self._get_favicons("SITE_FAVICONS", request),
-            "login_image": self._get_value(
-                get_config(self.settings_name)["LOGIN"].get("image"), request
-            ),
-            "show_history": self._get_config("SHOW_HISTORY", request),
-            "show_view_on_site": self._get_config("SHOW_VIEW_ON_SITE", request),
-            "show_languages": self._get_config("SHOW_LANGUAGES", request),
-            "language_flags": self._get_config("LANGUAGE_FLAGS", request),
-            "show_back_button": self._get_config("SHOW_BACK_BUTTON", request),
-            "theme": self._get_config("THEME", request),
-            "border_radius": self._get_config("BORDER_RADIUS", request),
-            "colors": self._get_colors("COLORS", request),
-            "environment": self._get_config("ENVIRONMENT", request),
-            "environment_title_prefix": self._get_config(
-                "ENVIRONMENT_TITLE_PREFIX", request
-            ),
-            "languages_list": self._get_value(
-                self._get_config("LANGUAGES", request).get("navigation"), request
-            ),
-            "languages_action": self._get_value(
-                self._get_config("LANGUAGES", request).get("action"), request
-            ),
-            "account_links": self._get_account_links(request),
-            "tab_list": self.get_tabs_list(request),
-            "styles": self._get_list("STYLES", request),
-            "scripts": self._get_list("SCRIPTS", request),
-            "command_show_history": self._get_config("COMMAND", request).get(
-                "show_history"
-            ),
-            "sidebar_show_all_applications": self._get_value(
-                sidebar_config.get("show_all_applications"), request
-            ),
-            "sidebar_show_search": self._get_value(
-                sidebar_config.get("show_search"), request
-            ),
-            "sidebar_navigation": self.get_sidebar_list(request)
-            if self.has_permission(request)
-            else [],
-        }
-
-        context.update(data)
+        sidebar_navigation = (
+            self.get_sidebar_list(request) if self.has_permission(request) else []
+        )
+        context.update(self._get_static_context(request))
+        context.update(
+            {
+                "languages_list": self._get_value(
+                    self._get_config("LANGUAGES", request).get("navigation"), request
+                ),
+                "languages_action": self._get_value(
+                    self._get_config("LANGUAGES", request).get("action"), request
+                ),
+                "account_links": self._get_account_links(request),
+                "tab_list": self.get_tabs_list(request),
+                "sidebar_show_all_applications": self._get_value(
+                    sidebar_config.get("show_all_applications"), request
+                ),
+                "sidebar_show_search": self._get_value(
+                    sidebar_config.get("show_search"), request
+                ),
+                "sidebar_navigation": sidebar_navigation,
+                "sidebar_badges_deferred": self._has_deferred_badges(
+                    sidebar_navigation
+                ),
+            }
+        )
 
         global_callback = get_config(self.settings_name)["GLOBAL_CALLBACK"]
 
@@ -116,6 +196,162 @@ class UnfoldAdminSite(AdminSite):
 
         return context
 
+    def _get_static_context(self, request: HttpRequest) -> dict[str, Any]:
+        """
+        Context values which are configured as plain values (no callbacks) are
+        computed once per process and reused until the configuration changes.
+        """
+        config = get_config(self.settings_name)
+
+        if self._static_context[0] is not config:
+            self._static_context = (config, {}, set())
+
+        _config, static_context, dynamic_keys = self._static_context
+        context = {}
+
+        for key, (setting, callback) in self._get_static_context_callbacks().items():
+            if key in static_context:
+                context[key] = static_context[key]
+                continue
+
+            context[key] = callback(request)
+
+            if key in dynamic_keys:
+                continue
+
+            if self._is_static_value(config.get(setting)):
+                static_context[key] = context[key]
+            else:
+                dynamic_keys.add(key)
+
+        return context
+
+    def _get_static_context_callbacks(
+        self,
+    ) -> dict[str, tuple[str, Callable[[HttpRequest], Any]]]:
+        return {
+            "form_classes": (
+                "FORMS",
+                lambda request: self._get_config("FORMS", request).get("classes"),
+            ),
+            "site_title": (
+                "SITE_TITLE",
+                lambda request: self._get_config("SITE_TITLE", request),
+            ),
+            "site_header": (
+                "SITE_HEADER",
+                lambda request: self._get_config("SITE_HEADER", request),
+            ),
+            "site_subheader": (
+                "SITE_SUBHEADER",
+                lambda request: self._get_config("SITE_SUBHEADER", request),
+            ),
+            "site_version": (
+                "SITE_VERSION",
+                lambda request: self._get_config("SITE_VERSION", request),
+            ),
+            "site_url": (
+                "SITE_URL",
+                lambda request: self._get_config("SITE_URL", request),
+            ),
+            "site_dropdown": (
+                "SITE_DROPDOWN",
+                lambda request: self._get_site_dropdown_items("SITE_DROPDOWN", request),
+            ),
+            "site_logo": (
+                "SITE_LOGO",
+                lambda request: self._get_theme_images("SITE_LOGO", request),
+            ),
+            "site_icon": (
+                "SITE_ICON",
+                lambda request: self._get_theme_images("SITE_ICON", request),
+            ),
+            "site_symbol": (
+                "SITE_SYMBOL",
+                lambda request: self._get_config("SITE_SYMBOL", request),
+            ),
+            "site_favicons": (
+                "SITE_FAVICONS",
+                lambda request: self._get_favicons("SITE_FAVICONS", request),
+            ),
+            "login_image": (
+                "LOGIN",
+                lambda request: self._get_value(
+                    get_config(self.settings_name)["LOGIN"].get("image"), request
+                ),
+            ),
+            "show_history": (
+                "SHOW_HISTORY",
+                lambda request: self._get_config("SHOW_HISTORY", request),
+            ),
+            "show_view_on_site": (
+                "SHOW_VIEW_ON_SITE",
+                lambda request: self._get_config("SHOW_VIEW_ON_SITE", request),
+            ),
+            "show_languages": (
+                "SHOW_LANGUAGES",
+                lambda request: self._get_config("SHOW_LANGUAGES", request),
+            ),
+            "language_flags": (
+                "LANGUAGE_FLAGS",
+                lambda request: self._get_config("LANGUAGE_FLAGS", request),
+            ),
+            "show_back_button": (
+                "SHOW_BACK_BUTTON",
+                lambda request: self._get_config("SHOW_BACK_BUTTON", request),
+            ),
+            "theme": (
+                "THEME",
+                lambda request: self._get_config("THEME", request),
+            ),
+            "border_radius": (
+                "BORDER_RADIUS",
+                lambda request: self._get_config("BORDER_RADIUS", request),
+            ),
+            "colors": (
+                "COLORS",
+                lambda request: self._get_colors("COLORS", request),
+            ),
+            "environment": (
+                "ENVIRONMENT",
+                lambda request: self._get_config("ENVIRONMENT", request),
+            ),
+            "environment_title_prefix": (
+                "ENVIRONMENT_TITLE_PREFIX",
+                lambda request: self._get_config("ENVIRONMENT_TITLE_PREFIX", request),
+            ),
+            "styles": (
+                "STYLES",
+                lambda request: self._get_list("STYLES", request),
+            ),
+            "scripts": (
+                "SCRIPTS",
+                lambda request: self._get_list("SCRIPTS", request),
+            ),
+            "command_show_history": (
+                "COMMAND",
+                lambda request: self._get_config("COMMAND", request).get(
+                    "show_history"
+                ),
+            ),
+        }
+
+    def _is_static_value(self, value: Any) -> bool:
+        if isinstance(value, dict):
+            return all(self._is_static_value(item) for item in value.values())
+
+        if isinstance(value, list | tuple):
+            return all(self._is_static_value(item) for item in value)
+
+        if isinstance(value, str):
+            try:
+                import_string(value)
+                return False
+            except (ImportError, ValueError):
+                return True
+
+        return not isinstance(value, Callable)
+
     def index(
         self, request: HttpRequest, extra_context: dict[str, Any] | None = None
     ) -> TemplateResponse:
@@ -145,25 +381,18 @@ class UnfoldAdminSite(AdminSite):
         self, app_list: list[dict[str, Any]], search_term: str
     ) -> list[SearchResult]:
         results = []
-        apps = []
 
         for app in app_list:
             if search_term in app["name"].lower():
-                apps.append(app)
-                continue
-
-            models = []
-
-            for model in app["models"]:
-                if search_term in model["name"].lower():
-                    models.append(model)
-
-            if len(models) > 0:
-                app["models"] = models
-                apps.append(app)
+                models = app["models"]
+            else:
+                models = [
+                    model
+                    for model in app["models"]
+                    if search_term in model["name"].lower()
+                ]
 
-        for app in apps:
-            for model in app["models"]:
+            for model in models:
                 results.append(
                     SearchResult(
                         title=str(model["name"]),
@@ -175,14 +404,29 @@ class UnfoldAdminSite(AdminSite):
 
         return results
 
+    def _get_search_backend(self, request: HttpRequest) -> SearchBackend | None:
+        command_config = self._get_config("COMMAND", request)
+        backend_class = command_config.get("search_backend")
+
+        if not backend_class:
+            return None
+
+        if isinstance(backend_class, str):
+            backend_class = import_string(backend_class)
+
+        return backend_class(command_config.get("search_backend_options"))
+
     def _search_models(
         self,
         request: HttpRequest,
         app_list: list[dict[str, Any]],
         search_term: str,
         allowed_models: list[str] | None = None,
-    ) -> list[SearchResult]:
-        results = []
+    ) -> list[ModelSearchSource]:
+        sources = []
+        limit = self._get_config("COMMAND", request).get("search_models_limit")
+        ranked = self._get_config("COMMAND", request).get("search_ranking")
+        backend = self._get_search_backend(request)
 
         for app in app_list:
             for model in app["models"]:
@@ -199,103 +443,282 @@ class UnfoldAdminSite(AdminSite):
                 if not search_fields:
                     continue
 
-                pks = []
+                sources.append(
+                    ModelSearchSource(
+                        self,
+                        request,
+                        admin_instance,
+                        search_term,
+                        limit,
+                        backend,
+                        ranked,
+                    )
+                )
+
+        return sources
+
+    def _track_search_models(self) -> None:
+        """
+        The URLs are loaded when a process starts serving the admin, so saves in
+        every such process invalidate cached command results of the models set
+        in search_models. Models returned by a search_models callback are
+        tracked by their first search.
+        """
+        command_config = get_config(self.settings_name)["COMMAND"]
+        search_models = (
+            command_config.get("search_models")
+            if isinstance(command_config, dict)
+            else None
+        )
+
+        if isinstance(search_models, list | tuple):
+            track_model_versions(*search_models)
+        elif search_models is True:
+            track_model_versions(
+                *[
+                    model
+                    for model, model_admin in self._registry.items()
+                    if model_admin.search_fields
+                ]
+            )
 
-                qs = admin_instance.get_queryset(request)
-                search_results, _has_duplicates = admin_instance.get_search_results(
-                    request, qs, search_term
+    def _get_search_sources(
+        self, request: HttpRequest, search_term: str
+    ) -> list[ListSearchSource | ModelSearchSource]:
+        app_list = super().get_app_list(request)
+        ranked = self._get_config("COMMAND", request).get("search_ranking")
+        sources: list[ListSearchSource | ModelSearchSource] = [
+            ListSearchSource(
+                lambda: self._search_apps(app_list, search_term), search_term, ranked
+            )
+        ]
+
+        if search_callback := self._get_config("COMMAND", request).get(
+            "search_callback"
+        ):
+            sources.append(
+                ListSearchSource(
+                    lambda: self._get_value(search_callback, request, search_term),
+                    search_term,
+                    ranked,
                 )
+            )
 
-                for item in search_results:
-                    if item.pk in pks:
-                        continue
+        search_models = self._get_value(
+            self._get_config("COMMAND", request).get("search_models"), request
+        )
 
-                    pks.append(item.pk)
+        if search_models is True or isinstance(search_models, list | tuple):
+            allowed_models = (
+                search_models if isinstance(search_models, list | tuple) else None
+            )
 
-                    link = reverse_lazy(
-                        f"{self.name}:{admin_instance.model._meta.app_label}_{admin_instance.model._meta.model_name}_change",
-                        args=(item.pk,),
-                    )
+            sources.extend(
+                self._search_models(request, app_list, search_term, allowed_models)
+            )
 
-                    results.append(
-                        SearchResult(
-                            title=str(item),
-                            description=f"{item._meta.app_label.capitalize()} - {item._meta.verbose_name.capitalize()}",
-                            link=link,
-                            icon="data_object",
-                        )
-                    )
+        return sources
 
-        return results
+    def _get_narrowed_search_sources(
+        self,
+        sources: list[ListSearchSource | ModelSearchSource],
+        search_term: str,
+        prefix_keys: list[str],
+        chunks: dict[str, Any],
+    ) -> list[ListSearchSource | ModelSearchSource]:
+        # While typing, the results for the previous term are usually cached. When
+        # they are complete, the rows are narrowed in memory instead of searching
+        # the models again
+        for key in prefix_keys:
+            if key not in chunks:
+                continue
+
+            rows, has_next, state = chunks[key]
+
+            if has_next:
+                continue
+
+            if narrowed := narrow_sources(sources, search_term, rows, state):
+                return narrowed
+
+        return sources
+
+    def _prepare_search(
+        self, request: HttpRequest, search_term: str, page_number: int
+    ) -> dict[str, Any]:
+        """
+        Everything needed to compute a page of command results which relies on
+        the permissions of the user and the configuration.
+        """
+        command_config = self._get_config("COMMAND", request)
+        sources = self._get_search_sources(request, search_term)
+
+        # Cached pages are invalidated as soon as a searched model changes
+        models = [
+            source.model_admin.model
+            for source in sources
+            if isinstance(source, ModelSearchSource)
+        ]
+        track_model_versions(*models)
+        versions = get_model_versions(models)
+
+        def get_page_cache_key(term: str, number: int) -> str:
+            return get_cache_key(
+                "unfold_search", self.name, request.user.pk, term, number, *versions
+            )
+
+        return {
+            "sources": sources,
+            "key": get_page_cache_key(search_term, page_number),
+            "previous_key": (
+                get_page_cache_key(search_term, page_number - 1)
+                if page_number > 1
+                else None
+            ),
+            "prefix_keys": [
+                get_page_cache_key(search_term[:length], 1)
+                for length in range(len(search_term) - 1, 0, -1)
+            ],
+            "engine_options": {
+                "workers": command_config.get("search_models_workers"),
+                "timeout": command_config.get("search_models_timeout"),
+                "ranked": command_config.get("search_ranking"),
+            },
+            "show_history": self._get_value(
+                command_config.get("show_history"), request
+            ),
+        }
+
+    def _get_search_engine(
+        self,
+        search: dict[str, Any],
+        search_term: str,
+        previous: tuple | None,
+        chunks: dict[str, Any],
+    ) -> SearchEngine:
+        # The next page continues where the previous cached page stopped instead
+        # of searching from scratch
+        return SearchEngine(
+            self._get_narrowed_search_sources(
+                search["sources"], search_term, search["prefix_keys"], chunks
+            ),
+            per_page=SEARCH_PER_PAGE,
+            state=previous[2] if previous else None,
+            **search["engine_options"],
+        )
+
+    def _get_search_response(
+        self,
+        request: HttpRequest,
+        search: dict[str, Any],
+        search_term: str,
+        page_number: int,
+        page_data: tuple[list[tuple], bool, dict[str, Any]],
+        start_time: float,
+    ) -> TemplateResponse:
+        rows, has_next, state = page_data
+        page = SearchPage(
+            object_list=[SearchResult(*row[:4]) for row in rows],
+            number=page_number,
+            has_next=has_next,
+        )
+
+        return TemplateResponse(
+            request,
+            template="unfold/helpers/command_results.html",
+            context={
+                "search_term": search_term,
+                "results": page,
+                "result_count": (page_number - 1) * SEARCH_PER_PAGE + len(page),
+                "page_counter": (page_number - 1) * SEARCH_PER_PAGE,
+                "execution_time": time.time() - start_time,
+                "timed_out_sources": [
+                    search["sources"][index] for index in state["timed_out"]
+                ],
+                "command_show_history": search["show_history"],
+            },
+            headers={
+                "HX-Trigger": "search",
+            },
+        )
 
     def search(
         self, request: HttpRequest, extra_context: dict[str, Any] | None = None
     ) -> TemplateResponse | HttpResponse:
         start_time = time.time()
-
-        CACHE_TIMEOUT = 5 * 60
-        PER_PAGE = 100
-
         search_term = request.GET.get("s")
-        app_list = super().get_app_list(request)
 
         if search_term in EMPTY_VALUES:
             return HttpResponse()
 
         search_term = search_term.lower()
+        page_number = int(request.GET.get("page", 1))
+        search = self._prepare_search(request, search_term, page_number)
+
+        def get_page() -> tuple[list[tuple], bool, dict[str, Any]]:
+            previous = None
+
+            if search["previous_key"]:
+                previous = cache.get(search["previous_key"])
+
+            chunks = cache.get_many(search["prefix_keys"])
+            engine = self._get_search_engine(search, search_term, previous, chunks)
+            rows, has_next = engine.get_rows(page_number)
 
-        search_key_base = f"{request.user.pk}_{search_term}"
-        cache_key = (
-            f"unfold_search_{hashlib.sha256(force_bytes(search_key_base)).hexdigest()}"
+            return rows, has_next, engine.state
+
+        page_data = get_or_set_once(
+            search["key"],
+            get_page,
+            timeout=SEARCH_CACHE_TIMEOUT,
+            should_cache=is_search_page_complete,
         )
-        cache_results = cache.get(cache_key)
 
-        if cache_results:
-            results = cache_results
-        else:
-            results = self._search_apps(app_list, search_term)
+        return self._get_search_response(
+            request, search, search_term, page_number, page_data, start_time
+        )
 
-            if search_callback := self._get_config("COMMAND", request).get(
-                "search_callback"
-            ):
-                results.extend(self._get_value(search_callback, request, search_term))
+    async def asearch(
+        self, request: HttpRequest, extra_context: dict[str, Any] | None = None
+    ) -> TemplateResponse | HttpResponse:
+        """
+        Async variant of search() using the async cache and ORM APIs to fetch
+        the rows of the models. Permissions and the configuration are resolved
+        in a single sync call.
+        """
+        start_time = time.time()
+        search_term = request.GET.get("s")
 
-            search_models = self._get_value(
-                self._get_config("COMMAND", request).get("search_models"), request
-            )
+        if search_term in EMPTY_VALUES:
+            return HttpResponse()
 
-            if search_models is True or isinstance(search_models, list | tuple):
-                allowed_models = (
-                    search_models if isinstance(search_models, list | tuple) else None
-                )
+        search_term = search_term.lower()
+        page_number = int(request.GET.get("page", 1))
+        search = await sync_to_async(self._prepare_search)(
+            request, search_term, page_number
+        )
 
-                results.extend(
-                    self._search_models(request, app_list, search_term, allowed_models)
-                )
+        async def get_page() -> tuple[list[tuple], bool, dict[str, Any]]:
+            previous = None
+
+            if search["previous_key"]:
+                previous = await cache.aget(search["previous_key"])
 
-            cache.set(cache_key, results, timeout=CACHE_TIMEOUT)
+            chunks = await cache.aget_many(search["prefix_keys"])
+            engine = self._get_search_engine(search, search_term, previous, chunks)
+            rows, has_next = await engine.aget_rows(page_number)
 
-        execution_time = time.time() - start_time
-        paginator = Paginator(results, PER_PAGE)
+            return rows, has_next, engine.state
 
-        show_history = self._get_value(
-            self._get_config("COMMAND", request).get("show_history"), request
+        page_data = await aget_or_set_once(
+            search["key"],
+            get_page,
+            timeout=SEARCH_CACHE_TIMEOUT,
+            should_cache=is_search_page_complete,
         )
 
-        return TemplateResponse(
-            request,
-            template="unfold/helpers/command_results.html",
-            context={
-                "search_term": search_term,
-                "page_obj": paginator,
-                "results": paginator.page(request.GET.get("page", 1)),
-                "page_counter": (int(request.GET.get("page", 1)) - 1) * PER_PAGE,
-                "execution_time": execution_time,
-                "command_show_history": show_history,
-            },
-            headers={
-                "HX-Trigger": "search",
-            },
+        return self._get_search_response(
+            request, search, search_term, page_number, page_data, start_time
         )
 
     def password_change(
@@ -317,73 +740,193 @@ class UnfoldAdminSite(AdminSite):
         return PasswordChangeView.as_view(**defaults)(request)
 
     def get_sidebar_list(self, request: HttpRequest) -> list[dict[str, Any]]:
-        navigation = self._get_value(
-            self._get_config("SIDEBAR", request).get("navigation"), request
-        )
-        tabs = self._get_value(self._get_config("TABS", request), request) or []
+        navigation, trie = self._get_compiled_navigation(request)
+        active_items = self._get_active_navigation_items(request, trie)
+        tab_links = self._get_active_tab_links(request)
         results = []
 
-        for group in copy.deepcopy(navigation):
-            group["items"] = self._get_navigation_items(request, group["items"], tabs)
+        for group in navigation:
+            result = {
+                **group.options,
+                "items": self._get_navigation_items(
+                    request, group.items or (), active_items, tab_links
+                ),
+            }
 
             # Badge callbacks
-            if "badge" in group and isinstance(group["badge"], str):
-                try:
-                    callback = import_string(group["badge"])
-                    group["badge_callback"] = lazy(callback)(request)
-                except (ImportError, ValueError):
-                    pass
+            if group.badge_callback is not None and group.options.get("badge_deferred"):
+                result["badge_deferred_id"] = group.id
+            elif group.badge_callback is not None:
+                result["badge_callback"] = lazy(self._get_badge_value)(request, group)
 
-            results.append(group)
+            results.append(result)
 
         return results
 
+    def _get_compiled_navigation(
+        self, request: HttpRequest
+    ) -> tuple[tuple[NavigationItem, ...], PathTrie]:
+        """
+        Sidebar navigation defined directly in settings is compiled once per
+        language and script prefix and reused until the configuration changes.
+        Navigation returned by a callback is compiled on every request.
+        """
+        config = get_config(self.settings_name)
+        sidebar = config["SIDEBAR"]
+        is_static = isinstance(sidebar, dict) and isinstance(
+            sidebar.get("navigation"), list
+        )
+        compiled = (
+            self._compiled_navigation[1]
+            if self._compiled_navigation[0] is config
+            else {}
+        )
+        key = self._get_compiled_key()
+
+        if is_static and key in compiled:
+            return compiled[key]
+
+        navigation = self._get_value(
+            self._get_config("SIDEBAR", request).get("navigation"), request
+        )
+        groups = tuple(
+            self._compile_navigation_item(group, str(index))
+            for index, group in enumerate(navigation or [])
+        )
+        trie = PathTrie()
+
+        # Navigation defined in settings was tracked when the site was created
+        if not is_static:
+            self._track_badge_models(navigation or [])
+
+        def insert_items(items: tuple[NavigationItem, ...]) -> None:
+            for item in items:
+                self._insert_path(trie, item.link_path, item)
+                insert_items(item.items or ())
+
+        for group in groups:
+            insert_items(group.items or ())
+
+        if is_static:
+            self._compiled_navigation = (config, {**compiled, key: (groups, trie)})
+
+        return groups, trie
+
+    def _get_compiled_key(self) -> tuple[str, str]:
+        # Link paths and the index path are resolved with reverse(), which depends
+        # on the active language with i18n_patterns and on the script prefix
+        return get_language(), get_script_prefix()
+
+    def _compile_navigation_item(
+        self, item: dict[str, Any], item_id: str = ""
+    ) -> NavigationItem:
+        link = item.get("link")
+        link_path = None
+        link_query = {}
+
+        if link and not isinstance(link, Callable):
+            parsed_link = urlparse(str(link))
+            link_path = parsed_link.path
+            link_query = parse_qs(parsed_link.query)
+
+        permission = item.get("permission")
+
+        if isinstance(permission, str):
+            try:
+                permission = import_string(permission)
+            except (ImportError, ValueError):
+                pass
+
+        badge_callback = None
+
+        if "badge" in item and isinstance(item["badge"], str):
+            try:
+                badge_callback = import_string(item["badge"])
+            except (ImportError, ValueError):
+                pass
+
+        items = None
+
+        if "items" in item:
+            nested_items = [
+                nested_item for nested_item in item["items"] if nested_item.get("link")
+            ]
+            items = tuple(
+                self._compile_navigation_item(nested_item, f"{item_id}-{index}")
+                for index, nested_item in enumerate(nested_items)
+            )
+
+        return NavigationItem(
+            id=item_id,
+            options={key: value for key, value in item.items() if key != "items"},
+            link=link,
+            link_path=link_path,
+            link_query=link_query,
+            permission=permission,
+            badge_callback=badge_callback,
+            items=items,
+        )
+
     def _get_navigation_items(
-        self, request: HttpRequest, items: list[dict], tabs: list[dict] | None = None
+        self,
+        request: HttpRequest,
+        items: tuple[NavigationItem, ...],
+        active_items: set[NavigationItem],
+        tab_links: set[str] | None = None,
     ) -> list:
         allowed_items = []
 
         for item in items:
-            link = item.get("link")
+            result = {**item.options}
 
-            if not link:
-                continue
-
-            if "active" in item:
-                item["active"] = self._get_value(item["active"], request)
-            elif tabs and self._get_is_tab_active(request, tabs, link):
+            if "active" in item.options:
+                result["active"] = self._get_value(item.options["active"], request)
+            elif tab_links and str(item.link) in tab_links:
                 # Checks if any tab item is active and then marks the sidebar link as active
-                item["active"] = True
+                result["active"] = True
             else:
-                item["active"] = self._get_is_active(
-                    request, item.get("link_callback") or link
-                )
+                result["active"] = item in active_items
 
             # Link callback
-            if isinstance(link, Callable):
-                item["link_callback"] = lazy(link)(request)
+            if isinstance(item.link, Callable):
+                result["link_callback"] = lazy(item.link)(request)
 
             # Permission callback
-            item["has_permission"] = self._call_permission_callback(
-                item.get("permission"), request
+            result["has_permission"] = self._call_permission_callback(
+                item.permission, request
             )
 
             # Badge callbacks
-            if "badge" in item and isinstance(item["badge"], str):
-                try:
-                    callback = import_string(item["badge"])
-                    item["badge_callback"] = lazy(callback)(request)
-                except (ImportError, ValueError):
-                    pass
+            if item.badge_callback is not None and item.options.get("badge_deferred"):
+                result["badge_deferred_id"] = item.id
+            elif item.badge_callback is not None:
+                result["badge_callback"] = lazy(self._get_badge_value)(request, item)
 
             # Process nested items
-            if "items" in item:
-                item["items"] = self._get_navigation_items(request, item["items"])
+            if item.items is not None:
+                result["items"] = self._get_navigation_items(
+                    request, item.items, active_items
+                )
 
-            allowed_items.append(item)
+            allowed_items.append(result)
 
         return allowed_items
 
+    def _get_active_navigation_items(
+        self, request: HttpRequest, trie: PathTrie
+    ) -> set[NavigationItem]:
+        """
+        Sidebar items with the longest link path matching the request path.
+        """
+        matches = trie.match(request.path)
+
+        if not matches:
+            return set()
+
+        longest = max(depth for depth, _item in matches)
+
+        return {item for depth, item in matches if depth == longest}
+
     def _get_account_links(self, request: HttpRequest) -> list[dict[str, Any]]:
         links = []
 
@@ -401,35 +944,389 @@ class UnfoldAdminSite(AdminSite):
 
         return links
 
-    def get_tabs_list(self, request: HttpRequest) -> list[dict[str, Any]]:
-        tabs = copy.deepcopy(self._get_config("TABS", request))
+    def badges(self, request: HttpRequest) -> TemplateResponse:
+        """
+        Values of all deferred sidebar badges, swapped into their placeholders
+        by a single htmx request issued after the page has loaded.
+        """
+        items = self._get_allowed_deferred_badge_items(request)
 
-        if not tabs:
-            return []
+        return self._get_badges_response(
+            request, [(item, self._get_badge_value(request, item)) for item in items]
+        )
+
+    async def abadges(self, request: HttpRequest) -> TemplateResponse:
+        """
+        Async variant of badges(). Distinct badge callbacks run concurrently,
+        async callbacks are awaited directly.
+        """
+
+        def get_items() -> list[tuple[NavigationItem, str | None]]:
+            return [
+                (item, self._get_badge_cache_key(request, item))
+                for item in self._get_allowed_deferred_badge_items(request)
+            ]
+
+        items = await sync_to_async(get_items)()
+        callbacks = {}
+
+        for item, cache_key in items:
+            callbacks.setdefault(self._get_badge_request_key(item), (item, cache_key))
+
+        values = await asyncio.gather(
+            *[
+                self._acall_badge_callback(request, item, cache_key)
+                for item, cache_key in callbacks.values()
+            ]
+        )
+        values = dict(zip(callbacks.keys(), values, strict=True))
+
+        return self._get_badges_response(
+            request,
+            [
+                (
+                    item,
+                    self._get_badge_item_value(
+                        item, values[self._get_badge_request_key(item)]
+                    ),
+                )
+                for item, _cache_key in items
+            ],
+        )
+
+    def _get_allowed_deferred_badge_items(
+        self, request: HttpRequest
+    ) -> list[NavigationItem]:
+        """
+        Deferred badges of the items the user can see. Items nested in a group
+        or item without permission are hidden together with their parent.
+        """
+        navigation, _trie = self._get_compiled_navigation(request)
+        deferred_items = []
+
+        def collect(items: tuple[NavigationItem, ...]) -> None:
+            for item in items:
+                if not self._call_permission_callback(item.permission, request):
+                    continue
+
+                if item.badge_callback is not None and item.options.get(
+                    "badge_deferred"
+                ):
+                    deferred_items.append(item)
+
+                collect(item.items or ())
+
+        collect(navigation)
+
+        return deferred_items
+
+    def _get_badges_response(
+        self, request: HttpRequest, items: list[tuple[NavigationItem, Any]]
+    ) -> TemplateResponse:
+        return TemplateResponse(
+            request,
+            template="unfold/helpers/app_list_badges.html",
+            context={
+                "badges": [
+                    {
+                        "id": item.id,
+                        "value": str(value),
+                        "style": item.options.get("badge_style"),
+                        "variant": item.options.get("badge_variant"),
+                        "class": item.options.get("badge_class"),
+                    }
+                    for item, value in items
+                ],
+            },
+        )
+
+    def _has_deferred_badges(self, navigation: list[dict[str, Any]]) -> bool:
+        """
+        Whether the rendered sidebar contains a visible deferred badge.
+        """
+        for item in navigation:
+            if not item.get("has_permission", True):
+                continue
+
+            if "badge_deferred_id" in item or self._has_deferred_badges(
+                item.get("items") or []
+            ):
+                return True
+
+        return False
+
+    def _track_badge_models(
+        self, navigation: list[dict[str, Any]] | None = None
+    ) -> None:
+        """
+        Sites are created when Django starts, so saves in every process, including
+        management commands, invalidate cached badges of navigation defined in
+        settings. Navigation returned by a callback is tracked once rendered,
+        every model only the first time.
+        """
+        if navigation is None:
+            sidebar = get_config(self.settings_name)["SIDEBAR"]
+            navigation = (
+                sidebar.get("navigation") if isinstance(sidebar, dict) else None
+            )
+
+        if not isinstance(navigation, list):
+            return
+
+        def track_items(items: list[dict[str, Any]]) -> None:
+            for item in items:
+                if "badge" in item and "badge_cache" in item:
+                    track_model_versions(*item["badge_cache"].get("models", []))
+
+                track_items(item.get("items", []))
+
+        track_items(navigation)
+
+    def _get_badge_value(self, request: HttpRequest, item: NavigationItem) -> Any:
+        """
+        Badge callbacks are called at most once per request. Items sharing one
+        callback with different "badge_key" options read their value from the
+        dictionary it returns. With "badge_cache", the result is cached for
+        "timeout" seconds per user ("scope": "user") or for everyone ("scope":
+        "global") and invalidated when one of the "models" is saved or deleted.
+        """
+        request_key = self._get_badge_request_key(item)
+
+        if not hasattr(request, "_unfold_badges"):
+            request._unfold_badges = {}
+
+        if request_key not in request._unfold_badges:
+            request._unfold_badges[request_key] = self._call_badge_callback(
+                request, item
+            )
+
+        return self._get_badge_item_value(item, request._unfold_badges[request_key])
+
+    def _get_badge_callback_path(self, item: NavigationItem) -> str:
+        callback = item.badge_callback
+
+        return f"{callback.__module__}.{callback.__qualname__}"
+
+    def _get_badge_request_key(self, item: NavigationItem) -> tuple[str, Any]:
+        # Items sharing a callback with different cache options are called apart
+        return (
+            self._get_badge_callback_path(item),
+            make_hashable(item.options.get("badge_cache")),
+        )
+
+    def _get_badge_item_value(self, item: NavigationItem, value: Any) -> Any:
+        if "badge_key" in item.options:
+            return value.get(item.options["badge_key"]) if value else None
+
+        return value
+
+    def _get_badge_cache_key(
+        self, request: HttpRequest, item: NavigationItem
+    ) -> str | None:
+        cache_options = item.options.get("badge_cache")
+
+        if cache_options is None:
+            return None
+
+        models = tuple(cache_options.get("models", []))
+        user_pk = request.user.pk if cache_options.get("scope") != "global" else None
+
+        return get_cache_key(
+            "unfold_badge",
+            self.name,
+            self._get_badge_callback_path(item),
+            user_pk,
+            models=models,
+        )
+
+    def _call_badge_callback(self, request: HttpRequest, item: NavigationItem) -> Any:
+        cache_key = self._get_badge_cache_key(request, item)
+
+        if cache_key is not None:
+            value = cache.get(cache_key, CACHE_MISSING)
+
+            if value is not CACHE_MISSING:
+                return value
+
+        if iscoroutinefunction(item.badge_callback):
+            value = async_to_sync(item.badge_callback)(request)
+        else:
+            value = item.badge_callback(request)
+
+        if cache_key is not None:
+            cache.set(
+                cache_key,
+                value,
+                timeout=item.options["badge_cache"].get("timeout", BADGE_CACHE_TIMEOUT),
+            )
+
+        return value
+
+    async def _acall_badge_callback(
+        self, request: HttpRequest, item: NavigationItem, cache_key: str | None
+    ) -> Any:
+        if cache_key is not None:
+            value = await cache.aget(cache_key, CACHE_MISSING)
+
+            if value is not CACHE_MISSING:
+                return value
+
+        if iscoroutinefunction(item.badge_callback):
+            value = await item.badge_callback(request)
+        else:
+            value = await sync_to_async(item.badge_callback)(request)
+
+        if cache_key is not None:
+            await cache.aset(
+                cache_key,
+                value,
+                timeout=item.options["badge_cache"].get("timeout", BADGE_CACHE_TIMEOUT),
+            )
+
+        return value
+
+    def get_tabs_list(self, request: HttpRequest) -> list[dict[str, Any]]:
+        tabs, active_items = self._get_active_tabs(request)
+        results = []
 
         for tab in tabs:
             allowed_items = []
 
-            for item in tab["items"]:
-                item["has_permission"] = self._call_permission_callback(
-                    item.get("permission"), request
-                )
+            for item in tab.items or ():
+                result = {
+                    **item.options,
+                    "has_permission": self._call_permission_callback(
+                        item.permission, request
+                    ),
+                }
 
-                if isinstance(item["link"], Callable):
-                    item["link_callback"] = lazy(item["link"])(request)
+                if isinstance(item.link, Callable):
+                    result["link_callback"] = lazy(item.link)(request)
 
-                if "active" not in item:
-                    item["active"] = self._get_is_active(
-                        request, item.get("link_callback") or item["link"], True
-                    )
+                if "active" not in item.options:
+                    result["active"] = item in active_items
                 else:
-                    item["active"] = self._get_value(item["active"], request)
+                    result["active"] = self._get_value(item.options["active"], request)
+
+                allowed_items.append(result)
+
+            results.append({**tab.options, "items": allowed_items})
+
+        return results
+
+    def _get_compiled_tabs(
+        self, request: HttpRequest
+    ) -> tuple[tuple[NavigationItem, ...], PathTrie]:
+        """
+        Tabs defined directly in settings are compiled once per language and
+        script prefix and reused until the configuration changes. Tabs returned by
+        a callback are compiled on every request.
+        """
+        config = get_config(self.settings_name)
+        is_static = isinstance(config["TABS"], list)
+        compiled = self._compiled_tabs[1] if self._compiled_tabs[0] is config else {}
+        key = self._get_compiled_key()
+
+        if is_static and key in compiled:
+            return compiled[key]
+
+        tabs = tuple(
+            self._compile_navigation_item(tab)
+            for tab in self._get_config("TABS", request) or []
+        )
+        trie = PathTrie()
 
-                allowed_items.append(item)
+        for tab in tabs:
+            for item in tab.items or ():
+                self._insert_path(trie, item.link_path, (tab, item))
+
+        if is_static:
+            self._compiled_tabs = (config, {**compiled, key: (tabs, trie)})
+
+        return tabs, trie
+
+    def _get_active_tabs(
+        self, request: HttpRequest
+    ) -> tuple[tuple[NavigationItem, ...], set[NavigationItem]]:
+        """
+        Compiled tabs with their active items, memoized on the request because
+        both the tabs and the sidebar need them and tab link callbacks would run
+        twice otherwise.
+        """
+        if not hasattr(request, "_unfold_active_tabs"):
+            request._unfold_active_tabs = {}
+
+        if self.name not in request._unfold_active_tabs:
+            tabs, trie = self._get_compiled_tabs(request)
+            active_items = (
+                self._get_active_tab_items(request, tabs, trie) if tabs else set()
+            )
+            request._unfold_active_tabs[self.name] = (tabs, active_items)
+
+        return request._unfold_active_tabs[self.name]
+
+    def _get_active_tab_items(
+        self,
+        request: HttpRequest,
+        tabs: tuple[NavigationItem, ...],
+        trie: PathTrie,
+    ) -> set[NavigationItem]:
+        """
+        For every tab group, the item with the longest link path matching the
+        request path whose query parameters are all present in the request.
+        """
+        candidates = [
+            (depth, tab, item, item.link_query)
+            for depth, (tab, item) in trie.match(request.path)
+        ]
+
+        # Links defined as callbacks are resolved per request
+        callback_trie = PathTrie()
+
+        for tab in tabs:
+            for item in tab.items or ():
+                if "active" in item.options or not isinstance(item.link, Callable):
+                    continue
 
-            tab["items"] = allowed_items
+                parsed_link = urlparse(str(item.link(request)))
+                self._insert_path(
+                    callback_trie,
+                    parsed_link.path,
+                    (tab, item, parse_qs(parsed_link.query)),
+                )
 
-        return tabs
+        for depth, (tab, item, link_query) in callback_trie.match(request.path):
+            candidates.append((depth, tab, item, link_query))
+
+        request_params = parse_qs(request.GET.urlencode())
+        best: dict[NavigationItem, tuple[tuple[int, int], list[NavigationItem]]] = {}
+
+        for depth, tab, item, link_query in candidates:
+            if not all(request_params.get(k) == v for k, v in link_query.items()):
+                continue
+
+            score = (depth, len(link_query))
+
+            if tab not in best or score > best[tab][0]:
+                best[tab] = (score, [item])
+            elif score == best[tab][0]:
+                best[tab][1].append(item)
+
+        return {item for _score, items in best.values() for item in items}
+
+    def _get_active_tab_links(self, request: HttpRequest) -> set[str]:
+        """
+        Links of all tab groups containing an active item. Sidebar items pointing
+        to one of these links are marked as active.
+        """
+        tabs, active_items = self._get_active_tabs(request)
+
+        return {
+            str(item.link)
+            for tab in tabs
+            if any(item in active_items for item in tab.items or ())
+            for item in tab.items or ()
+        }
 
     def _call_permission_callback(
         self, callback: str | Callable | None, request: HttpRequest
@@ -459,55 +1356,18 @@ class UnfoldAdminSite(AdminSite):
 
         return target
 
-    def _get_is_active(
-        self, request: HttpRequest, link: str | Callable, is_tab: bool = False
-    ) -> bool:
-        if not isinstance(link, str):
-            link = str(link)
-
-        index_path = reverse_lazy(f"{self.name}:index")
-        link_path = urlparse(link).path
+    def _insert_path(self, trie: PathTrie, link_path: str | None, value: Any) -> None:
+        if not link_path:
+            return
 
-        # Dashboard
-        if link_path == request.path == index_path:
-            return True
-
-        if link_path != "" and link_path in request.path and link_path != index_path:
-            query_params = parse_qs(urlparse(link).query)
-            request_params = parse_qs(request.GET.urlencode())
-
-            # In case of tabs, we need to check if the query params are the same
-            if is_tab and not all(
-                request_params.get(k) == v for k, v in query_params.items()
-            ):
-                return False
-
-            return True
-
-        return False
+        index_path = reverse(f"{self.name}:index")
 
-    def _get_is_tab_active(
-        self, request: HttpRequest, tabs: list[dict], nav_link: str
-    ) -> bool:
-        for tab_opts in tabs:
-            has_primary_link = False
-            has_tab_link_active = False
-
-            for tab_item in tab_opts["items"]:
-                if nav_link == tab_item["link"]:
-                    has_primary_link = True
-                    continue
-
-                if self._get_is_active(
-                    request, tab_item.get("link_callback") or tab_item["link"]
-                ):
-                    has_tab_link_active = True
-                    continue
-
-            if has_primary_link and has_tab_link_active:
-                return True
-
-        return False
+        # Dashboard link is active only on the dashboard itself
+        trie.insert(
+            link_path,
+            value,
+            exact=get_path_segments(link_path) == get_path_segments(index_path),
+        )
 
     def _get_config(self, key: str, *args: Any) -> Any:
         config = get_config(self.settings_name)
@@ -532,14 +1392,13 @@ class UnfoldAdminSite(AdminSite):
     def _get_colors(self, key: str, *args: Any) -> dict[str, dict[str, str]]:
         colors = self._get_config(key, *args)
 
-        for name, weights in colors.items():
-            color_weights = self._get_value(weights, *args)
-            colors[name] = color_weights
-
-            for weight, value in color_weights.items():
-                colors[name][weight] = convert_color(value)
-
-        return colors
+        return {
+            name: {
+                weight: convert_color(value)
+                for weight, value in self._get_value(weights, *args).items()
+            }
+            for name, weights in colors.items()
+        }
 
     def _get_list(self, key: str, *args: Any) -> list[Any]:
         items = get_config(self.settings_name)[key]
@@ -49,5 +49,11 @@
 		document.addEventListener("formset:added", (event) => {
 			$(event.target).find(".unfold-admin-autocomplete").djangoCustomSelect2();
 		});
+
+		// Filters loaded lazily with htmx contain selects rendered after page load
+		document.addEventListener("htmx:afterSettle", () => {
+			$(".unfold-admin-autocomplete").djangoCustomSelect2();
+			$(".unfold-filter-autocomplete:not(.select2-hidden-accessible)").djangoFilterSelect2();
+		});
 	});
 }
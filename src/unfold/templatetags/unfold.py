@@ -22,6 +22,7 @@ from django.template import Context, Library, Node, RequestContext, TemplateSynt
 from django.template.base import NodeList, Parser, Token, token_kwargs
 from django.template.loader import render_to_string
 from django.urls import reverse_lazy
+from django.utils.formats import number_format
 from django.utils.module_loading import import_string
 from django.utils.safestring import mark_safe
 from django.utils.text import slugify
@@ -29,6 +30,7 @@ from django.utils.translation import gettext_lazy as _
 
 from unfold.components import ComponentRegistry
 from unfold.enums import ActionVariant
+from unfold.paginator import CURSOR_VAR, KeysetPage, KeysetPaginator
 from unfold.sections import BaseSection
 from unfold.utils import prettify_traceback
 from unfold.widgets import (
@@ -200,6 +202,26 @@ def class_name(value: Any) -> str:
     return value.__class__.__name__
 
 
+@register.filter
+def compact_number(value: int) -> str:
+    for divisor, suffix in [(10**9, "B"), (10**6, "M"), (10**3, "K")]:
+        if value >= divisor:
+            return f"{value / divisor:.1f}".removesuffix(".0") + suffix
+
+    return str(value)
+
+
+@register.filter
+def format_result_count(count: int | None, paginator: Paginator | None) -> Any:
+    if getattr(paginator, "is_estimated", False):
+        return f"~{compact_number(count)}"
+
+    if getattr(paginator, "is_capped", False):
+        return f"{number_format(count, force_grouping=True)}+"
+
+    return count
+
+
 @register.filter
 def is_list(value: Any) -> bool:
     return isinstance(value, list)
@@ -590,9 +612,24 @@ def changeform_condition(field: AdminField) -> AdminField:
     return field
 
 
+@register.simple_tag
+def infinite_paginator_page(cl):
+    return cl.paginator.page(cl.page_num)
+
+
 @register.simple_tag
 def infinite_paginator_url(cl, i):
-    return cl.get_query_string({PAGE_VAR: i})
+    params = {PAGE_VAR: i}
+
+    if isinstance(cl.paginator, KeysetPaginator) and i > 1:
+        page = cl.paginator.page(cl.page_num)
+
+        if isinstance(page, KeysetPage):
+            params[CURSOR_VAR] = (
+                page.next_cursor if i > cl.page_num else page.previous_cursor
+            )
+
+    return cl.get_query_string(params)
 
 
 @register.simple_tag
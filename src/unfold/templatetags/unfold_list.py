@@ -1,5 +1,6 @@
 import datetime
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from operator import attrgetter
 from typing import Any
 
 from django import VERSION as DJANGO_VERSION
@@ -13,26 +14,34 @@ from django.contrib.admin.templatetags.admin_list import (
 )
 from django.contrib.admin.templatetags.admin_urls import add_preserved_filters
 from django.contrib.admin.templatetags.base import InclusionAdminNode
-from django.contrib.admin.utils import label_for_field, lookup_field
+from django.contrib.admin.utils import (
+    FieldIsAForeignKeyColumnName,
+    _get_non_gfk_field,  # ty:ignore[unresolved-import]
+    label_for_field,
+    lookup_field,
+)
 from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, SEARCH_VAR, ChangeList
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
 from django.db import models
 from django.db.models import Model
 from django.forms import ModelForm
 from django.template import Library
 from django.template.base import Parser, Token
 from django.template.loader import get_template, render_to_string
-from django.urls import NoReverseMatch
+from django.urls import NoReverseMatch, reverse
 from django.utils.html import format_html
 from django.utils.safestring import SafeText, mark_safe
 from django.utils.translation import gettext_lazy as _
 
+from unfold.dataclasses import ListColumn
+from unfold.templatetags.unfold import format_result_count
 from unfold.utils import (
     display_for_dropdown,
     display_for_field,
     display_for_header,
     display_for_label,
     display_for_value,
+    get_filter_index,
 )
 from unfold.views import DatasetChangeList
 from unfold.widgets import UnfoldBooleanWidget
@@ -43,6 +52,8 @@ LINK_CLASSES = [
     "text-important",
 ]
 
+LINK_CLASS = " ".join(LINK_CLASSES)
+
 TABLE_CELL_CLASSES = [
     "align-middle",
     "border-t",
@@ -179,78 +190,147 @@ def result_headers(cl):
         }
 
 
-def items_for_result(  # noqa: PLR0915, PLR0912
-    cl: ChangeList, result: Model, form
-) -> Generator[SafeText, None, None]:
-    def link_in_col(is_first: bool, field_name: str, cl: ChangeList) -> bool:
-        if cl.list_display_links is None:
-            return False
-        if is_first and not cl.list_display_links:
-            return True
-        return field_name in cl.list_display_links
+def get_list_columns(cl: ChangeList) -> list[ListColumn]:
+    """
+    Fields, display options and classes of the changelist columns resolved once
+    per changelist instead of once per cell.
+    """
+    if hasattr(cl, "_unfold_list_columns"):
+        return cl._unfold_list_columns
 
+    model_admin = cl.model_admin
+    empty_value_display = model_admin.get_empty_value_display()
+    ordering_field = getattr(model_admin, "ordering_field", None)
+    hide_ordering_field = getattr(model_admin, "hide_ordering_field", False)
     first = True
-    pk = cl.lookup_opts.pk.attname
-
-    for field_index, field_name in enumerate(cl.list_display):
-        empty_value_display = cl.model_admin.get_empty_value_display()
-        ordering_field = getattr(cl.model_admin, "ordering_field", None)
-        hide_ordering_field = getattr(cl.model_admin, "hide_ordering_field", False)
-
-        row_classes = [
-            f"field-{_coerce_field_name(field_name, field_index)}",
-            *TABLE_CELL_CLASSES,
-        ]
-
-        try:
-            f, attr, value = lookup_field(field_name, result, cl.model_admin)
-        except ObjectDoesNotExist:
-            result_repr = empty_value_display
+    columns = []
+
+    for index, name in enumerate(cl.list_display):
+        field, attr, get_value = _get_list_column_lookup(cl, name)
+        classes = [f"field-{_coerce_field_name(name, index)}", *TABLE_CELL_CLASSES]
+        nowrap = False
+
+        if field is None or field.auto_created:
+            if name == "action_checkbox":
+                classes = list(TABLE_ACTION_CELL_CLASSES)
         else:
-            empty_value_display = getattr(
-                attr, "empty_value_display", empty_value_display
+            nowrap = isinstance(
+                field, models.DateField | models.TimeField | models.ForeignKey
             )
-            if f is None or f.auto_created:
-                if field_name == "action_checkbox":
-                    row_classes = TABLE_ACTION_CELL_CLASSES
-                boolean = getattr(attr, "boolean", False)
-                label = getattr(attr, "label", False)
-                header = getattr(attr, "header", False)
-                dropdown = getattr(attr, "dropdown", False)
-
-                if label:
-                    result_repr = display_for_label(value, empty_value_display, label)
-                elif dropdown:
-                    result_repr = display_for_dropdown(
-                        result, field_name, value, empty_value_display
-                    )
-                elif header:
-                    result_repr = display_for_header(value, empty_value_display)
-                else:
-                    result_repr = display_for_value(value, empty_value_display, boolean)
 
-                if isinstance(value, datetime.date | datetime.time):
-                    row_classes.append("nowrap")
-            else:
-                if isinstance(f.remote_field, models.ManyToOneRel):
-                    field_val = getattr(result, f.name)
-                    if field_val is None:
-                        result_repr = empty_value_display
-                    else:
-                        result_repr = field_val
-                else:
-                    result_repr = display_for_field(value, f, empty_value_display)
-                if isinstance(
-                    f, models.DateField | models.TimeField | models.ForeignKey
-                ):
-                    row_classes.append("nowrap")
-
-        # If list_display_links not defined, add the link tag to the first field
-
-        if link_in_col(first, field_name, cl):
+        is_link = cl.list_display_links is not None and (
+            (first and not cl.list_display_links) or name in cl.list_display_links
+        )
+        table_tag = "td"
+
+        if is_link:
             table_tag = "th" if first else "td"
             first = False
+        elif ordering_field and name == ordering_field and hide_ordering_field:
+            classes.append("!hidden")
+
+        columns.append(
+            ListColumn(
+                index=index,
+                name=name,
+                get_value=get_value,
+                classes=" ".join(classes),
+                empty_value_display=getattr(
+                    attr, "empty_value_display", empty_value_display
+                ),
+                field=field,
+                attr=attr,
+                is_link=is_link,
+                table_tag=table_tag,
+                boolean=getattr(attr, "boolean", False),
+                label=getattr(attr, "label", False),
+                header=getattr(attr, "header", False),
+                dropdown=getattr(attr, "dropdown", False),
+                nowrap=nowrap,
+            )
+        )
+
+    cl._unfold_list_columns = columns
+
+    return columns
+
+
+def _get_list_column_lookup(
+    cl: ChangeList, name: Any
+) -> tuple[Any, Any, Callable[[Model], Any]]:
+    """
+    Same resolution as lookup_field(), done once per column. Values of plain
+    fields, callables and model admin methods are read directly, other names
+    are resolved by lookup_field() for each row.
+    """
+    try:
+        field = _get_non_gfk_field(cl.model._meta, name)
+    except (FieldDoesNotExist, FieldIsAForeignKeyColumnName):
+        if callable(name):
+            return None, name, name
+
+        if hasattr(cl.model_admin, name) and name != "__str__":
+            attr = getattr(cl.model_admin, name)
+            return None, attr, attr
+
+        def get_value(result: Model) -> Any:
+            return lookup_field(name, result, cl.model_admin)[2]
+
+        return None, getattr(cl.model, name, None), get_value
+
+    return field, None, attrgetter(name)
+
+
+def _get_class_attribute(column: ListColumn, extra_classes: list[str]) -> SafeText:
+    if extra_classes:
+        return mark_safe(f' class="{column.classes} {" ".join(extra_classes)}"')
+
+    return mark_safe(f' class="{column.classes}"')
+
+
+def _get_result_repr(
+    cl: ChangeList, column: ListColumn, result: Model
+) -> tuple[Any, list[str]]:
+    empty_value_display = column.empty_value_display
+    extra_classes = []
+
+    try:
+        value = column.get_value(result)
+    except ObjectDoesNotExist:
+        return cl.model_admin.get_empty_value_display(), extra_classes
+
+    if column.field is None or column.field.auto_created:
+        if column.label:
+            result_repr = display_for_label(value, empty_value_display, column.label)
+        elif column.dropdown:
+            result_repr = display_for_dropdown(
+                result, column.name, value, empty_value_display
+            )
+        elif column.header:
+            result_repr = display_for_header(value, empty_value_display)
+        else:
+            result_repr = display_for_value(value, empty_value_display, column.boolean)
+
+        if isinstance(value, datetime.date | datetime.time):
+            extra_classes.append("nowrap")
+    elif isinstance(column.field.remote_field, models.ManyToOneRel):
+        result_repr = empty_value_display if value is None else value
+    else:
+        result_repr = display_for_field(value, column.field, empty_value_display)
 
+    if column.nowrap:
+        extra_classes.append("nowrap")
+
+    return result_repr, extra_classes
+
+
+def items_for_result(
+    cl: ChangeList, result: Model, form
+) -> Generator[SafeText, None, None]:
+    for column in get_list_columns(cl):
+        result_repr, extra_classes = _get_result_repr(cl, column, result)
+
+        if column.is_link:
             # Display link to the result's change_view if the url exists, else
             # display just the result's representation.
             try:
@@ -263,67 +343,55 @@ def items_for_result(  # noqa: PLR0915, PLR0912
                 )
                 # Convert the pk to something that can be used in Javascript.
                 # Problem cases are non-ASCII strings.
-                if cl.to_field:
-                    attr = str(cl.to_field)
-                else:
-                    attr = pk
-                value = result.serializable_value(attr)
+                attr = str(cl.to_field) if cl.to_field else cl.lookup_opts.pk.attname
                 link_or_text = format_html(
                     '<a href="{}" class="{}" {}>{}</a>',
                     url,
-                    " ".join(LINK_CLASSES),
-                    format_html(' data-popup-opener="{}"', value)
+                    LINK_CLASS,
+                    format_html(
+                        ' data-popup-opener="{}"', result.serializable_value(attr)
+                    )
                     if cl.is_popup
                     else "",
                     result_repr,
                 )
-            row_class = mark_safe(f' class="{" ".join(row_classes)}"')
+
             yield format_html(
                 "<{}{}>{}</{}>",
-                table_tag,
-                row_class,
+                column.table_tag,
+                _get_class_attribute(column, extra_classes),
                 link_or_text,
-                table_tag,
+                column.table_tag,
             )
-        else:
-            # By default the fields come from ModelAdmin.list_editable, but if we pull
-            # the fields out of the form instead of list_editable custom admins
-            # can provide fields on a per request basis
-            if (
-                form
-                and field_name in form.fields
-                and not (
-                    field_name == cl.model._meta.pk.name
-                    and form[cl.model._meta.pk.name].is_hidden
-                )
-            ):
-                bf = form[field_name]
-                result_repr = mark_safe(
-                    str(bf)
-                    + render_to_string(
-                        "unfold/helpers/form_errors.html", {"errors": bf.errors}
-                    )
-                )
-
-                row_classes += ["group", "errors"] if bf.errors else []
+            continue
 
-            if ordering_field and field_name == ordering_field and hide_ordering_field:
-                row_classes.append("!hidden")
+        # By default the fields come from ModelAdmin.list_editable, but if we pull
+        # the fields out of the form instead of list_editable custom admins
+        # can provide fields on a per request basis
+        if (
+            form
+            and column.name in form.fields
+            and not (
+                column.name == cl.model._meta.pk.name
+                and form[cl.model._meta.pk.name].is_hidden
+            )
+        ):
+            bf = form[column.name]
+            result_repr = mark_safe(
+                str(bf)
+                + render_to_string(
+                    "unfold/helpers/form_errors.html", {"errors": bf.errors}
+                )
+            )
 
-            row_class = mark_safe(f' class="{" ".join(row_classes)}"')
+            if bf.errors:
+                extra_classes += ["group", "errors"]
 
-            if field_index != 0:
-                yield format_html(
-                    "<td{}>{}</td>",
-                    row_class,
-                    result_repr,
-                )
-            else:
-                yield format_html(
-                    "<td{}>{}</td>",
-                    row_class,
-                    result_repr,
-                )
+        yield format_html(
+            "<td{}>{}</td>",
+            _get_class_attribute(column, extra_classes),
+            result_repr,
+        )
 
     # TODO: find out when this line of code is executed
     if form and not form[cl.model._meta.pk.name].is_hidden:  # pragma: no cover
@@ -423,10 +491,23 @@ def paginator_number(cl: ChangeList, i: str | int) -> str | SafeText:
 
 def unfold_search_form(cl):
     model_name = cl.model_admin.model._meta.model_name
+    full_result_paginator = getattr(cl, "full_result_paginator", None)
+
+    # Exact counts are already displayed in the header, only capped or estimated
+    # counts are repeated next to the search
+    is_approximate = any(
+        getattr(paginator, "is_capped", False)
+        or getattr(paginator, "is_estimated", False)
+        for paginator in [cl.paginator, full_result_paginator]
+    )
 
     return {
         "cl": cl,
-        "show_result_count": cl.result_count != cl.full_result_count,
+        "show_result_count": is_approximate and cl.result_count != cl.full_result_count,
+        "result_count": format_result_count(cl.result_count, cl.paginator),
+        "full_result_count": format_result_count(
+            cl.full_result_count, full_result_paginator
+        ),
         "search_var": f"{model_name}-{SEARCH_VAR}",
         "is_popup_var": IS_POPUP_VAR,
         "is_facets_var": IS_FACETS_VAR,
@@ -449,6 +530,24 @@ def unfold_admin_list_filter(
     if field_path:
         options = getattr(cl.model_admin, "list_filter_options", {}).get(field_path, {})
 
+    if not horizontal_layout and _is_list_filter_lazy(cl, spec, field_path):
+        site_name = cl.model_admin.admin_site.name
+        url = reverse(
+            f"{site_name}:{cl.opts.app_label}_{cl.opts.model_name}_filter",
+            args=[field_path, get_filter_index(cl.filter_specs, spec)],
+            current_app=site_name,
+        )
+
+        return render_to_string(
+            "unfold/helpers/change_list_filter_lazy.html",
+            {
+                "title": spec.title,
+                "url": f"{url}{cl.get_query_string()}",
+                "label": options.get("label"),
+                "has_label": "label" in options,
+            },
+        )
+
     return tpl.render(
         {
             "title": spec.title,
@@ -461,6 +560,15 @@ def unfold_admin_list_filter(
     )
 
 
+def _is_list_filter_lazy(
+    cl: ChangeList, spec: SimpleListFilter, field_path: str | None
+) -> bool:
+    if not hasattr(cl.model_admin, "is_list_filter_lazy"):
+        return False
+
+    return cl.model_admin.is_list_filter_lazy(spec.request, field_path)
+
+
 @register.filter
 def unfold_horizontal_filters(cl: ChangeList) -> list[SimpleListFilter]:
     specs = []
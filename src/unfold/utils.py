@@ -5,14 +5,20 @@ from collections.abc import Callable, Iterable
 from typing import Any
 
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.db import models
 from django.db.models import Model
-from django.template.loader import render_to_string
+from django.dispatch import receiver
+from django.template import Context, Template
+from django.template.base import render_value_in_context
+from django.template.loader import get_template, render_to_string
 from django.utils import formats, timezone
+from django.utils.autoreload import file_changed
 from django.utils.hashable import make_hashable
 from django.utils.html import format_html
 from django.utils.module_loading import import_string
 from django.utils.safestring import SafeString, SafeText, mark_safe
+from django.utils.translation import get_language
 
 from unfold.exceptions import UnfoldException
 from unfold.settings import get_config
@@ -25,8 +31,103 @@ except ImportError:
     Money: type[Money] | None = None
 
 
+def is_async_views_enabled(settings_name: str = "UNFOLD") -> bool:
+    """
+    Whether to use the async variants of the views, enabled by the ASYNC_VIEWS
+    setting. The views are picked when the URLs are loaded, usually before the
+    first request shows whether the server speaks ASGI, so the setting is not
+    derived from the handler.
+    """
+    return bool(get_config(settings_name)["ASYNC_VIEWS"])
+
+
+_LABEL_PLACEHOLDER = "__unfold_label__"
+
+# Rendered fragments of the helper templates which have only a few possible
+# outputs, filled on first use and cleared when the templates change
+_boolean_icons: dict[tuple[bool | None, str | None], str] = {}
+_label_fragments: dict[tuple[Any, bool], tuple[str, str]] = {}
+_compiled_templates: dict[str, Template] = {}
+
+# Only provides the autoescape and localization flags to render_value_in_context()
+_render_context = Context()
+
+
+@receiver(setting_changed)
+def reset_rendered_fragments(setting: str, **kwargs: Any) -> None:
+    if setting == "TEMPLATES":
+        clear_rendered_fragments()
+
+
+@receiver(file_changed)
+def reset_rendered_fragments_on_file_change(**kwargs: Any) -> None:
+    clear_rendered_fragments()
+
+
+def clear_rendered_fragments() -> None:
+    _boolean_icons.clear()
+    _label_fragments.clear()
+    _compiled_templates.clear()
+
+
+def _get_compiled_template(template_name: str) -> Template:
+    if template_name not in _compiled_templates:
+        _compiled_templates[template_name] = get_template(template_name).template
+
+    return _compiled_templates[template_name]
+
+
+def get_filter_field_path(spec: Any) -> str | None:
+    """
+    Identifies the list filter in list_filter_options and in the URL of the
+    lazy filter view.
+    """
+    if hasattr(spec, "field_path"):
+        return spec.field_path
+
+    return getattr(spec, "parameter_name", None)
+
+
+def get_filter_index(filter_specs: Iterable[Any], spec: Any) -> int:
+    """
+    Several filters can use the same field path, the index of the filter among
+    them tells them apart in the URLs of the lazy filter and filter search views.
+    """
+    field_path = get_filter_field_path(spec)
+    specs = [s for s in filter_specs if get_filter_field_path(s) == field_path]
+
+    # Matched by type, facets of Django filters can recreate the filter specs
+    return next((i for i, s in enumerate(specs) if type(s) is type(spec)), 0)
+
+
 def _boolean_icon(field_val: Any) -> str:
-    return render_to_string("unfold/helpers/boolean.html", {"value": field_val})
+    state = None if field_val is None or field_val == "" else bool(field_val)
+    key = (state, get_language())
+
+    if key not in _boolean_icons:
+        _boolean_icons[key] = render_to_string(
+            "unfold/helpers/boolean.html", {"value": state}
+        )
+
+    return _boolean_icons[key]
+
+
+def _get_label_fragments(label_type: Any, multiple: bool) -> tuple[str, str]:
+    key = (label_type, multiple)
+
+    if key not in _label_fragments:
+        html = render_to_string(
+            "unfold/helpers/display_label.html",
+            {
+                "label": [_LABEL_PLACEHOLDER] if multiple else _LABEL_PLACEHOLDER,
+                "label_type": label_type,
+                "multiple": multiple,
+            },
+        )
+        prefix, suffix = html.split(_LABEL_PLACEHOLDER)
+        _label_fragments[key] = (prefix, suffix)
+
+    return _label_fragments[key]
 
 
 def display_for_header(value: Iterable, empty_value_display: str) -> SafeText:
@@ -34,11 +135,8 @@ def display_for_header(value: Iterable, empty_value_display: str) -> SafeText:
         raise UnfoldException("Display header requires list or tuple")
 
     return mark_safe(
-        render_to_string(
-            "unfold/helpers/display_header.html",
-            {
-                "value": value,
-            },
+        _get_compiled_template("unfold/helpers/display_header.html").render(
+            Context({"value": value})
         )
     )
 
@@ -73,14 +171,20 @@ def display_for_label(value: Any, empty_value_display: str, label: Any) -> SafeT
     if isinstance(value, tuple) or isinstance(value, list):
         multiple = True
 
+    if not value:
+        return mark_safe(
+            render_to_string(
+                "unfold/helpers/display_label.html",
+                {"label": value, "label_type": label_type, "multiple": multiple},
+            )
+        )
+
+    prefix, suffix = _get_label_fragments(label_type, multiple)
+
     return mark_safe(
-        render_to_string(
-            "unfold/helpers/display_label.html",
-            {
-                "label": value,
-                "label_type": label_type,
-                "multiple": multiple,
-            },
+        "".join(
+            f"{prefix}{render_value_in_context(item, _render_context)}{suffix}"
+            for item in (value if multiple else [value])
         )
     )
 
@@ -262,3 +366,42 @@ def resolve_setting_value(value: str | Callable | None, *args: Any) -> Any:
         return value(*args)
 
     return value
+
+
+def get_path_segments(path: str) -> tuple[str, ...]:
+    return tuple(segment for segment in path.split("/") if segment)
+
+
+class PathTrie:
+    """
+    URL paths split into segments. Matching a request path returns every value
+    registered under a path which is a prefix of it, in a single walk.
+    """
+
+    def __init__(self) -> None:
+        self.root: dict[str | None, Any] = {}
+
+    def insert(self, path: str, value: Any, exact: bool = False) -> None:
+        node = self.root
+
+        for segment in get_path_segments(path):
+            node = node.setdefault(segment, {})
+
+        node.setdefault(None, []).append((exact, value))
+
+    def match(self, path: str) -> list[tuple[int, Any]]:
+        segments = get_path_segments(path)
+        node = self.root
+        matches = []
+
+        for depth in range(len(segments) + 1):
+            for exact, value in node.get(None, []):
+                if not exact or depth == len(segments):
+                    matches.append((depth, value))
+
+            if depth == len(segments) or segments[depth] not in node:
+                break
+
+            node = node[segments[depth]]
+
+        return matches
@@ -1,27 +1,365 @@
+import time
+from asyncio import iscoroutine
+from collections.abc import Callable
+from threading import Thread
 from typing import TYPE_CHECKING, Any
 
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.admin import AdminSite
-from django.contrib.admin.filters import ListFilter
+from django.contrib.admin.filters import FacetsMixin, ListFilter
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.utils import lookup_spawns_duplicates
 from django.contrib.admin.views.main import ChangeList as BaseChangeList
 from django.contrib.auth.mixins import PermissionRequiredMixin
-from django.db.models import QuerySet
-from django.http import HttpRequest, JsonResponse
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Model, QuerySet
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
+from django.utils.translation import gettext_lazy as _
 from django.views import View
 from django.views.generic import ListView
 from django.views.generic.base import ContextMixin
 
+from unfold.cache import (
+    get_cache_key,
+    get_model_version,
+    get_or_set_once,
+)
 from unfold.exceptions import UnfoldException
 from unfold.forms import DatasetChangeListSearchForm
+from unfold.paginator import CURSOR_VAR, CappedCountPaginator
+from unfold.utils import get_filter_field_path, is_async_views_enabled
 
 if TYPE_CHECKING:
     from django.contrib.admin.options import ModelAdmin
 
 
+FACET_REFRESH_LOCK_TIMEOUT = 300
+
+# Set on requests of the lazy filter view to the field path of the rendered filter
+LIST_FILTER_ATTR = "unfold_list_filter"
+
+# Sent by select2 to the filter search view, they are not changelist lookups
+LIST_FILTER_SEARCH_PARAMS = ("term", "page", "app_label", "model_name", "field_name")
+
+
+class ApproximateCount(int):
+    """
+    Count rendered with the "~" prefix, so facet counts served from a stale
+    cache are marked in the filter labels without changes in the filters.
+    """
+
+    def __str__(self) -> str:
+        return f"~{int(self)}"
+
+    def __format__(self, format_spec: str) -> str:
+        return f"~{format(int(self), format_spec)}"
+
+
+def _aggregate_facet_queries(queries: list[tuple[QuerySet, dict]]) -> dict[str, int]:
+    values = {}
+
+    for queryset, aggregates in queries:
+        values.update(queryset.aggregate(**aggregates))
+
+    return values
+
+
+def _get_facet_cache_entry(
+    queries: list[tuple[QuerySet, dict]], version: int, timeout: int
+) -> tuple[int, float, dict[str, int]]:
+    return version, time.time() + timeout, _aggregate_facet_queries(queries)
+
+
+def _refresh_facet_counts(
+    key: str,
+    queries: list[tuple[QuerySet, dict]],
+    version: int,
+    timeout: int,
+    stale_timeout: int | None,
+) -> None:
+    try:
+        cache.set(key, _get_facet_cache_entry(queries, version, timeout), stale_timeout)
+    finally:
+        cache.delete(f"{key}_refresh")
+        # The thread has its own database connections
+        connections.close_all()
+
+
 class ChangeList(BaseChangeList):
+    full_result_paginator: Paginator | None = None
+    facet_counts_approximate = False
+
     def __init__(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
+        self.filter_field_path = getattr(request, LIST_FILTER_ATTR, None)
         super().__init__(request, *args, **kwargs)
 
+    def get_results(self, request: HttpRequest) -> None:
+        if self.filter_field_path is not None:
+            self.get_empty_results()
+            return
+
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        # Get the number of objects, with admin filters applied.
+        result_count = paginator.count
+
+        # Get the total number of objects, with no admin filters applied.
+        full_result_count = self.get_full_result_count(request, paginator)
+        can_show_all = result_count <= self.list_max_show_all
+        multi_page = result_count > self.list_per_page
+
+        # Get the list of objects to display on this page.
+        if (self.show_all and can_show_all) or not multi_page:
+            result_list = self.queryset._clone()
+        else:
+            try:
+                result_list = paginator.page(self.page_num).object_list
+            except InvalidPage as e:
+                raise IncorrectLookupParameters from e
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        # Admin actions are shown if there is at least one entry
+        # or if entries are not counted because show_full_result_count is disabled
+        self.show_admin_actions = not self.show_full_result_count or bool(
+            full_result_count
+        )
+        self.full_result_count = full_result_count
+        self.result_list = result_list
+        self.can_show_all = can_show_all
+        self.multi_page = multi_page
+        self.paginator = paginator
+
+    def get_empty_results(self) -> None:
+        """
+        The lazy filter view renders a single filter, so the results are not
+        counted nor loaded.
+        """
+        self.paginator = None
+        self.result_count = 0
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = False
+        self.result_list = self.queryset.none()
+        self.can_show_all = True
+        self.multi_page = False
+
+    def get_full_result_count(
+        self, request: HttpRequest, paginator: Paginator
+    ) -> int | None:
+        """
+        With CappedCountPaginator the unfiltered queryset is counted by another
+        instance of the paginator, so the total respects the cap as well. When
+        the model admin sets full_result_count_cache_timeout, the total is cached
+        until the timeout expires or an object of the model is saved or deleted.
+        """
+        if not self.model_admin.show_full_result_count:
+            return None
+
+        timeout = self.model_admin.full_result_count_cache_timeout
+
+        if timeout is None:
+            count, _counted = self._count_full_results(request, paginator)
+            return count
+
+        try:
+            sql = str(self.root_queryset.query)
+        except EmptyResultSet:
+            return 0
+
+        key = get_cache_key(
+            "unfold_full_result_count",
+            self.opts.label_lower,
+            type(paginator).__name__,
+            sql,
+            models=(self.model,),
+        )
+        count, counted = get_or_set_once(
+            key, lambda: self._count_full_results(request, paginator), timeout
+        )
+
+        if counted is not None and self.full_result_paginator is None:
+            self.full_result_paginator = self._get_full_result_paginator(request)
+            self.full_result_paginator._counted = counted
+
+        return count
+
+    def _count_full_results(
+        self, request: HttpRequest, paginator: Paginator
+    ) -> tuple[int, tuple | None]:
+        if isinstance(paginator, CappedCountPaginator):
+            self.full_result_paginator = self._get_full_result_paginator(request)
+
+            return (
+                self.full_result_paginator.count,
+                self.full_result_paginator._counted,
+            )
+
+        return self.root_queryset.count(), None
+
+    def _get_full_result_paginator(self, request: HttpRequest) -> Paginator:
+        return self.model_admin.get_paginator(
+            request, self.root_queryset.order_by("pk"), self.list_per_page
+        )
+
+    def get_filters_params(self, params: dict | None = None) -> dict:
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+
+        return lookup_params
+
+    def get_query_string(
+        self, new_params: dict | None = None, remove: list | None = None
+    ) -> str:
+        # Cursor of KeysetPaginator is valid only for the current filters, ordering
+        # and page, so links keep it only when it is set explicitly
+        return super().get_query_string(
+            {CURSOR_VAR: None, **(new_params or {})}, remove
+        )
+
+    def get_facet_counts(self, filter_spec: ListFilter) -> dict[str, int]:
+        """
+        Facet counts of the filters reading them from the changelist are computed
+        together on the first call. Filters without active parameters share one
+        aggregate query over the changelist queryset. Active filters, which are
+        counted without their own parameters, and filters spanning multi-valued
+        relations, whose joins would multiply the counts of others, get one query
+        each.
+        """
+        if not hasattr(self, "_unfold_facet_counts"):
+            self._unfold_facet_counts = self._get_facet_counts()
+
+        if filter_spec not in self._unfold_facet_counts:
+            return FacetsMixin.get_facet_queryset(filter_spec, self)
+
+        return self._unfold_facet_counts[filter_spec]
+
+    def _get_facet_counts(self) -> dict[ListFilter, dict[str, int]]:
+        filter_specs = self.filter_specs
+        queries, aliases = self._get_facet_queries(filter_specs)
+
+        # get_queryset() creates new filter instances, the rendered ones are kept
+        self.filter_specs = filter_specs
+
+        if self.model_admin.facets_cache_timeout is None:
+            values = _aggregate_facet_queries(queries)
+        else:
+            values = self._get_cached_facet_values(queries, aliases)
+
+        return {
+            filter_spec: {key: values[alias] for key, alias in spec_aliases.items()}
+            for filter_spec, spec_aliases in aliases.items()
+        }
+
+    def _get_facet_queries(
+        self, filter_specs: list[ListFilter]
+    ) -> tuple[list[tuple[QuerySet, dict]], dict[ListFilter, dict[str, str]]]:
+        queries = []
+        shared = {}
+        aliases = {}
+
+        for index, filter_spec in enumerate(filter_specs):
+            if not getattr(filter_spec, "facets_from_changelist", False):
+                continue
+
+            if self.filter_field_path not in (
+                None,
+                get_filter_field_path(filter_spec),
+            ):
+                continue
+
+            if self._is_facet_shared(filter_spec):
+                queryset = self.queryset
+            else:
+                queryset = self.get_queryset(
+                    filter_spec.request,
+                    exclude_parameters=filter_spec.expected_parameters(),
+                )
+
+            counts = filter_spec.get_facet_counts(self.pk_attname, queryset)
+            aliases[filter_spec] = {key: f"f{index}_{key}" for key in counts}
+            aggregates = {aliases[filter_spec][key]: c for key, c in counts.items()}
+
+            if queryset is self.queryset:
+                shared.update(aggregates)
+            elif aggregates:
+                queries.append((queryset, aggregates))
+
+        if shared:
+            queries.insert(0, (self.queryset, shared))
+
+        return queries, aliases
+
+    def _is_facet_shared(self, filter_spec: ListFilter) -> bool:
+        if set(filter_spec.expected_parameters()) & set(self.get_filters_params()):
+            return False
+
+        field_path = getattr(filter_spec, "field_path", None)
+
+        return field_path is None or not lookup_spawns_duplicates(
+            self.lookup_opts, field_path
+        )
+
+    def _get_cached_facet_values(
+        self,
+        queries: list[tuple[QuerySet, dict]],
+        aliases: dict[ListFilter, dict[str, str]],
+    ) -> dict[str, int]:
+        """
+        Counts are cached per model, active filter parameters and SQL of the
+        changelist queryset. Once facets_cache_timeout expires, an object of the
+        model changes or new choices appear, the stale counts are still served,
+        marked as approximate, while a background thread recomputes them.
+        """
+        try:
+            sql = str(self.queryset.query)
+        except EmptyResultSet:
+            return _aggregate_facet_queries(queries)
+
+        version = get_model_version(self.model)
+        timeout = self.model_admin.facets_cache_timeout
+        stale_timeout = self.model_admin.facets_cache_stale_timeout
+        key = get_cache_key(
+            "unfold_facet_counts",
+            self.opts.label_lower,
+            sorted(self.get_filters_params().items()),
+            sql,
+            self.filter_field_path,
+        )
+        entry_version, expires, values = get_or_set_once(
+            key,
+            lambda: _get_facet_cache_entry(queries, version, timeout),
+            stale_timeout,
+        )
+
+        expected = [
+            a for spec_aliases in aliases.values() for a in spec_aliases.values()
+        ]
+
+        if (
+            entry_version == version
+            and expires > time.time()
+            and all(alias in values for alias in expected)
+        ):
+            return values
+
+        if cache.add(f"{key}_refresh", 1, timeout=FACET_REFRESH_LOCK_TIMEOUT):
+            Thread(
+                target=_refresh_facet_counts,
+                args=(key, queries, version, timeout, stale_timeout),
+                daemon=True,
+            ).start()
+
+        self.facet_counts_approximate = True
+
+        # Choices added since the counts were cached are displayed as ~0
+        return {alias: ApproximateCount(values.get(alias, 0)) for alias in expected}
+
 
 class DatasetChangeList(ChangeList):
     is_dataset = True
@@ -129,21 +467,126 @@ class UnfoldModelAdminViewMixin(PermissionRequiredMixin, ContextMixin, View):
 class BaseAutocompleteView(ListView):
     paginate_by = 20
 
+    # None follows the ASYNC_VIEWS setting of the admin site passed to as_view()
+    async_enabled: bool | None = None
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Callable:
+        async_enabled = cls.async_enabled
+
+        if async_enabled is None:
+            admin_site = initkwargs.get("admin_site") or getattr(
+                initkwargs.get("model_admin"), "admin_site", None
+            )
+            async_enabled = is_async_views_enabled(
+                getattr(admin_site, "settings_name", "UNFOLD")
+            )
+
+        view_class = cls
+
+        if async_enabled and cls.get is BaseAutocompleteView.get:
+            view_class = type(
+                cls.__name__,
+                (cls,),
+                {
+                    "__module__": cls.__module__,
+                    "__qualname__": cls.__qualname__,
+                    "get": cls.aget,
+                    "dispatch": cls.adispatch,
+                    "sync_dispatch": cls.dispatch,
+                },
+            )
+
+        return super(BaseAutocompleteView, view_class).as_view(**initkwargs)
+
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> JsonResponse:
         super().get(request, *args, **kwargs)
         context = self.get_context_data()
 
+        return self.get_json_response(
+            context["object_list"], context["page_obj"].has_next()
+        )
+
+    async def adispatch(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        """
+        Permission checks in dispatch() usually load the user from the database,
+        so dispatch() runs in a thread while aget() runs in the event loop.
+        """
+        response = await sync_to_async(self.sync_dispatch)(request, *args, **kwargs)
+
+        if iscoroutine(response):
+            response = await response
+
+        return response
+
+    async def aget(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> JsonResponse:
+        """
+        Async variant of get() counting and fetching the results with the async
+        ORM. Results are rendered in a thread because str() of an object may
+        query related objects.
+        """
+        self.object_list = await sync_to_async(self.get_queryset)()
+        page_size = self.get_paginate_by(self.object_list)
+        page_number = (
+            self.kwargs.get(self.page_kwarg)
+            or self.request.GET.get(self.page_kwarg)
+            or 1
+        )
+
+        try:
+            page_number = int(page_number)
+        except ValueError as e:
+            raise Http404(_("Invalid page.")) from e
+
+        if page_number < 1:
+            raise Http404(_("Invalid page."))
+
+        offset = (page_number - 1) * page_size
+        count = await self.object_list.acount()
+        objects = [
+            obj
+            async for obj in self.object_list[offset : offset + page_size].aiterator()
+        ]
+
+        return await sync_to_async(self.get_json_response)(
+            objects, offset + page_size < count
+        )
+
+    def get_json_response(self, objects: list[Model], has_next: bool) -> JsonResponse:
         return JsonResponse(
             {
-                "results": [
-                    {
-                        "id": str(obj.pk),
-                        "text": str(obj),
-                    }
-                    for obj in context["object_list"]
-                ],
+                "results": [self.get_result(obj) for obj in objects],
                 "pagination": {
-                    "more": context["page_obj"].has_next(),
+                    "more": has_next,
                 },
             }
         )
+
+    def get_result(self, obj: Model) -> dict[str, str]:
+        return {
+            "id": str(obj.pk),
+            "text": str(obj),
+        }
+
+
+class ListFilterSearchView(BaseAutocompleteView):
+    """
+    Searches the values of a list filter with max_choices in the same JSON as
+    the admin autocomplete, so the select of the filter is loaded by select2.
+    """
+
+    async_enabled = False
+    model_admin: "ModelAdmin | None" = None
+    filter_spec: ListFilter | None = None
+
+    def get_queryset(self) -> QuerySet:
+        return self.filter_spec.get_search_queryset(  # ty:ignore[unresolved-attribute]
+            self.request, self.model_admin, self.request.GET.get("term", "")
+        )
+
+    def get_result(self, obj: Any) -> dict[str, str]:
+        return self.filter_spec.get_search_result(obj)  # ty:ignore[unresolved-attribute]
@@ -0,0 +1,123 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from example.models import Tag
+
+from unfold.cache import (
+    aget_or_set_once,
+    bump_model_version,
+    get_model_versions,
+    get_or_set_once,
+)
+
+
+def test_get_or_set_once_computes_missing_value(mocker):
+    cache.clear()
+    default = mocker.Mock(return_value="computed")
+
+    assert get_or_set_once("unfold_test", default, timeout=60) == "computed"
+    assert get_or_set_once("unfold_test", default, timeout=60) == "computed"
+    default.assert_called_once()
+    assert cache.get("unfold_test_lock") is None
+
+
+def test_get_or_set_once_skips_rejected_value(mocker):
+    cache.clear()
+    default = mocker.Mock(return_value="partial")
+
+    for _attempt in range(2):
+        assert (
+            get_or_set_once(
+                "unfold_test", default, timeout=60, should_cache=lambda _: False
+            )
+            == "partial"
+        )
+
+    assert default.call_count == len(["first", "second"])
+    assert cache.get("unfold_test") is None
+    assert cache.get("unfold_test_lock") is None
+
+
+def test_get_model_versions(mocker):
+    cache.clear()
+    bump_model_version(Tag)
+    get_many = mocker.spy(cache, "get_many")
+
+    assert get_model_versions([Tag, "example.category"]) == [1, 0]
+    get_many.assert_called_once()
+
+
+def test_get_or_set_once_waits_for_lock_holder(mocker):
+    cache.clear()
+    cache.add("unfold_test_lock", 1)
+    default = mocker.Mock(return_value="computed")
+    mocker.patch(
+        "unfold.cache.time.sleep",
+        side_effect=lambda _interval: cache.set("unfold_test", "from other request"),
+    )
+
+    assert get_or_set_once("unfold_test", default, timeout=60) == "from other request"
+    default.assert_not_called()
+
+
+def test_get_or_set_once_computes_when_lock_holder_fails(mocker):
+    cache.clear()
+    cache.add("unfold_test_lock", 1)
+    default = mocker.Mock(return_value="computed")
+    mocker.patch(
+        "unfold.cache.time.sleep",
+        side_effect=lambda _interval: cache.delete("unfold_test_lock"),
+    )
+
+    assert get_or_set_once("unfold_test", default, timeout=60) == "computed"
+    default.assert_called_once()
+
+
+def test_get_or_set_once_stops_waiting_after_wait_timeout(mocker):
+    cache.clear()
+    cache.add("unfold_test_lock", 1)
+    default = mocker.Mock(return_value="computed")
+    sleep = mocker.patch("unfold.cache.time.sleep")
+    mocker.patch("unfold.cache.time.monotonic", side_effect=[0, 0.5, 1.5])
+
+    assert get_or_set_once("unfold_test", default, timeout=60) == "computed"
+    sleep.assert_called_once()
+    default.assert_called_once()
+    assert cache.get("unfold_test_lock") == 1
+
+
+def test_aget_or_set_once_computes_missing_value(mocker):
+    cache.clear()
+    default = mocker.AsyncMock(return_value="computed")
+
+    assert async_to_sync(aget_or_set_once)("unfold_test", default, 60) == "computed"
+    assert async_to_sync(aget_or_set_once)("unfold_test", default, 60) == "computed"
+    default.assert_awaited_once()
+    assert cache.get("unfold_test_lock") is None
+
+
+def test_aget_or_set_once_skips_rejected_value(mocker):
+    cache.clear()
+    default = mocker.AsyncMock(return_value="partial")
+
+    async_to_sync(aget_or_set_once)(
+        "unfold_test", default, 60, should_cache=lambda _: False
+    )
+    assert cache.get("unfold_test") is None
+    assert cache.get("unfold_test_lock") is None
+
+
+def test_aget_or_set_once_waits_for_lock_holder(mocker):
+    cache.clear()
+    cache.add("unfold_test_lock", 1)
+    default = mocker.AsyncMock(return_value="computed")
+
+    async def sleep(_interval):
+        await cache.aset("unfold_test", "from other request")
+
+    mocker.patch("unfold.cache.asyncio.sleep", side_effect=sleep)
+
+    assert (
+        async_to_sync(aget_or_set_once)("unfold_test", default, 60)
+        == "from other request"
+    )
+    default.assert_not_awaited()
@@ -1,11 +1,41 @@
+import threading
+import time
 from http import HTTPStatus
 
 import pytest
-from django.contrib.auth.models import Permission
-from django.test import override_settings
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.admin import site
+from django.contrib.auth.models import AnonymousUser, Permission
+from django.contrib.postgres.search import (
+    SearchQuery,
+    TrigramWordSimilarity,
+)
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Greatest
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
+from example.admin import TagAdmin
+from example.models import Tag
 
+from unfold.dataclasses import SearchResult
+from unfold.search import (
+    ListSearchSource,
+    ModelSearchSource,
+    PostgresSearchBackend,
+    SearchBackend,
+    SearchEngine,
+    SQLiteSearchBackend,
+    get_admin_score,
+    get_match_score,
+    get_plain_search_fields,
+    get_search_executor,
+    get_search_words,
+    statement_timeout,
+)
 from unfold.settings import CONFIG_DEFAULTS
+from unfold.sites import UnfoldAdminSite
 
 
 @pytest.mark.django_db
@@ -162,3 +192,763 @@ def test_command_allowed_models(admin_client, admin_user, tag_factory):
     ):
         response = admin_client.get(reverse("admin:search") + "?s=another-test-tag")
         assert "another-test-tag" in response.content.decode()
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+                "search_models_limit": 1,
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_models_limit(admin_client, tag_factory):
+    cache.clear()
+    tag_factory(name="limited-tag-first")
+    tag_factory(name="limited-tag-second")
+    response = admin_client.get(reverse("admin:search") + "?s=limited-tag")
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context["results"]) == 1
+    assert not response.context["results"].has_next
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_result_fields(admin_client, tag_factory, mocker):
+    cache.clear()
+    tag_factory(name="only-fields-tag")
+    mocker.patch.object(TagAdmin, "command_result_fields", ("name",), create=True)
+    only = mocker.spy(QuerySet, "only")
+    response = admin_client.get(reverse("admin:search") + "?s=only-fields-tag")
+
+    assert "only-fields-tag" in response.content.decode()
+    only.assert_called_once_with(mocker.ANY, "name")
+
+
+def test_command_search_engine_continues_from_state(mocker):
+    first = SearchResult(title="first", description="", link="", icon=None)
+    second = SearchResult(title="second", description="", link="", icon=None)
+    third = SearchResult(title="third", description="", link="", icon=None)
+
+    engine = SearchEngine(
+        [ListSearchSource(lambda: [first]), ListSearchSource(lambda: [second, third])],
+        per_page=1,
+    )
+    page = engine.get_page(1)
+
+    assert page.object_list == [first]
+    assert page.has_next
+    assert not engine.is_complete
+
+    first_callback = mocker.Mock(return_value=[first])
+    second_callback = mocker.Mock(return_value=[second, third])
+    engine = SearchEngine(
+        [ListSearchSource(first_callback), ListSearchSource(second_callback)],
+        per_page=1,
+        state=engine.state,
+    )
+    page = engine.get_page(2)
+
+    assert page.object_list == [second]
+    assert page.has_next
+    first_callback.assert_not_called()
+    second_callback.assert_called_once()
+
+    page = engine.get_page(3)
+
+    assert page.object_list == [third]
+    assert not page.has_next
+    assert page.next_page_number is None
+    assert engine.is_complete
+
+
+class SlowSearchSource(ListSearchSource):
+    concurrent = True
+
+    def __init__(self, callback, event):
+        super().__init__(callback)
+        self.event = event
+
+    def fetch(self, offset, count):
+        self.event.wait()
+        return super().fetch(offset, count)
+
+
+def test_command_search_engine_concurrent_timeout():
+    first = SearchResult(title="first", description="", link="", icon=None)
+    second = SearchResult(title="second", description="", link="", icon=None)
+    finished, blocked = threading.Event(), threading.Event()
+    finished.set()
+
+    slow_source = SlowSearchSource(lambda: [first], blocked)
+    engine = SearchEngine(
+        [slow_source, SlowSearchSource(lambda: [second], finished)],
+        per_page=10,
+        workers=2,
+        timeout=0.01,
+    )
+    page = engine.get_page(1)
+    blocked.set()
+
+    assert page.object_list == [second]
+    assert engine.timed_out == [slow_source]
+    assert engine.is_complete
+
+
+class FailingSearchSource(ListSearchSource):
+    concurrent = True
+
+    def __init__(self, delay=0):
+        super().__init__(list)
+        self.delay = delay
+
+    def fetch(self, offset, count):
+        time.sleep(self.delay)
+        raise DatabaseError("canceling statement due to statement timeout")
+
+
+def test_command_search_engine_shared_executor(mocker):
+    close_all = mocker.patch("unfold.search.connections.close_all")
+    finished = threading.Event()
+    finished.set()
+
+    assert get_search_executor(2) is get_search_executor(2)
+
+    submit = mocker.spy(get_search_executor(2), "submit")
+    engine = SearchEngine(
+        [
+            SlowSearchSource(lambda: [], finished),
+            SlowSearchSource(lambda: [], finished),
+        ],
+        per_page=10,
+        workers=2,
+    )
+    engine.get_page(1)
+
+    assert submit.call_count == len(engine.sources)
+    assert close_all.call_count == len(engine.sources)
+
+
+def test_command_search_engine_database_error():
+    engine = SearchEngine(
+        [FailingSearchSource(), FailingSearchSource()], per_page=10, workers=2
+    )
+
+    with pytest.raises(DatabaseError):
+        engine.get_page(1)
+
+    engine = SearchEngine(
+        [FailingSearchSource(delay=0.05), FailingSearchSource(delay=0.05)],
+        per_page=10,
+        workers=2,
+        timeout=0.01,
+    )
+    engine.get_page(1)
+
+    assert engine.timed_out == engine.sources
+
+
+@pytest.mark.parametrize(
+    "vendor, is_mariadb, sql, params",
+    [
+        [
+            "postgresql",
+            False,
+            "SELECT set_config('statement_timeout', %s, false)",
+            ["1500"],
+        ],
+        ["mysql", False, "SET SESSION max_execution_time = %s", [1500]],
+        ["mysql", True, "SET SESSION max_statement_time = %s", [1.5]],
+    ],
+)
+def test_command_statement_timeout(mocker, vendor, is_mariadb, sql, params):
+    database = mocker.MagicMock(vendor=vendor, mysql_is_mariadb=is_mariadb)
+    cursor = database.cursor.return_value.__enter__.return_value
+
+    with statement_timeout(database, 1.5):
+        pass
+
+    cursor.execute.assert_called_once_with(sql, params)
+
+
+@pytest.mark.django_db
+def test_command_statement_timeout_sqlite():
+    query = (
+        "WITH RECURSIVE numbers(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM numbers "
+        "WHERE n < 10000000) SELECT COUNT(*) FROM numbers"
+    )
+
+    with statement_timeout(connection, 0.001), connection.cursor() as cursor:
+        time.sleep(0.01)
+
+        with pytest.raises(DatabaseError):
+            cursor.execute(query)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+        assert cursor.fetchone() == (1,)
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.category", "example.tag"],
+                "search_models_workers": 2,
+            }
+        },
+    }
+)
+@pytest.mark.django_db(transaction=True)
+def test_command_search_models_concurrent(admin_client, category_factory, tag_factory):
+    cache.clear()
+    tag_factory(name="concurrent-tag")
+    category_factory(name="concurrent-category")
+    response = admin_client.get(reverse("admin:search") + "?s=concurrent")
+
+    assert [result.title for result in response.context["results"]] == [
+        "concurrent-category",
+        "concurrent-tag",
+    ]
+    assert response.context["timed_out_sources"] == []
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_cached_page(admin_client, tag_factory, mocker):
+    cache.clear()
+    tag_factory(name="cached-tag-first")
+    fetch = mocker.spy(ModelSearchSource, "fetch")
+
+    response = admin_client.get(reverse("admin:search") + "?s=cached-tag")
+    assert "cached-tag-first" in response.content.decode()
+    fetch.assert_called_once()
+    fetch.reset_mock()
+
+    response = admin_client.get(reverse("admin:search") + "?s=cached-tag")
+    assert "cached-tag-first" in response.content.decode()
+    fetch.assert_not_called()
+
+    # Saving a searched model invalidates cached pages
+    tag_factory(name="cached-tag-second")
+    response = admin_client.get(reverse("admin:search") + "?s=cached-tag")
+    assert "cached-tag-second" in response.content.decode()
+    fetch.assert_called_once()
+
+
+def test_command_search_models_untracked_without_search(mocker):
+    track_model_versions = mocker.patch("unfold.sites.track_model_versions")
+    site = UnfoldAdminSite(name="untracked")
+    site.register(Tag, TagAdmin)
+
+    site.get_urls()
+    track_model_versions.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "search_models,expected",
+    [
+        (["example.tag"], ("example.tag",)),
+        (True, (Tag,)),
+    ],
+)
+def test_command_search_models_tracked_with_urls(mocker, search_models, expected):
+    track_model_versions = mocker.patch("unfold.sites.track_model_versions")
+    site = UnfoldAdminSite(name="tracked")
+    site.register(Tag, TagAdmin)
+
+    with override_settings(
+        UNFOLD={**CONFIG_DEFAULTS, "COMMAND": {"search_models": search_models}}
+    ):
+        site.get_urls()
+
+    track_model_versions.assert_called_once_with(*expected)
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.category", "example.tag"],
+                "search_models_workers": 2,
+                "search_models_timeout": 0.01,
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_timed_out_page_not_cached(admin_client, mocker):
+    cache.clear()
+    get_many = mocker.spy(cache, "get_many")
+
+    def fetch(self, offset, count):
+        if self.model_admin.model is Tag:
+            time.sleep(0.05)
+
+        return [], 0, True
+
+    fetch = mocker.patch.object(
+        ModelSearchSource, "fetch", autospec=True, side_effect=fetch
+    )
+
+    response = admin_client.get(reverse("admin:search") + "?s=timeout")
+    assert len(response.context["timed_out_sources"]) == 1
+    assert get_many.call_args_list[0].args == (
+        ["unfold_model_version_example.category", "unfold_model_version_example.tag"],
+    )
+
+    # The partial page is searched again instead of being served from the cache
+    fetch.reset_mock()
+    admin_client.get(reverse("admin:search") + "?s=timeout")
+    assert fetch.call_count == len(["category", "tag"])
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_narrows_prefix_results(admin_client, tag_factory, mocker):
+    cache.clear()
+    tag_factory(name="narrow-tag")
+    tag_factory(name="narrow-other")
+    admin_client.get(reverse("admin:search") + "?s=narrow")
+    fetch = mocker.spy(ModelSearchSource, "fetch")
+
+    response = admin_client.get(reverse("admin:search") + "?s=narrow-t")
+    titles = [result.title for result in response.context["results"]]
+
+    assert "narrow-tag" in titles
+    assert "narrow-other" not in titles
+    fetch.assert_not_called()
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+                "search_models_limit": 1,
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_truncated_prefix_results(admin_client, tag_factory, mocker):
+    cache.clear()
+    tag_factory(name="truncated-first")
+    tag_factory(name="truncated-second")
+    admin_client.get(reverse("admin:search") + "?s=truncated")
+    fetch = mocker.spy(ModelSearchSource, "fetch")
+
+    response = admin_client.get(reverse("admin:search") + "?s=truncated-f")
+
+    assert "truncated-first" in response.content.decode()
+    fetch.assert_called_once()
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_custom_lookup_not_narrowed(admin_client, tag_factory, mocker):
+    cache.clear()
+    mocker.patch.object(TagAdmin, "search_fields", ["^name"])
+    tag_factory(name="lookup-tag")
+    admin_client.get(reverse("admin:search") + "?s=lookup")
+    fetch = mocker.spy(ModelSearchSource, "fetch")
+
+    response = admin_client.get(reverse("admin:search") + "?s=lookup-t")
+
+    assert "lookup-tag" in response.content.decode()
+    fetch.assert_called_once()
+
+
+def test_command_search_words():
+    assert get_search_words("first  second") == ["first", "second"]
+    assert get_search_words('"first second"') is None
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+                "search_backend": "unfold.search.SQLiteSearchBackend",
+                "search_backend_options": {
+                    "example.tag": {"fts_table": "example_tag_fts"},
+                },
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_sqlite_backend(admin_client, tag_factory):
+    cache.clear()
+    tag = tag_factory(name="indexed-tag")
+
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE VIRTUAL TABLE example_tag_fts USING fts5(name)")
+        cursor.execute(
+            "INSERT INTO example_tag_fts (rowid, name) VALUES (%s, %s)",
+            (tag.pk, "unicorn"),
+        )
+
+    response = admin_client.get(reverse("admin:search") + "?s=unic")
+    assert "indexed-tag" in response.content.decode()
+
+    response = admin_client.get(reverse("admin:search") + "?s=indexed")
+    assert "indexed-tag" not in response.content.decode()
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+                "search_backend": "unfold.search.PostgresSearchBackend",
+                "search_backend_options": {
+                    "example.tag": {"vector_field": "search_vector"},
+                },
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_backend_fallback(admin_client, tag_factory):
+    cache.clear()
+    tag_factory(name="fallback-tag")
+    response = admin_client.get(reverse("admin:search") + "?s=fallback")
+
+    assert "fallback-tag" in response.content.decode()
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+                "search_backend": "unfold.search.SQLiteSearchBackend",
+                "search_backend_options": {
+                    "example.tag": {"fts_table": "example_tag_fts"},
+                },
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_sqlite_backend_without_words(admin_client, tag_factory):
+    cache.clear()
+    tag_factory(name="quoted-tag")
+
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE VIRTUAL TABLE example_tag_fts USING fts5(name)")
+
+    response = admin_client.get(reverse("admin:search") + '?s="')
+    assert response.status_code == HTTPStatus.OK
+    assert "quoted-tag" not in response.content.decode()
+
+
+def test_command_search_postgres_backend_vector(mocker):
+    queryset = mocker.Mock()
+    backend = PostgresSearchBackend()
+    options = {"vector_field": "search_vector", "config": "english"}
+    query = SearchQuery("tag", config="english", search_type="websearch")
+
+    backend.search(queryset, "tag", options)
+    queryset.filter.assert_called_once_with(search_vector=query)
+
+    # SearchRank needs psycopg for its output field
+    search_rank = mocker.patch("django.contrib.postgres.search.SearchRank")
+    assert backend.get_index_score("tag", options) == search_rank.return_value
+    search_rank.assert_called_once_with("search_vector", query)
+
+
+def test_command_search_postgres_backend_trigram(mocker):
+    queryset = mocker.Mock()
+    backend = PostgresSearchBackend()
+    options = {"trigram_fields": ["name", "slug"]}
+
+    backend.search(queryset, "tag", options)
+    queryset.filter.assert_called_once_with(
+        Q(name__trigram_word_similar="tag") | Q(slug__trigram_word_similar="tag")
+    )
+
+    assert backend.get_index_score("tag", options) == Greatest(
+        TrigramWordSimilarity("tag", "name"), TrigramWordSimilarity("tag", "slug")
+    )
+    assert backend.get_index_score(
+        "tag", {"trigram_fields": ["name"]}
+    ) == TrigramWordSimilarity("tag", "name")
+    assert backend.get_index_score("tag", {}) is None
+
+
+def test_command_search_backend_is_abstract():
+    with pytest.raises(TypeError):
+        SearchBackend()
+
+
+def test_command_search_backend_handles_models():
+    tag_admin = TagAdmin(model=Tag, admin_site=UnfoldAdminSite())
+
+    assert not PostgresSearchBackend({"example.tag": {"vector_field": "v"}}).handles(
+        tag_admin
+    )
+    assert SQLiteSearchBackend({"example.Tag": {"fts_table": "fts"}}).handles(tag_admin)
+
+
+def test_command_search_engine_ranked():
+    results = {
+        name: SearchResult(title=name, description="", link="", icon=None)
+        for name in ["a1", "a2", "b1", "b2"]
+    }
+    first_source = ListSearchSource(
+        lambda: [(0.5, results["a1"]), (0.4, results["a2"])], ranked=True
+    )
+    second_source = ListSearchSource(
+        lambda: [(0.45, results["b2"]), (0.9, results["b1"])], ranked=True
+    )
+
+    engine = SearchEngine([first_source, second_source], per_page=1, ranked=True)
+    titles = []
+
+    for number in range(1, 5):
+        page = engine.get_page(number)
+        titles.extend(result.title for result in page)
+
+    assert titles == ["b1", "a1", "b2", "a2"]
+    assert not page.has_next
+    assert engine.is_complete
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.tag"],
+                "search_ranking": True,
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_ranking(admin_client, tag_factory):
+    cache.clear()
+    tag_factory(name="prerank")
+    tag_factory(name="ranking")
+    tag_factory(name="rank")
+    response = admin_client.get(reverse("admin:search") + "?s=rank")
+    titles = [result.title for result in response.context["results"]]
+
+    assert titles == ["rank", "ranking", "prerank"]
+
+    response = admin_client.get(reverse("admin:search") + "?s=ranki")
+    titles = [result.title for result in response.context["results"]]
+
+    assert titles == ["ranking"]
+
+
+@pytest.mark.parametrize(
+    "search_fields, expected",
+    [
+        (["name"], ["name"]),
+        (["^name"], None),
+        (["name__exact"], None),
+        (["missing"], None),
+        (["id", "name"], None),
+        (["name", "name"], ["name", "name"]),
+    ],
+)
+def test_command_search_plain_fields(rf, search_fields, expected, mocker):
+    tag_admin = TagAdmin(model=Tag, admin_site=UnfoldAdminSite())
+    mocker.patch.object(tag_admin, "search_fields", search_fields)
+
+    assert get_plain_search_fields(rf.get("/"), tag_admin) == expected
+    assert (get_admin_score(rf.get("/"), tag_admin, "tag") is None) == (
+        expected is None
+    )
+
+
+def test_command_search_match_score():
+    assert get_match_score("Tag", "tag") > get_match_score("Tags", "tag")
+    assert get_match_score("Tags", "tag") > get_match_score("Big tag", "tag")
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "COMMAND": {
+                "search_models": ["example.category", "example.tag"],
+                "search_models_workers": 2,
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_command_search_async(rf, admin_user, category_factory, tag_factory, mocker):
+    cache.clear()
+    tag_factory(name="async-tag")
+    category_factory(name="async-category")
+    fetch = mocker.spy(ModelSearchSource, "fetch")
+    request = rf.get(reverse("admin:search") + "?s=async")
+    request.user = admin_user
+    response = async_to_sync(site.asearch)(request)
+    response.render()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result.title for result in response.context_data["results"]] == [
+        "async-category",
+        "async-tag",
+    ]
+    fetch.assert_not_called()
+
+    # Second request is served from the cache
+    afetch = mocker.spy(ModelSearchSource, "afetch")
+    response = async_to_sync(site.asearch)(request)
+
+    assert len(response.context_data["results"]) == len(["category", "tag"])
+    afetch.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_command_search_async_empty(rf, admin_user):
+    request = rf.get(reverse("admin:search"))
+    request.user = admin_user
+    response = async_to_sync(site.asearch)(request)
+
+    assert response.content == b""
+
+
+@pytest.mark.django_db(transaction=True)
+def test_command_search_async_fetch_renders_in_thread(rf, admin_user, mocker):
+    Tag.objects.create(name="related-tag")
+    mocker.patch.object(Tag, "__str__", lambda tag: f"{Tag.objects.count()} tags")
+    request = rf.get("/")
+    request.user = admin_user
+    source = ModelSearchSource(
+        site, request, TagAdmin(Tag, site), "related", limit=None
+    )
+
+    rows, count, is_complete = async_to_sync(source.afetch)(0, 10)
+
+    assert [row[1][0] for row in rows] == ["1 tags"]
+    assert is_complete
+
+
+@pytest.mark.django_db(transaction=True)
+def test_command_search_async_fetch_builds_queryset_in_thread(rf, admin_user):
+    Tag.objects.create(name="queried-tag")
+
+    class QueryingTagAdmin(TagAdmin):
+        def get_queryset(self, request):
+            # Resolving the ids queries the database before the search
+            return (
+                super()
+                .get_queryset(request)
+                .filter(pk__in=list(Tag.objects.values_list("pk", flat=True)))
+            )
+
+    request = rf.get("/")
+    request.user = admin_user
+    source = ModelSearchSource(
+        site, request, QueryingTagAdmin(Tag, site), "queried", limit=None
+    )
+
+    rows, count, is_complete = async_to_sync(source.afetch)(0, 10)
+
+    assert [row[1][0] for row in rows] == ["queried-tag"]
+
+
+def test_command_search_async_views_disabled_by_default():
+    admin_site = UnfoldAdminSite()
+    urls = {url.name: url for url in admin_site.get_urls() if hasattr(url, "name")}
+
+    assert not iscoroutinefunction(urls["search"].callback)
+    assert not iscoroutinefunction(urls["badges"].callback)
+
+
+def test_command_search_engine_async():
+    first = SearchResult(title="first", description="", link="", icon=None)
+    second = SearchResult(title="second", description="", link="", icon=None)
+    third = SearchResult(title="third", description="", link="", icon=None)
+    engine = SearchEngine(
+        [ListSearchSource(lambda: [first, second]), ListSearchSource(lambda: [third])],
+        per_page=2,
+    )
+    rows, has_next = async_to_sync(engine.aget_rows)(1)
+
+    assert [row[0] for row in rows] == ["first", "second"]
+    assert has_next
+
+    rows, has_next = async_to_sync(engine.aget_rows)(2)
+
+    assert [row[0] for row in rows] == ["third"]
+    assert not has_next
+    assert engine.is_complete
+
+
+@override_settings(UNFOLD={**CONFIG_DEFAULTS, **{"ASYNC_VIEWS": True}})
+def test_command_search_async_view_selected():
+    admin_site = UnfoldAdminSite()
+    urls = {url.name: url for url in admin_site.get_urls() if hasattr(url, "name")}
+
+    assert iscoroutinefunction(urls["search"].callback)
+    assert iscoroutinefunction(urls["badges"].callback)
+
+
+@override_settings(UNFOLD={**CONFIG_DEFAULTS, **{"ASYNC_VIEWS": True}})
+@pytest.mark.django_db
+def test_command_search_async_view_anonymous():
+    admin_site = UnfoldAdminSite()
+    view = admin_site.async_admin_view(admin_site.asearch)
+    request = RequestFactory().get("/search/?s=test")
+    request.user = AnonymousUser()
+    response = async_to_sync(view)(request)
+
+    assert response.status_code == HTTPStatus.FOUND
+    assert response["Location"].startswith(reverse("admin:login"))
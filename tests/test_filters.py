@@ -1,14 +1,24 @@
 from datetime import timedelta
 from http import HTTPStatus
+from threading import Thread
 
 import pytest
+from django.contrib.admin import site
+from django.contrib.admin.filters import FacetsMixin
 from django.contrib.auth import get_user_model
-from django.urls import reverse_lazy
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse, reverse_lazy
 from django.utils.timezone import now
+from example.admin import FilterUserAdmin, TagAdmin
 from example.models import (
     ApprovalChoices,
     Category,
     ColorChoices,
+    FilterUser,
     Label,
     PriorityChoices,
     Project,
@@ -17,13 +27,30 @@ from example.models import (
     Task,
 )
 
+from unfold import views
 from unfold.contrib.filters.admin import (
+    AllValuesCheckboxFilter,
     RangeDateFilter,
     RangeDateTimeFilter,
     RangeNumericFilter,
+    RelatedCheckboxFilter,
     SingleNumericFilter,
     SliderNumericFilter,
 )
+from unfold.contrib.filters.admin.mixins import CappedChoicesMixin, MultiValueMixin
+from unfold.sites import UnfoldAdminSite
+from unfold.views import ChangeList
+
+other_site = UnfoldAdminSite(name="other")
+other_site.register(FilterUser, FilterUserAdmin)
+other_site.register(Tag, TagAdmin)
+
+# Used as the URLconf of tests rendering filters on a second admin site
+urlpatterns = [
+    path("admin/", site.urls),
+    path("other/", other_site.urls),
+    path("hijack/", include("hijack.urls")),
+]
 
 
 ########################################################
@@ -1004,3 +1031,527 @@ def test_filters_autocomplete_select_multiple_filter(
 
     for user in not_expected:
         assert not response.context_data["cl"].queryset.filter(username=user).exists()
+
+
+########################################################
+# Slider bounds
+########################################################
+def get_slider_filter(response, parameter_name="numeric_slider"):
+    cl = response.context_data["cl"]
+
+    for spec in cl.filter_specs:
+        if getattr(spec, "parameter_name", None) == parameter_name:
+            return cl, spec
+
+
+@pytest.mark.django_db
+def test_filters_slider_bounds_single_query(admin_client, user_factory, mocker):
+    user_factory.create(username="sample1@example.com", numeric_slider=10)
+    user_factory.create(username="sample2@example.com", numeric_slider=20)
+    aggregate_bounds = mocker.spy(SliderNumericFilter, "_aggregate_bounds")
+
+    response = admin_client.get(reverse_lazy("admin:example_filteruser_changelist"))
+    cl, spec = get_slider_filter(response)
+
+    sliders = [s for s in cl.filter_specs if isinstance(s, SliderNumericFilter)]
+
+    assert response.status_code == HTTPStatus.OK
+    assert aggregate_bounds.call_count == len(sliders)
+    assert spec.get_bounds(cl) == (10, 20)
+
+
+@pytest.mark.django_db
+def test_filters_slider_bounds_cached(admin_client, user_factory, mocker):
+    cache.clear()
+    mocker.patch.object(SliderNumericFilter, "bounds_cache_timeout", 60)
+    # The filtered model is tracked when an admin with the cached filter is created
+    FilterUserAdmin(FilterUser, site)
+    user_factory.create(username="sample1@example.com", numeric_slider=10)
+    user_factory.create(username="sample2@example.com", numeric_slider=20)
+    url = reverse_lazy("admin:example_filteruser_changelist")
+
+    response = admin_client.get(url)
+    aggregate_bounds = mocker.spy(SliderNumericFilter, "_aggregate_bounds")
+    cl, spec = get_slider_filter(admin_client.get(url))
+
+    assert response.status_code == HTTPStatus.OK
+    assert spec.get_bounds(cl) == (10, 20)
+    aggregate_bounds.assert_not_called()
+
+    user_factory.create(username="sample3@example.com", numeric_slider=30)
+    cl, spec = get_slider_filter(admin_client.get(url))
+
+    assert spec.get_bounds(cl) == (10, 30)
+
+
+def test_filters_slider_bounds_tracked_once(mocker):
+    track_model_versions = mocker.patch("unfold.admin.track_model_versions")
+    cached_filter = type("Cached", (SliderNumericFilter,), {"bounds_cache_timeout": 60})
+    admin_class = type(
+        "CachedSliderAdmin",
+        (FilterUserAdmin,),
+        {
+            "list_filter": [
+                "is_active",
+                ("numeric_slider_custom", SliderNumericFilter),
+                ("numeric_slider", cached_filter),
+                ("tags__name", cached_filter),
+                ("missing", cached_filter),
+            ]
+        },
+    )
+
+    admin_class(FilterUser, site)
+
+    # Fields of the proxy model belong to the concrete user model
+    track_model_versions.assert_called_once_with(
+        FilterUser, FilterUser._meta.concrete_model, Tag
+    )
+
+
+@pytest.mark.django_db
+def test_filters_slider_bounds_from_changelist(admin_client, user_factory, mocker):
+    mocker.patch.object(SliderNumericFilter, "bounds_from_changelist", True)
+    user_factory.create(username="sample1@example.com", numeric_slider=10)
+    user_factory.create(username="sample2@example.com", numeric_slider=20)
+    user_factory.create(username="other@example.com", numeric_slider=30)
+
+    response = admin_client.get(
+        reverse_lazy("admin:example_filteruser_changelist"),
+        data={"text_username": "sample", "numeric_slider_from": 15},
+    )
+    cl, spec = get_slider_filter(response)
+
+    assert response.status_code == HTTPStatus.OK
+    assert spec.get_bounds(cl) == (10, 20)
+
+
+########################################################
+# Facets
+########################################################
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [{}, {"is_active__exact": "1"}])
+def test_filters_facets_shared_query(
+    admin_client, user_factory, tag_factory, mocker, params
+):
+    tag = tag_factory.create()
+    user_factory.create(username="sample1@example.com", status=StatusChoices.ACTIVE)
+    user_factory.create(username="sample2@example.com", is_active=False).tags.add(tag)
+    get_facet_queries = mocker.spy(ChangeList, "_get_facet_queries")
+
+    response = admin_client.get(
+        reverse_lazy("admin:example_filteruser_changelist"),
+        data={"_facets": "True", **params},
+    )
+    cl = response.context_data["cl"]
+    specs = [s for s in cl.filter_specs if getattr(s, "facets_from_changelist", 0)]
+    separate = [s for s in specs if not cl._is_facet_shared(s)]
+
+    assert response.status_code == HTTPStatus.OK
+    queries, _aliases = get_facet_queries.spy_return
+    assert len(queries) == len(separate) + 1
+
+    for spec in specs:
+        assert cl.get_facet_counts(spec) == FacetsMixin.get_facet_queryset(spec, cl)
+
+
+@pytest.mark.django_db
+def test_filters_facets_multi_valued_relation_separate(admin_client, tag_factory):
+    tag_factory.create()
+    response = admin_client.get(
+        reverse_lazy("admin:example_filteruser_changelist"), data={"_facets": "True"}
+    )
+    cl = response.context_data["cl"]
+    specs = {getattr(s, "field_path", None): s for s in cl.filter_specs}
+
+    assert not cl._is_facet_shared(specs["tags"])
+    assert cl._is_facet_shared(specs["is_active"])
+
+
+def test_filters_facets_cache_tracked_once(mocker):
+    track_model_versions = mocker.patch("unfold.admin.track_model_versions")
+    admin_class = type("CachedFacetsAdmin", (TagAdmin,), {"facets_cache_timeout": 60})
+
+    admin_class(Tag, site)
+    track_model_versions.assert_called_once_with(Tag)
+
+
+def get_is_active_filter(response):
+    cl = response.context_data["cl"]
+    specs = {getattr(s, "field_path", None): s for s in cl.filter_specs}
+
+    return cl, specs["is_active"]
+
+
+@pytest.mark.django_db
+def test_filters_facets_cached(admin_client, user_factory, mocker):
+    cache.clear()
+    mocker.patch.object(FilterUserAdmin, "facets_cache_timeout", 60)
+    user_factory.create(username="sample1@example.com", is_active=False)
+    url = reverse_lazy("admin:example_filteruser_changelist")
+
+    admin_client.get(url, data={"_facets": "True"})
+    aggregate_facet_queries = mocker.spy(views, "_aggregate_facet_queries")
+    response = admin_client.get(url, data={"_facets": "True"})
+    cl, spec = get_is_active_filter(response)
+
+    aggregate_facet_queries.assert_not_called()
+    assert not cl.facet_counts_approximate
+    assert "are being updated" not in response.content.decode()
+    assert cl.get_facet_counts(spec) == FacetsMixin.get_facet_queryset(spec, cl)
+
+
+@pytest.mark.django_db
+def test_filters_facets_stale_refreshed(admin_client, user_factory, mocker):
+    cache.clear()
+    mocker.patch.object(FilterUserAdmin, "facets_cache_timeout", 60)
+    # The model is tracked when an admin with cached facets is created
+    FilterUserAdmin(FilterUser, site)
+    thread = mocker.patch("unfold.views.Thread")
+    users = [user_factory.create(username="sample1@example.com", is_active=False)]
+    url = reverse_lazy("admin:example_filteruser_changelist")
+
+    admin_client.get(url, data={"_facets": "True"})
+    users.append(user_factory.create(username="sample2@example.com", is_active=False))
+    response = admin_client.get(url, data={"_facets": "True"})
+    cl, spec = get_is_active_filter(response)
+    counts = cl.get_facet_counts(spec)
+
+    assert cl.facet_counts_approximate
+    assert isinstance(counts["false__c"], views.ApproximateCount)
+    assert f"({counts['false__c']})" == "(~1)"
+    assert "(~1)" in response.content.decode()
+    assert "are being updated" in response.content.decode()
+    thread.assert_called_once()
+
+    # Run the background refresh in the current thread and connection
+    mocker.patch("unfold.views.connections")
+    thread.call_args.kwargs["target"](*thread.call_args.kwargs["args"])
+    cl, spec = get_is_active_filter(admin_client.get(url, data={"_facets": "True"}))
+
+    assert not cl.facet_counts_approximate
+    assert cl.get_facet_counts(spec)["false__c"] == len(users)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_filters_facets_refresh_closes_connections(user_factory, mocker):
+    cache.clear()
+    user_factory.create(username="sample1@example.com", is_active=False)
+    close_all = mocker.spy(views.connections, "close_all")
+    queries = [
+        (
+            get_user_model().objects.all(),
+            {"false__c": Count("pk", filter=Q(is_active=False))},
+        )
+    ]
+    thread = Thread(
+        target=views._refresh_facet_counts,
+        args=("unfold_test_facets", queries, 1, 60, None),
+    )
+    thread.start()
+    thread.join()
+
+    # The thread opened its own connection which must not be left open
+    close_all.assert_called_once()
+    assert cache.get("unfold_test_facets")[2] == {"false__c": 1}
+    assert cache.get("unfold_test_facets_refresh") is None
+
+
+########################################################
+# Lazy filters
+########################################################
+@pytest.mark.django_db
+def test_filters_lazy_changelist(admin_client, category_factory, mocker):
+    mocker.patch.object(FilterUserAdmin, "list_filter_lazy", True)
+    category_factory.create(name="category1")
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.get(reverse_lazy("admin:example_filteruser_changelist"))
+
+    cl = response.context_data["cl"]
+    specs = {getattr(s, "field_path", None): s for s in cl.filter_specs}
+    content = response.content.decode()
+
+    assert response.status_code == HTTPStatus.OK
+    assert specs["categories"].lazy
+    assert specs["categories"].lookup_choices == []
+    assert "category1" not in content
+    assert reverse("admin:example_filteruser_filter", args=["categories", 0]) in content
+    assert reverse("admin:example_filteruser_filter", args=["username", 1]) in content
+    assert not any("example_category" in q["sql"] for q in ctx.captured_queries)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+@pytest.mark.django_db
+def test_filters_lazy_changelist_site_name(admin_client, mocker):
+    mocker.patch.object(FilterUserAdmin, "list_filter_lazy", True)
+    response = admin_client.get(reverse("other:example_filteruser_changelist"))
+    content = response.content.decode()
+    url = reverse("other:example_filteruser_filter", args=["categories", 0])
+
+    assert response.status_code == HTTPStatus.OK
+    assert url.startswith("/other/")
+    assert url in content
+    assert admin_client.get(url).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_filters_lazy_filter_view(admin_client, category_factory, user_factory):
+    category_factory.create(name="category1")
+    user_factory.create(username="sample1@example.com")
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = admin_client.get(
+            reverse("admin:example_filteruser_filter", args=["categories", 0])
+        )
+
+    content = response.content.decode()
+
+    assert response.status_code == HTTPStatus.OK
+    assert "category1" in content
+    assert "sample1@example.com" not in content
+    assert not any("COUNT(" in q["sql"] for q in ctx.captured_queries)
+
+    response = admin_client.get(
+        reverse("admin:example_filteruser_filter", args=["username", 1])
+    )
+
+    assert 'value="sample1@example.com"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_filters_lazy_filter_view_without_choices(admin_client):
+    response = admin_client.get(
+        reverse("admin:example_filteruser_filter", args=["categories", 0])
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == b""
+
+
+@pytest.mark.django_db
+def test_filters_lazy_filter_view_incorrect_lookup(admin_client):
+    response = admin_client.get(
+        reverse("admin:example_filteruser_filter", args=["categories", 0]),
+        data={"missing__field": "1"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_filters_lazy_filter_view_permission(client, user_factory):
+    client.force_login(user_factory.create(is_staff=True))
+    response = client.get(
+        reverse("admin:example_filteruser_filter", args=["categories", 0])
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+########################################################
+# Capped checkbox filters
+########################################################
+@pytest.mark.django_db
+@pytest.mark.parametrize("facet", [True, False])
+def test_filters_capped_related_checkbox(
+    admin_client, user_factory, tag_factory, mocker, facet
+):
+    mocker.patch.object(RelatedCheckboxFilter, "max_choices", 1)
+    tag1 = tag_factory.create(name="tag1")
+    tag2 = tag_factory.create(name="tag2")
+    tag3 = tag_factory.create(name="tag3")
+
+    user_factory.create(username="sample1@example.com").tags.add(tag1, tag2)
+    user_factory.create(username="sample2@example.com").tags.add(tag2)
+
+    response = admin_client.get(
+        reverse_lazy("admin:example_filteruser_changelist"),
+        data={
+            "tags__id__exact": [tag3.pk],
+            **({"_facets": "True"} if facet else {}),
+        },
+    )
+    spec = next(
+        s
+        for s in response.context_data["cl"].filter_specs
+        if isinstance(s, RelatedCheckboxFilter)
+    )
+    content = response.content.decode()
+
+    assert response.status_code == HTTPStatus.OK
+    assert spec.capped
+    assert spec.lookup_choices == [(tag2.pk, "tag2")]
+    assert (
+        reverse("admin:example_filteruser_filter_search", args=["tags", 0]) in content
+    )
+    assert f'<option value="{tag3.pk}" selected>tag3</option>' in content
+    assert "Select a valid choice" not in content
+    assert "select2.full" in content
+
+
+@pytest.mark.django_db
+def test_filters_capped_related_checkbox_all_rendered(
+    admin_client, user_factory, tag_factory, mocker
+):
+    mocker.patch.object(RelatedCheckboxFilter, "max_choices", 2)
+    user_factory.create().tags.add(tag_factory.create(name="tag1"))
+
+    response = admin_client.get(reverse_lazy("admin:example_filteruser_changelist"))
+    content = response.content.decode()
+
+    assert response.status_code == HTTPStatus.OK
+    assert "tag1" in content
+    assert "_filter_search" not in content
+    assert "filters/tags/0/search/" not in content
+
+
+@pytest.mark.django_db
+def test_filters_capped_all_values_checkbox(admin_client, user_factory, mocker):
+    mocker.patch.object(AllValuesCheckboxFilter, "max_choices", 1)
+    user_factory.create(username="sample1@example.com")
+    user_factory.create(username="sample2@example.com")
+
+    response = admin_client.get(
+        reverse_lazy("admin:example_filteruser_changelist"),
+        data={"username": "sample2@example.com"},
+    )
+    spec = next(
+        s
+        for s in response.context_data["cl"].filter_specs
+        if isinstance(s, AllValuesCheckboxFilter)
+    )
+    content = response.content.decode()
+
+    assert response.status_code == HTTPStatus.OK
+    assert spec.capped
+    assert len(spec.lookup_choices) == 1
+    assert "sample2@example.com" not in spec.lookup_choices
+    assert (
+        reverse("admin:example_filteruser_filter_search", args=["username", 1])
+        in content
+    )
+    assert (
+        '<option value="sample2@example.com" selected>sample2@example.com</option>'
+        in content
+    )
+
+
+@pytest.mark.django_db
+def test_filters_capped_search_view_related(
+    admin_client, user_factory, tag_factory, mocker
+):
+    mocker.patch.object(RelatedCheckboxFilter, "max_choices", 1)
+    tag1 = tag_factory.create(name="tag1")
+    tag2 = tag_factory.create(name="tag2")
+    user_factory.create().tags.add(tag1)
+
+    url = reverse("admin:example_filteruser_filter_search", args=["tags", 0])
+    response = admin_client.get(url, data={"term": "tag2", "page": "1"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "results": [{"id": str(tag2.pk), "text": "tag2"}],
+        "pagination": {"more": False},
+    }
+
+    response = admin_client.get(url, data={"term": ""})
+
+    assert [result["text"] for result in response.json()["results"]] == [
+        "tag1",
+        "tag2",
+    ]
+
+
+@pytest.mark.django_db
+def test_filters_capped_search_view_all_values(admin_client, user_factory, mocker):
+    mocker.patch.object(AllValuesCheckboxFilter, "max_choices", 1)
+    mocker.patch.object(views.ListFilterSearchView, "paginate_by", 1)
+    user_factory.create(username="sample1@example.com")
+    user_factory.create(username="sample2@example.com")
+
+    url = reverse("admin:example_filteruser_filter_search", args=["username", 1])
+    response = admin_client.get(url, data={"term": "sample"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "results": [{"id": "sample1@example.com", "text": "sample1@example.com"}],
+        "pagination": {"more": True},
+    }
+
+    response = admin_client.get(url, data={"term": "sample", "page": "2"})
+
+    assert response.json()["results"] == [
+        {"id": "sample2@example.com", "text": "sample2@example.com"}
+    ]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+@pytest.mark.django_db
+def test_filters_capped_search_url_site_name(
+    admin_client, user_factory, tag_factory, mocker
+):
+    mocker.patch.object(RelatedCheckboxFilter, "max_choices", 1)
+
+    for name in ["tag1", "tag2"]:
+        user_factory.create().tags.add(tag_factory.create(name=name))
+
+    response = admin_client.get(reverse("other:example_filteruser_changelist"))
+    url = reverse("other:example_filteruser_filter_search", args=["tags", 0])
+
+    assert url.startswith("/other/")
+    assert url in response.content.decode()
+    assert admin_client.get(url).status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_filters_capped_mixin_defaults(rf, admin_user, user_factory):
+    user_factory.create(username="sample1@example.com")
+    user_factory.create(username="sample2@example.com")
+    request = rf.get("/")
+    request.user = admin_user
+
+    class UsernameFilter(CappedChoicesMixin, MultiValueMixin):
+        field_path = "username"
+        lookup_val = ["sample1@example.com", "sample2@example.com"]
+
+    spec = UsernameFilter()
+    model_admin = FilterUserAdmin(FilterUser, site)
+
+    assert spec.get_selected_choices([("sample1@example.com", "sample1")]) == [
+        ("sample2@example.com", "sample2@example.com")
+    ]
+    assert [
+        spec.get_search_result(row)
+        for row in spec.get_search_queryset(request, model_admin, "sample2")
+    ] == [{"id": "sample2@example.com", "text": "sample2@example.com"}]
+
+
+@pytest.mark.django_db
+def test_filters_capped_search_view_not_capped(admin_client):
+    response = admin_client.get(
+        reverse("admin:example_filteruser_filter_search", args=["tags", 0])
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_filters_capped_search_view_incorrect_lookup(admin_client, mocker):
+    mocker.patch.object(RelatedCheckboxFilter, "max_choices", 1)
+    response = admin_client.get(
+        reverse("admin:example_filteruser_filter_search", args=["tags", 0]),
+        data={"missing__field": "1"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_filters_capped_search_view_permission(client, user_factory):
+    client.force_login(user_factory.create(is_staff=True))
+    response = client.get(
+        reverse("admin:example_filteruser_filter_search", args=["tags", 0])
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
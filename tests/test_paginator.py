@@ -1,10 +1,27 @@
+from urllib.parse import parse_qs, urlparse
+
 import pytest
+from django.core.cache import cache
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connection
+from django.db.models import QuerySet
 from django.template import RequestContext, Template
+from django.test.utils import CaptureQueriesContext
 from example.admin import ProjectAdmin
-from example.models import Project
+from example.models import Project, Tag, Task
 
-from unfold.paginator import InfinitePaginator
+from unfold.paginator import (
+    CURSOR_VAR,
+    CappedCountPaginator,
+    EstimatedCountPaginator,
+    InfinitePage,
+    InfinitePaginator,
+    KeysetPage,
+    KeysetPaginator,
+)
 from unfold.sites import UnfoldAdminSite
+from unfold.templatetags.unfold import compact_number, format_result_count
+from unfold.views import ChangeList
 
 
 def test_infinite_paginator_count_returns_fixed_large_value():
@@ -25,6 +42,41 @@ def test_infinite_paginator_has_next_false_when_page_is_empty():
     assert page.has_next() is False
 
 
+def test_infinite_paginator_has_next_false_on_last_full_page():
+    paginator = InfinitePaginator(object_list=list(range(20)), per_page=10)
+
+    assert paginator.page(1).has_next() is True
+    assert paginator.page(2).has_next() is False
+
+
+@pytest.mark.django_db
+def test_infinite_paginator_single_query(project_factory):
+    projects = project_factory.create_batch(10)
+    paginator = InfinitePaginator(Project.objects.order_by("pk"), per_page=10)
+
+    with CaptureQueriesContext(connection) as queries:
+        page = paginator.page(1)
+
+        assert list(page.object_list) == projects
+        assert page.object_list.ordered
+        assert page.has_next() is False
+        assert paginator.page(1) is page
+
+    assert len(queries) == 1
+
+
+@pytest.mark.django_db
+def test_infinite_paginator_template_last_page(admin_user, project_factory, rf):
+    project_factory.create_batch(20)
+    request = rf.get("/?p=2")
+    request.user = admin_user
+    response = render_pagination(request, ProjectAdmin)
+
+    assert 'href="?p=1"' in response
+    assert 'href="?p=3"' not in response
+    assert "Next" in response
+
+
 @pytest.mark.django_db
 def test_infinite_paginator_template(user_factory, project_factory, rf):
     user = user_factory(username="sample@example.com", is_superuser=True, is_staff=True)
@@ -87,3 +139,417 @@ def test_infinite_paginator_template_empty(user_factory, rf):
     assert "href=" not in response
     assert "Previous" in response
     assert "Next" in response
+
+
+class KeysetProjectAdmin(ProjectAdmin):
+    paginator = KeysetPaginator
+
+
+def render_pagination(request, admin_class):
+    model_admin = admin_class(Project, UnfoldAdminSite())
+    changelist_view = model_admin.changelist_view(request=request)
+
+    return Template("{% include 'unfold/helpers/pagination.html' with cl=cl %}").render(
+        RequestContext(
+            request,
+            {
+                "opts": Project._meta,
+                "cl": changelist_view.context_data["cl"],
+            },
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_keyset_paginator_pages(project_factory):
+    projects = project_factory.create_batch(25)
+    per_page = 10
+    queryset = Project.objects.order_by("-pk")
+
+    first_page = KeysetPaginator(queryset, per_page).page(1)
+    assert isinstance(first_page, KeysetPage)
+    assert list(first_page.object_list) == projects[::-1][:per_page]
+    assert first_page.has_next()
+    assert not first_page.has_previous()
+
+    paginator = KeysetPaginator(queryset, per_page, cursor=first_page.next_cursor)
+
+    with CaptureQueriesContext(connection) as queries:
+        second_page = paginator.page(2)
+
+    assert list(second_page.object_list) == projects[::-1][per_page : per_page * 2]
+    assert "OFFSET" not in queries[0]["sql"]
+    assert second_page.has_previous()
+
+    paginator = KeysetPaginator(queryset, per_page, cursor=second_page.next_cursor)
+    third_page = paginator.page(3)
+    assert list(third_page.object_list) == projects[::-1][per_page * 2 :]
+    assert not third_page.has_next()
+
+    paginator = KeysetPaginator(queryset, per_page, cursor=third_page.previous_cursor)
+    assert list(paginator.page(2).object_list) == list(second_page.object_list)
+
+    paginator = KeysetPaginator(queryset, per_page, cursor=second_page.previous_cursor)
+    previous_page = paginator.page(1)
+    assert list(previous_page.object_list) == list(first_page.object_list)
+    assert not previous_page.has_previous()
+    assert previous_page.has_next()
+
+
+@pytest.mark.django_db
+def test_keyset_paginator_offset_without_cursor(project_factory):
+    projects = project_factory.create_batch(15)
+    per_page = 10
+    page = KeysetPaginator(Project.objects.order_by("pk"), per_page).page(2)
+
+    assert list(page.object_list) == projects[per_page:]
+    assert page.has_previous()
+    assert not page.has_next()
+
+
+@pytest.mark.parametrize(
+    "model, ordering",
+    [
+        (Tag, ["name", "-pk"]),
+        (Project, ["pk", "?"]),
+        (Task, ["project__name", "pk"]),
+        (Task, ["-project", "pk"]),
+        (Task, ["project_id"]),
+    ],
+)
+def test_keyset_paginator_ordering_fallback(model, ordering):
+    paginator = KeysetPaginator(model.objects.order_by(*ordering), 10)
+
+    assert paginator.ordering is None
+
+
+def test_keyset_paginator_ordering_foreign_key():
+    paginator = KeysetPaginator(Task.objects.order_by("project_id", "pk"), 10)
+
+    assert [field.name for field, _descending in paginator.ordering] == [
+        "project",
+        "id",
+    ]
+
+
+@pytest.mark.django_db
+def test_keyset_paginator_fallback_page():
+    paginator = KeysetPaginator(Project.objects.order_by("name", "pk"), 10)
+
+    assert isinstance(paginator.page(1), InfinitePage)
+    assert not isinstance(paginator.page(1), KeysetPage)
+
+
+@pytest.mark.parametrize("cursor", ["invalid", "W10", "eyJ2YWx1ZXMiOiBbXX0"])
+def test_keyset_paginator_invalid_cursor(cursor):
+    paginator = KeysetPaginator(Project.objects.order_by("-pk"), 10, cursor=cursor)
+
+    with pytest.raises(InvalidPage):
+        paginator.page(2)
+
+
+@pytest.mark.django_db
+def test_keyset_paginator_template(admin_user, project_factory, rf):
+    project_factory.create_batch(25)
+
+    request = rf.get("/")
+    request.user = admin_user
+    response = render_pagination(request, KeysetProjectAdmin)
+
+    next_url = response.split('href="')[1].split('"')[0].replace("&amp;", "&")
+    params = parse_qs(urlparse(next_url).query)
+    assert params["p"] == ["2"]
+    assert CURSOR_VAR in params
+
+    request = rf.get(next_url)
+    request.user = admin_user
+    response = render_pagination(request, KeysetProjectAdmin)
+
+    previous_url, next_url = [
+        url.split('"')[0].replace("&amp;", "&") for url in response.split('href="')[1:]
+    ]
+    assert previous_url == "?p=1"
+    assert parse_qs(urlparse(next_url).query)["p"] == ["3"]
+
+
+class SmallEstimatedCountPaginator(EstimatedCountPaginator):
+    count_limit = 5
+
+
+class EstimatedProjectAdmin(ProjectAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+def test_estimated_count_paginator_list():
+    paginator = EstimatedCountPaginator(object_list=list(range(50)), per_page=10)
+
+    assert paginator.count == len(range(50))
+    assert not paginator.is_estimated
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator_exact_below_limit(project_factory):
+    projects = project_factory.create_batch(5)
+    paginator = SmallEstimatedCountPaginator(Project.objects.order_by("pk"), 2)
+
+    assert paginator.count == len(projects)
+    assert not paginator.is_estimated
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator_capped(project_factory):
+    projects = project_factory.create_batch(12)
+    paginator = SmallEstimatedCountPaginator(Project.objects.order_by("pk"), 5)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert paginator.count == SmallEstimatedCountPaginator.count_limit
+
+    assert paginator.is_capped
+    assert not paginator.is_estimated
+    assert "LIMIT" in queries[0]["sql"]
+    assert "ORDER BY" not in queries[0]["sql"]
+
+    # Pages past the estimate are still reachable
+    assert list(paginator.page(3).object_list) == projects[10:]
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator_table_estimate(mocker, project_factory):
+    project_factory.create_batch(6)
+    table_estimate = mocker.patch.object(
+        EstimatedCountPaginator, "get_table_estimate", return_value=1_234_567
+    )
+    query_estimate = mocker.patch.object(
+        EstimatedCountPaginator, "get_query_estimate", return_value=7_654
+    )
+
+    paginator = SmallEstimatedCountPaginator(Project.objects.order_by("pk"), 10)
+    assert paginator.count == table_estimate.return_value
+    assert paginator.is_estimated
+    query_estimate.assert_not_called()
+
+    paginator = SmallEstimatedCountPaginator(
+        Project.objects.filter(name__isnull=False).order_by("pk"), 10
+    )
+    assert paginator.count == query_estimate.return_value
+    assert paginator.is_estimated
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "explain_output",
+    ['{"Plan": {"Plan Rows": 7654}}', '[{"Plan": {"Plan Rows": 7654}}]'],
+)
+def test_estimated_count_paginator_estimates_postgresql(mocker, explain_output):
+    connections = mocker.patch("unfold.paginator.connections")
+    postgresql = connections.__getitem__.return_value
+    postgresql.vendor = "postgresql"
+    postgresql.ops.quote_name.return_value = '"example_project"'
+    cursor = postgresql.cursor.return_value.__enter__.return_value
+    explain = mocker.patch.object(QuerySet, "explain", return_value=explain_output)
+    queryset = Project.objects.order_by("pk")
+    paginator = EstimatedCountPaginator(queryset, 10)
+
+    cursor.fetchone.return_value = (1_234_567,)
+    assert paginator.get_table_estimate(queryset) == cursor.fetchone.return_value[0]
+    cursor.execute.assert_called_once_with(
+        "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+        ['"example_project"'],
+    )
+
+    # Tables which were never analyzed have no statistics
+    cursor.fetchone.return_value = (-1,)
+    assert paginator.get_table_estimate(queryset) is None
+
+    assert paginator.get_query_estimate(queryset) == len(range(7654))
+    explain.assert_called_once_with(format="json")
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator_estimates_other_databases():
+    queryset = Project.objects.order_by("pk")
+    paginator = EstimatedCountPaginator(queryset, 10)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert paginator.get_table_estimate(queryset) is None
+        assert paginator.get_query_estimate(queryset) is None
+
+    assert not queries
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator_template(admin_user, project_factory, rf, mocker):
+    project_factory.create_batch(3)
+    mocker.patch.object(
+        EstimatedCountPaginator, "get_table_estimate", return_value=1_234_567
+    )
+    request = rf.get("/")
+    request.user = admin_user
+    model_admin = EstimatedProjectAdmin(Project, UnfoldAdminSite())
+    response = model_admin.changelist_view(request=request).render()
+    content = response.content.decode()
+
+    assert "~1.2M" in content
+    assert f'href="?p={1_234_567 // 10 + 1}"' in content
+    assert "1,234,567" not in content
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (999, "999"),
+        (1_000, "1K"),
+        (1_250, "1.2K"),
+        (1_234_567, "1.2M"),
+        (3 * 10**9, "3B"),
+    ],
+)
+def test_compact_number(value, expected):
+    assert compact_number(value) == expected
+
+
+class SmallCappedCountPaginator(CappedCountPaginator):
+    count_limit = 5
+
+
+class CappedProjectAdmin(ProjectAdmin):
+    paginator = SmallCappedCountPaginator
+    show_full_result_count = True
+
+
+@pytest.mark.django_db
+def test_capped_count_paginator(project_factory):
+    projects = project_factory.create_batch(12)
+    paginator = SmallCappedCountPaginator(Project.objects.order_by("pk"), 5)
+
+    assert paginator.count == SmallCappedCountPaginator.count_limit
+    assert paginator.is_capped
+    assert list(paginator.page(3).object_list) == projects[10:]
+
+    paginator = SmallCappedCountPaginator(
+        Project.objects.filter(pk=projects[0].pk).order_by("pk"), 5
+    )
+
+    assert paginator.count == 1
+    assert not paginator.is_capped
+
+
+@pytest.mark.django_db
+def test_capped_count_paginator_changelist(admin_user, project_factory, rf):
+    project_factory.create_batch(12)
+    project_factory(name="capped-project")
+    request = rf.get("/?q=capped-project")
+    request.user = admin_user
+    model_admin = CappedProjectAdmin(Project, UnfoldAdminSite())
+
+    with CaptureQueriesContext(connection) as queries:
+        response = model_admin.changelist_view(request=request).render()
+
+    cl = response.context_data["cl"]
+    assert cl.result_count == 1
+    assert cl.full_result_count == SmallCappedCountPaginator.count_limit
+    assert cl.full_result_paginator.is_capped
+    assert all("LIMIT" in query["sql"] for query in queries if "COUNT(" in query["sql"])
+    assert "5+ total" in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "admin_class, search_term, expected",
+    [
+        (ProjectAdmin, "search-form", False),
+        (CappedProjectAdmin, "search-form", True),
+        (CappedProjectAdmin, "project", False),
+    ],
+)
+def test_search_form_result_count(
+    admin_user, project_factory, rf, admin_class, search_term, expected
+):
+    project_factory.create_batch(6, name="project")
+    project_factory(name="search-form")
+    request = rf.get(f"/?q={search_term}")
+    request.user = admin_user
+    cl = get_changelist(request, admin_class)
+    content = Template("{% load unfold_list %}{% unfold_search_form cl %}").render(
+        RequestContext(request, {"cl": cl, "opts": Project._meta})
+    )
+
+    assert ("1 result (5+ total)" in content) == expected
+    assert (" result" in content) == expected
+
+
+@pytest.mark.parametrize(
+    "count, paginator, expected",
+    [
+        (10, None, 10),
+        (10_000, SmallCappedCountPaginator([1] * 6, 1), "10,000+"),
+        (1_200_000, SmallEstimatedCountPaginator([], 1), 1_200_000),
+    ],
+)
+def test_format_result_count(count, paginator, expected):
+    assert format_result_count(count, paginator) == expected
+
+
+class CachedCountProjectAdmin(ProjectAdmin):
+    paginator = Paginator
+    show_full_result_count = True
+    full_result_count_cache_timeout = 60
+
+
+class CachedCappedCountProjectAdmin(CappedProjectAdmin):
+    full_result_count_cache_timeout = 60
+
+
+def get_changelist(request, admin_class):
+    model_admin = admin_class(Project, UnfoldAdminSite())
+
+    return model_admin.changelist_view(request=request).context_data["cl"]
+
+
+@pytest.mark.django_db
+def test_full_result_count_cached(admin_user, project_factory, rf, mocker):
+    cache.clear()
+    projects = project_factory.create_batch(3)
+    count_full_results = mocker.spy(ChangeList, "_count_full_results")
+    request = rf.get("/?q=missing")
+    request.user = admin_user
+
+    for _ in range(2):
+        cl = get_changelist(request, CachedCountProjectAdmin)
+        assert cl.full_result_count == len(projects)
+
+    count_full_results.assert_called_once()
+
+    projects.append(project_factory())
+    cl = get_changelist(request, CachedCountProjectAdmin)
+
+    assert cl.full_result_count == len(projects)
+
+
+@pytest.mark.django_db
+def test_full_result_count_cache_tracked_once(admin_user, rf, mocker):
+    track_model_versions = mocker.patch("unfold.admin.track_model_versions")
+    ProjectAdmin(Project, UnfoldAdminSite())
+    track_model_versions.assert_called_once_with()
+
+    track_model_versions.reset_mock()
+    request = rf.get("/")
+    request.user = admin_user
+    get_changelist(request, CachedCountProjectAdmin)
+    track_model_versions.assert_called_once_with(Project)
+
+
+@pytest.mark.django_db
+def test_full_result_count_cached_capped(admin_user, project_factory, rf, mocker):
+    cache.clear()
+    project_factory.create_batch(6)
+    count_full_results = mocker.spy(ChangeList, "_count_full_results")
+    request = rf.get("/?q=missing")
+    request.user = admin_user
+    get_changelist(request, CachedCappedCountProjectAdmin)
+    cl = get_changelist(request, CachedCappedCountProjectAdmin)
+
+    assert cl.full_result_count == SmallCappedCountPaginator.count_limit
+    assert cl.full_result_paginator.is_capped
+    count_full_results.assert_called_once()
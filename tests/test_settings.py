@@ -1,3 +1,7 @@
+import copy
+import pickle
+
+import pytest
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.test.client import RequestFactory
@@ -26,6 +30,45 @@ def test_settings_default_config_with_custom_settings_name():
     assert get_config("CUSTOM_SETTINGS_NAME") == CONFIG_DEFAULTS
 
 
+def test_settings_config_cached():
+    assert get_config() is get_config()
+
+
+def test_settings_config_invalidated_on_setting_change():
+    config = get_config()
+
+    with override_settings(UNFOLD={"SITE_TITLE": "Changed site title"}):
+        assert get_config()["SITE_TITLE"] == "Changed site title"
+        assert get_config() is not config
+
+    assert get_config()["SITE_TITLE"] != "Changed site title"
+
+
+def test_settings_config_read_only():
+    config = get_config()
+
+    with pytest.raises(TypeError):
+        config["SITE_TITLE"] = "Mutated site title"
+
+    with pytest.raises(TypeError):
+        config["COLORS"]["primary"].update({"500": "red"})
+
+    with pytest.raises(TypeError):
+        config["SIDEBAR"]["navigation"].append({})
+
+
+def test_settings_config_copy_mutable():
+    config = copy.deepcopy(get_config())
+    config["SITE_TITLE"] = "Mutated site title"
+    config["SIDEBAR"]["navigation"].append({})
+
+    assert type(config) is dict
+    assert get_config()["SITE_TITLE"] != "Mutated site title"
+    assert type(copy.copy(get_config())) is dict
+    assert type(copy.copy(get_config()["STYLES"])) is list
+    assert pickle.loads(pickle.dumps(get_config())) == get_config()
+
+
 @override_settings(UNFOLD={**CONFIG_DEFAULTS, **{"SITE_TITLE": "Test site title"}})
 def test_settings_extended_config():
     assert settings.UNFOLD["SITE_TITLE"] == "Test site title"
@@ -80,3 +123,68 @@ def test_settings_global_callback_correct_return_type():
 
     assert "global_callback_key" in result
     assert result["global_callback_key"] == "global_callback_value"
+
+
+@override_settings(UNFOLD={**CONFIG_DEFAULTS})
+def test_settings_each_context_cached_per_request(mocker):
+    admin_site = UnfoldAdminSite()
+    spy = mocker.spy(admin_site, "get_tabs_list")
+    request = RequestFactory().get("/rand")
+    request.user = AnonymousUser()
+
+    context = admin_site.each_context(request)
+    context["site_title"] = "Mutated site title"
+
+    assert admin_site.each_context(request)["site_title"] != "Mutated site title"
+    spy.assert_called_once()
+    spy.reset_mock()
+
+    other_request = RequestFactory().get("/rand")
+    other_request.user = AnonymousUser()
+    admin_site.each_context(other_request)
+    spy.assert_called_once()
+
+
+@override_settings(UNFOLD={**CONFIG_DEFAULTS})
+def test_settings_each_context_cache_disabled(mocker):
+    class NoCacheAdminSite(UnfoldAdminSite):
+        def has_context_cache(self, request):
+            return False
+
+    admin_site = NoCacheAdminSite()
+    spy = mocker.spy(admin_site, "get_tabs_list")
+    request = RequestFactory().get("/rand")
+    request.user = AnonymousUser()
+    admin_site.each_context(request)
+    spy.reset_mock()
+    admin_site.each_context(request)
+    spy.assert_called_once()
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SITE_TITLE": "Static site title",
+            "SITE_HEADER": lambda request: request.path,
+        },
+    }
+)
+def test_settings_each_context_static_values(mocker):
+    admin_site = UnfoldAdminSite()
+    spy = mocker.spy(admin_site, "_get_colors")
+
+    for path in ["/first", "/second"]:
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        context = admin_site.each_context(request)
+
+        assert context["site_title"] == "Static site title"
+        assert context["site_header"] == path
+
+    assert spy.call_count == 1
+
+    with override_settings(UNFOLD={"SITE_TITLE": "Changed site title"}):
+        request = RequestFactory().get("/rand")
+        request.user = AnonymousUser()
+        assert admin_site.each_context(request)["site_title"] == "Changed site title"
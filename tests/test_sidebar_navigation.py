@@ -2,11 +2,19 @@ from collections.abc import Callable
 from http import HTTPStatus
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
 from django.test.client import RequestFactory
 from django.test.utils import override_settings
 from django.urls import reverse, reverse_lazy
+from django.utils import translation
+from django.utils.functional import lazy
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
+from example.models import Category
 
+from unfold.cache import get_model_version
 from unfold.settings import CONFIG_DEFAULTS
 from unfold.sites import UnfoldAdminSite
 
@@ -15,6 +23,24 @@ def badge_callback(request):
     return "badge callback"
 
 
+badge_calls = []
+
+
+def badge_callback_counted(request):
+    badge_calls.append(request)
+    return len(badge_calls)
+
+
+def badge_callback_batch(request):
+    badge_calls.append(request)
+    return {"first": 1, "second": 2}
+
+
+async def badge_callback_async(request):
+    badge_calls.append(request)
+    return "async badge"
+
+
 def badge_callback_none(request):
     return None
 
@@ -465,3 +491,768 @@ def test_navigation_link_attrs_rendered(admin_client):
     assert 'data-test="42"' in content
     assert 'aria-label="Custom Label"' in content
     assert "Attrs Link" in content
+
+
+def permission_callback_deny(request):
+    return False
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "badge": "tests.test_sidebar_navigation.badge_callback",
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1?sample=example",
+                                "permission": "tests.test_sidebar_navigation.permission_callback_deny",
+                            },
+                        ],
+                    }
+                ]
+            }
+        },
+    }
+)
+def test_navigation_compiled_once(mocker):
+    admin_site = UnfoldAdminSite()
+    spy = mocker.spy(admin_site, "_compile_navigation_item")
+
+    for _i in range(2):
+        spy.reset_mock()
+        request = RequestFactory().get("/menu-link-1")
+        sidebar = admin_site.get_sidebar_list(request)
+
+        assert sidebar[0]["badge_callback"] == "badge callback"
+        assert sidebar[0]["items"][0]["active"] is True
+        assert sidebar[0]["items"][0]["has_permission"] is False
+
+    spy.assert_not_called()
+
+    compiled, _trie = admin_site._get_compiled_navigation(request)
+    assert compiled[0].items[0].link_path == "/menu-link-1"
+    assert compiled[0].items[0].link_query == {"sample": ["example"]}
+    assert compiled[0].items[0].permission is permission_callback_deny
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": lazy(lambda: f"/{get_language()}/page", str)(),
+                            },
+                        ],
+                    }
+                ]
+            }
+        },
+    }
+)
+def test_navigation_compiled_per_language():
+    admin_site = UnfoldAdminSite()
+
+    for language in ["en", "de", "en"]:
+        with translation.override(language):
+            request = RequestFactory().get(f"/{language}/page")
+            sidebar = admin_site.get_sidebar_list(request)
+
+            assert sidebar[0]["items"][0]["active"] is True
+
+    with translation.override("de"):
+        sidebar = admin_site.get_sidebar_list(RequestFactory().get("/en/page"))
+
+        assert sidebar[0]["items"][0]["active"] is False
+
+    assert len(admin_site._compiled_navigation[1]) == len(["en", "de"])
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": "tests.test_sidebar_navigation.sidebar_callback",
+        },
+    }
+)
+def test_navigation_compiled_per_request_for_callback(mocker):
+    admin_site = UnfoldAdminSite()
+    spy = mocker.spy(admin_site, "_compile_navigation_item")
+
+    admin_site.get_sidebar_list(RequestFactory().get("/rand"))
+    first_call_count = spy.call_count
+    spy.reset_mock()
+    admin_site.get_sidebar_list(RequestFactory().get("/rand"))
+
+    assert first_call_count > 0
+    assert spy.call_count == first_call_count
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Dashboard",
+                                "link": reverse_lazy("admin:index"),
+                            },
+                            {
+                                "title": "App",
+                                "link": "/admin/example/",
+                            },
+                            {
+                                "title": "Users",
+                                "link": "/admin/example/user/",
+                            },
+                            {
+                                "title": "Other users",
+                                "link": "/user/",
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+def test_navigation_items_longest_path_active():
+    admin_site = UnfoldAdminSite()
+    request = RequestFactory().get("/admin/example/user/1/change/")
+    sidebar = admin_site.get_sidebar_list(request)
+
+    assert [item["active"] for item in sidebar[0]["items"]] == [
+        False,
+        False,
+        True,
+        False,
+    ]
+
+    request = RequestFactory().get(reverse("admin:index"))
+    sidebar = admin_site.get_sidebar_list(request)
+    assert sidebar[0]["items"][0]["active"] is True
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "TABS": [
+                {
+                    "items": [
+                        {
+                            "title": "All",
+                            "link": "/menu-link-1/",
+                        },
+                        {
+                            "title": "Filtered",
+                            "link": "/menu-link-1/?status=active",
+                        },
+                        {
+                            "title": "Callback",
+                            "link": lambda request: "/menu-link-1/?status=draft",
+                        },
+                    ],
+                },
+            ],
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1/",
+                            },
+                            {
+                                "title": "Example Title 2",
+                                "link": "/menu-link-2/",
+                            },
+                        ]
+                    }
+                ]
+            },
+        },
+    }
+)
+def test_navigation_tab_items_most_specific_active():
+    admin_site = UnfoldAdminSite()
+
+    request = RequestFactory().get("/menu-link-1/?status=active")
+    tabs = admin_site.get_tabs_list(request)
+    assert [item["active"] for item in tabs[0]["items"]] == [False, True, False]
+
+    request = RequestFactory().get("/menu-link-1/?status=draft")
+    tabs = admin_site.get_tabs_list(request)
+    assert [item["active"] for item in tabs[0]["items"]] == [False, False, True]
+
+    request = RequestFactory().get("/menu-link-1/")
+    tabs = admin_site.get_tabs_list(request)
+    assert [item["active"] for item in tabs[0]["items"]] == [True, False, False]
+
+    sidebar = admin_site.get_sidebar_list(request)
+    assert sidebar[0]["items"][0]["active"] is True
+    assert sidebar[0]["items"][1]["active"] is False
+
+
+tab_link_calls = []
+
+
+def tab_link_callback(request):
+    tab_link_calls.append(request)
+    return "/menu-link-1/"
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "TABS": [
+                {
+                    "items": [
+                        {
+                            "title": "Callback",
+                            "link": tab_link_callback,
+                        },
+                        {
+                            "title": "Translated",
+                            "link": lazy(lambda: f"/{get_language()}/tab", str)(),
+                        },
+                    ],
+                },
+            ],
+        },
+    }
+)
+def test_navigation_tab_items_resolved_once_per_request():
+    admin_site = UnfoldAdminSite()
+    request = RequestFactory().get("/menu-link-1/")
+    tab_link_calls.clear()
+
+    admin_site.get_sidebar_list(request)
+    tabs = admin_site.get_tabs_list(request)
+
+    assert [item["active"] for item in tabs[0]["items"]] == [True, False]
+    assert tab_link_calls == [request]
+
+    for language in ["en", "de"]:
+        with translation.override(language):
+            request = RequestFactory().get(f"/{language}/tab")
+            tabs = admin_site.get_tabs_list(request)
+
+            assert [item["active"] for item in tabs[0]["items"]] == [False, True]
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_counted",
+                                "badge_cache": {
+                                    "timeout": 60,
+                                    "models": ["example.Tag"],
+                                },
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_cache(admin_user, staff_user, tag_factory):
+    cache.clear()
+    badge_calls.clear()
+    admin_site = UnfoldAdminSite()
+
+    def get_badge(user):
+        request = RequestFactory().get("/rand")
+        request.user = user
+        return str(
+            admin_site.get_sidebar_list(request)[0]["items"][0]["badge_callback"]
+        )
+
+    assert get_badge(admin_user) == "1"
+    assert get_badge(admin_user) == "1"
+    assert get_badge(staff_user) == "2"
+
+    tag_factory()
+    assert get_badge(admin_user) == "3"
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_counted",
+                                "badge_cache": {"scope": "global"},
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_cache_global(admin_user, staff_user):
+    cache.clear()
+    badge_calls.clear()
+    admin_site = UnfoldAdminSite()
+
+    for user in [admin_user, staff_user]:
+        request = RequestFactory().get("/rand")
+        request.user = user
+        sidebar = admin_site.get_sidebar_list(request)
+        assert str(sidebar[0]["items"][0]["badge_callback"]) == "1"
+
+    assert len(badge_calls) == 1
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_counted",
+                                "badge_cache": {"scope": "global"},
+                            },
+                            {
+                                "title": "Example Title 2",
+                                "link": "/menu-link-2",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_counted",
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_cache_options_not_shared(admin_user):
+    cache.clear()
+    badge_calls.clear()
+    admin_site = UnfoldAdminSite()
+
+    for expected in [["1", "2"], ["1", "3"]]:
+        request = RequestFactory().get("/rand")
+        request.user = admin_user
+        items = admin_site.get_sidebar_list(request)[0]["items"]
+
+        assert [str(item["badge_callback"]) for item in items] == expected
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback",
+                                "badge_cache": {"models": ["example.Category"]},
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_cache_models_tracked_on_startup(category_factory, mocker):
+    mocker.patch("unfold.cache._tracked_models", set())
+
+    for signal in [post_save, post_delete]:
+        signal.disconnect(
+            sender=Category, dispatch_uid="unfold_model_version_example.category"
+        )
+
+    UnfoldAdminSite()
+    version = get_model_version(Category)
+    category_factory()
+
+    assert get_model_version(Category) != version
+
+
+def navigation_callback_badge_cache(request):
+    return [
+        {
+            "items": [
+                {
+                    "title": "Example Title 1",
+                    "link": "/menu-link-1",
+                    "badge": "tests.test_sidebar_navigation.badge_callback",
+                    "badge_cache": {"models": ["example.Category"]},
+                },
+            ]
+        }
+    ]
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": navigation_callback_badge_cache,
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_cache_models_tracked_once_for_callback(
+    category_factory, mocker
+):
+    mocker.patch("unfold.cache._tracked_models", set())
+
+    for signal in [post_save, post_delete]:
+        signal.disconnect(
+            sender=Category, dispatch_uid="unfold_model_version_example.category"
+        )
+
+    admin_site = UnfoldAdminSite()
+    connect = mocker.spy(post_save, "connect")
+
+    for _request in range(2):
+        admin_site.get_sidebar_list(RequestFactory().get("/rand"))
+
+    version = get_model_version(Category)
+    category_factory()
+
+    connect.assert_called_once()
+    assert get_model_version(Category) != version
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_batch",
+                                "badge_key": "first",
+                            },
+                            {
+                                "title": "Example Title 2",
+                                "link": "/menu-link-2",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_batch",
+                                "badge_key": "second",
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+def test_navigation_badge_batch():
+    badge_calls.clear()
+    admin_site = UnfoldAdminSite()
+    request = RequestFactory().get("/rand")
+    sidebar = admin_site.get_sidebar_list(request)
+
+    assert str(sidebar[0]["items"][0]["badge_callback"]) == "1"
+    assert str(sidebar[0]["items"][1]["badge_callback"]) == "2"
+    assert len(badge_calls) == 1
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback",
+                                "badge_deferred": True,
+                                "badge_variant": "info",
+                            },
+                            {
+                                "title": "Example Title 2",
+                                "link": "/menu-link-2",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_none",
+                                "badge_deferred": True,
+                            },
+                            {
+                                "title": "Example Title 3",
+                                "link": "/menu-link-3",
+                                "badge": "tests.test_sidebar_navigation.badge_callback",
+                                "badge_deferred": True,
+                                "permission": lambda request: False,
+                            },
+                        ]
+                    }
+                ]
+            },
+        },
+    }
+)
+def test_navigation_badge_deferred(admin_client):
+    response = admin_client.get(reverse("admin:index"))
+    content = response.content.decode()
+
+    assert response.status_code == HTTPStatus.OK
+    assert "badge callback" not in content
+    assert 'id="sidebar-badge-0-0"' in content
+    assert reverse("admin:badges") in content
+
+    response = admin_client.get(reverse("admin:badges"))
+    content = response.content.decode()
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'id="sidebar-badge-0-0"' in content
+    assert "badge callback" in content
+    assert "bg-blue-100" in content
+    assert 'id="sidebar-badge-0-1"' in content
+    assert 'id="sidebar-badge-0-2"' not in content
+    assert content.count("sidebar-badge ") == 1
+
+
+navigation_calls = []
+
+
+def navigation_callback_deferred(request):
+    navigation_calls.append(request)
+
+    return [
+        {
+            "items": [
+                {
+                    "title": "Example Title 1",
+                    "link": "/menu-link-1",
+                    "badge": "tests.test_sidebar_navigation.badge_callback",
+                    "badge_deferred": True,
+                },
+            ]
+        }
+    ]
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": "tests.test_sidebar_navigation.navigation_callback_deferred",
+            },
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_deferred_navigation_calls(client, admin_client):
+    navigation_calls.clear()
+    response = client.get(reverse("admin:login"))
+
+    assert response.status_code == HTTPStatus.OK
+    assert navigation_calls == []
+
+    response = admin_client.get(reverse("admin:index"))
+
+    assert reverse("admin:badges") in response.content.decode()
+    assert len(navigation_calls) == 1
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "permission": lambda request: False,
+                        "badge": "tests.test_sidebar_navigation.badge_callback",
+                        "badge_deferred": True,
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback",
+                                "badge_deferred": True,
+                            },
+                        ],
+                    },
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 2",
+                                "link": "/menu-link-2",
+                                "permission": lambda request: False,
+                                "items": [
+                                    {
+                                        "title": "Example Title 3",
+                                        "link": "/menu-link-3",
+                                        "badge": "tests.test_sidebar_navigation.badge_callback",
+                                        "badge_deferred": True,
+                                    },
+                                ],
+                            },
+                            {
+                                "title": "Example Title 4",
+                                "link": "/menu-link-4",
+                                "badge": "tests.test_sidebar_navigation.badge_callback",
+                                "badge_deferred": True,
+                            },
+                        ]
+                    },
+                ]
+            },
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_deferred_parent_permission(admin_user):
+    admin_site = UnfoldAdminSite()
+    request = RequestFactory().get("/rand")
+    request.user = admin_user
+    response = admin_site.badges(request)
+
+    assert [badge["id"] for badge in response.context_data["badges"]] == ["1-1"]
+
+
+def test_navigation_badge_not_deferred(admin_client):
+    response = admin_client.get(reverse("admin:index"))
+    assert response.status_code == HTTPStatus.OK
+    assert reverse("admin:badges") not in response.content.decode()
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_async",
+                                "badge_deferred": True,
+                            },
+                            {
+                                "title": "Example Title 2",
+                                "link": "/menu-link-2",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_batch",
+                                "badge_key": "second",
+                                "badge_deferred": True,
+                                "badge_cache": {"scope": "global"},
+                            },
+                            {
+                                "title": "Example Title 3",
+                                "link": "/menu-link-3",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_batch",
+                                "badge_key": "first",
+                                "badge_deferred": True,
+                                "badge_cache": {"scope": "global"},
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+@pytest.mark.django_db
+def test_navigation_badge_deferred_async(admin_user):
+    cache.clear()
+    badge_calls.clear()
+    admin_site = UnfoldAdminSite()
+    request = RequestFactory().get("/rand")
+    request.user = admin_user
+    response = async_to_sync(admin_site.abadges)(request)
+    content = response.render().content.decode()
+
+    assert [badge["value"] for badge in response.context_data["badges"]] == [
+        "async badge",
+        "2",
+        "1",
+    ]
+    assert 'id="sidebar-badge-0-0"' in content
+    assert len(badge_calls) == len(["async", "batch"])
+
+    badge_calls.clear()
+    response = async_to_sync(admin_site.abadges)(request)
+
+    assert [badge["value"] for badge in response.context_data["badges"]] == [
+        "async badge",
+        "2",
+        "1",
+    ]
+    assert len(badge_calls) == 1
+
+
+@override_settings(
+    UNFOLD={
+        **CONFIG_DEFAULTS,
+        **{
+            "SIDEBAR": {
+                "navigation": [
+                    {
+                        "items": [
+                            {
+                                "title": "Example Title 1",
+                                "link": "/menu-link-1",
+                                "badge": "tests.test_sidebar_navigation.badge_callback_async",
+                            },
+                        ]
+                    }
+                ]
+            }
+        },
+    }
+)
+def test_navigation_badge_async_callback():
+    badge_calls.clear()
+    admin_site = UnfoldAdminSite()
+    request = RequestFactory().get("/rand")
+    sidebar = admin_site.get_sidebar_list(request)
+
+    assert str(sidebar[0]["items"][0]["badge_callback"]) == "async badge"
+    assert len(badge_calls) == 1
@@ -20,6 +20,7 @@ from unfold.components import BaseComponent, register_component
 from unfold.enums import ActionVariant
 from unfold.fields import UnfoldAdminField, UnfoldAdminReadonlyField
 from unfold.sites import UnfoldAdminSite
+from unfold.templatetags import unfold_list
 from unfold.views import ChangeList
 
 
@@ -1262,6 +1263,53 @@ def test_tags_result_list_tag_no_display_links(rf, user_factory):
     assert "/admin/example/user/1/change" not in response
 
 
+@pytest.mark.django_db
+def test_tags_result_list_columns_resolved_once(rf, user_factory, mocker):
+    template = Template("{% load unfold_list %} {% unfold_result_list cl %}")
+    request = rf.get("/")
+    request.user = user_factory(
+        username="first@example.com", is_superuser=True, is_staff=True
+    )
+    user_factory(username="second@example.com")
+
+    cl = ChangeList(
+        request=request,
+        model=get_user_model(),
+        model_admin=UserAdmin(User, UnfoldAdminSite()),
+        sortable_by=["username"],
+        date_hierarchy=[],
+        search_fields=["username"],
+        search_help_text=None,
+        list_select_related=[],
+        list_editable=[],
+        list_display=["username", "is_active", "__str__"],
+        list_display_links=[],
+        list_filter=[],
+        list_per_page=10,
+        list_max_show_all=100,
+    )
+
+    cl.formset = None
+    get_non_gfk_field = mocker.spy(unfold_list, "_get_non_gfk_field")
+
+    response = template.render(
+        RequestContext(request, {"opts": get_user_model()._meta, "cl": cl})
+    )
+
+    assert "first@example.com" in response
+    assert "second@example.com" in response
+    assert get_non_gfk_field.call_count == len(cl.list_display)
+
+    username, is_active, str_column = unfold_list.get_list_columns(cl)
+    assert username.is_link
+    assert username.table_tag == "th"
+    assert username.field.name == "username"
+    assert not is_active.is_link
+    assert is_active.field.name == "is_active"
+    assert str_column.field is None
+    assert "field-__str__" in str_column.classes
+
+
 def test_tags_result_list_view(admin_client, user_factory):
     user = user_factory(username="sample@example.com")
     response = admin_client.get(reverse("admin:example_user_changelist"))
@@ -1364,8 +1412,6 @@ def test_tags_unfold_admin_actions(rf):
 
 @pytest.mark.django_db
 def test_tags_result_list_object_does_not_exist(rf, user_factory, monkeypatch):
-    from django.contrib.admin.utils import lookup_field as real_lookup_field
-
     template = Template("{% load unfold_list %} {% unfold_result_list cl %}")
     request = rf.get("/")
     user = user_factory(username="sample@example.com", is_superuser=True, is_staff=True)
@@ -1390,13 +1436,13 @@ def test_tags_result_list_object_does_not_exist(rf, user_factory, monkeypatch):
 
     cl.formset = None
 
-    def mock_lookup_field(field_name, result, model_admin):
-        if field_name == "username":
-            raise ObjectDoesNotExist("Related object does not exist")
-        return real_lookup_field(field_name, result, model_admin)
+    def raise_does_not_exist(obj):
+        raise ObjectDoesNotExist("Related object does not exist")
 
     monkeypatch.setattr(
-        "unfold.templatetags.unfold_list.lookup_field", mock_lookup_field
+        get_user_model(),
+        "username",
+        property(raise_does_not_exist, lambda obj, value: None),
     )
 
     opts = copy.copy(get_user_model()._meta)
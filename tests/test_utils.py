@@ -4,7 +4,16 @@ from django.utils.translation import override
 from djmoney.models.fields import MoneyField
 from djmoney.money import Money
 
-from unfold.utils import display_for_field, prettify_json, prettify_traceback
+from unfold import utils
+from unfold.utils import (
+    PathTrie,
+    display_for_field,
+    display_for_header,
+    display_for_label,
+    display_for_value,
+    prettify_json,
+    prettify_traceback,
+)
 
 
 def test_display_for_field_money():
@@ -44,6 +53,49 @@ def test_display_for_field_money():
         assert result_none == "-"
 
 
+def test_utils_boolean_icon_rendered_once_per_state(mocker):
+    utils.clear_rendered_fragments()
+    render_to_string = mocker.spy(utils, "render_to_string")
+
+    for value in [True, False, None, 1, 0, ""]:
+        display_for_value(value, "-", boolean=True)
+
+    assert render_to_string.call_count == len([True, False, None])
+    assert "check_small" in display_for_value(1, "-", boolean=True)
+    assert "close_small" in display_for_value(0, "-", boolean=True)
+    assert "check_indeterminate_small" in display_for_value("", "-", boolean=True)
+
+    with override("de"):
+        assert 'title="Unbekannt"' in display_for_value(None, "-", boolean=True)
+
+
+def test_utils_display_for_label_rendered_once_per_type(mocker):
+    utils.clear_rendered_fragments()
+    render_to_string = mocker.spy(utils, "render_to_string")
+    label = {"active": "success"}
+
+    first = display_for_label(("active", "First <b>"), "-", label)
+    second = display_for_label(("active", "Second"), "-", label)
+    multiple = display_for_label(["one", "two"], "-", True)
+
+    assert render_to_string.call_count == len([first, multiple])
+    assert "bg-green-100" in first
+    assert "First &lt;b&gt;" in first
+    assert "Second" in second
+    assert "one" in multiple
+    assert "two" in multiple
+    assert display_for_label("", "-", True).strip() == "-"
+
+
+def test_utils_display_for_header():
+    utils.clear_rendered_fragments()
+    result = display_for_header(["Title", "Subtitle", "TS"], "-")
+
+    assert "Title" in result
+    assert "Subtitle" in result
+    assert "TS" in result
+
+
 def test_utils_prettify_json():
     json_value = {"key": "value"}
     result = prettify_json(json_value, None)
@@ -66,3 +118,16 @@ def test_utils_prettify_traceback_pygments_not_installed(monkeypatch):
     monkeypatch.setitem(sys.modules, "pygments", None)
     result = prettify_traceback(None)
     assert result is None
+
+
+def test_path_trie_match():
+    trie = PathTrie()
+    trie.insert("/admin/", "index", exact=True)
+    trie.insert("/admin/app/", "app")
+    trie.insert("/admin/app/model/", "model")
+    trie.insert("/user/", "user")
+
+    assert trie.match("/admin/") == [(1, "index")]
+    assert trie.match("/admin/app/model/1/change/") == [(2, "app"), (3, "model")]
+    assert trie.match("/admin/app/model2/") == [(2, "app")]
+    assert trie.match("/admin/auth/user/") == []
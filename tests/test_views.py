@@ -1,7 +1,31 @@
+import json
 from http import HTTPStatus
 
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.admin import site
+from django.http import Http404, HttpResponseForbidden
+from django.test import override_settings
 from django.urls import reverse
+from example.models import Tag
+
+from unfold.settings import CONFIG_DEFAULTS
+from unfold.sites import UnfoldAdminSite
+from unfold.views import BaseAutocompleteView
+
+
+class TagAutocompleteView(BaseAutocompleteView):
+    model = Tag
+    paginate_by = 2
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_superuser:
+            return HttpResponseForbidden()
+
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        return super().get_queryset().order_by("name")
 
 
 def test_site_extra_url_view(admin_client):
@@ -60,3 +84,92 @@ def test_model_extra_url_view_not_enough_permissions(settings, client, staff_use
     response = client.get(reverse("admin:custom_url_name"))
 
     assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("async_enabled", [True, False])
+def test_autocomplete_view(rf, admin_user, tag_factory, async_enabled):
+    for name in ["first", "second", "third"]:
+        tag_factory(name=name)
+
+    view = type(
+        "View", (TagAutocompleteView,), {"async_enabled": async_enabled}
+    ).as_view()
+    assert iscoroutinefunction(view) == async_enabled
+
+    def get(query):
+        request = rf.get(f"/{query}")
+        request.user = admin_user
+        response = async_to_sync(view)(request) if async_enabled else view(request)
+        return json.loads(response.content)
+
+    first_page = get("")
+    assert [result["text"] for result in first_page["results"]] == ["first", "second"]
+    assert first_page["pagination"]["more"]
+
+    second_page = get("?page=2")
+    assert [result["text"] for result in second_page["results"]] == ["third"]
+    assert not second_page["pagination"]["more"]
+
+    with pytest.raises(Http404):
+        get("?page=invalid")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_autocomplete_view_async_result_queries(rf, admin_user, tag_factory):
+    tag_factory(name="first")
+
+    class View(TagAutocompleteView):
+        async_enabled = True
+
+        def get_result(self, obj):
+            return {"id": str(obj.pk), "text": f"{obj} of {Tag.objects.count()}"}
+
+    request = rf.get("/")
+    request.user = admin_user
+    response = async_to_sync(View.as_view())(request)
+
+    assert json.loads(response.content)["results"][0]["text"] == "first of 1"
+
+
+@override_settings(UNFOLD={**CONFIG_DEFAULTS, **{"ASYNC_VIEWS": True}})
+def test_autocomplete_view_async_setting():
+    assert not iscoroutinefunction(
+        type("View", (TagAutocompleteView,), {"async_enabled": False}).as_view()
+    )
+    assert iscoroutinefunction(TagAutocompleteView.as_view())
+
+
+def test_autocomplete_view_async_setting_of_site():
+    admin_site = UnfoldAdminSite(name="async")
+    admin_site.settings_name = "UNFOLD_ASYNC"
+    view_class = type("View", (TagAutocompleteView,), {"admin_site": None})
+
+    with override_settings(UNFOLD_ASYNC={**CONFIG_DEFAULTS, "ASYNC_VIEWS": True}):
+        assert iscoroutinefunction(view_class.as_view(admin_site=admin_site))
+
+    assert not iscoroutinefunction(view_class.as_view(admin_site=site))
+
+
+def test_autocomplete_view_sync_by_default():
+    assert not iscoroutinefunction(TagAutocompleteView.as_view())
+
+
+@pytest.mark.django_db
+def test_autocomplete_view_async_dispatch(rf, staff_user):
+    view = type("View", (TagAutocompleteView,), {"async_enabled": True}).as_view()
+    request = rf.get("/")
+    request.user = staff_user
+    response = async_to_sync(view)(request)
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_autocomplete_view_async_invalid_page(rf, admin_user):
+    view = type("View", (TagAutocompleteView,), {"async_enabled": True}).as_view()
+    request = rf.get("/?page=0")
+    request.user = admin_user
+
+    with pytest.raises(Http404):
+        async_to_sync(view)(request)